@@ -1,6 +1,11 @@
 import csv.{CSVWriter, CliParamsSerializer}
 
+import java.io.File
+import java.nio.charset.StandardCharsets
+
 import scala.annotation.tailrec
+import scala.collection.JavaConverters._
+import org.apache.commons.csv.{CSVFormat, CSVParser}
 import org.apache.spark.rdd.RDD
 import org.apache.spark.{SparkConf, SparkContext}
 import org.apache.spark.storage.StorageLevel
@@ -12,6 +17,15 @@ object Main {
   var partition: Int = 4
   var replicate: Int = 1
   var csvWriter: csv.CSVWriter = _
+  var configurationsFile: String = ""
+
+  // restore the default values of the parameters of the application
+  def resetArgs(): Unit = {
+    filename = ""
+    storageLevel = StorageLevel.MEMORY_AND_DISK
+    partition = 4
+    replicate = 1
+  }
 
   @tailrec
   def parseArgs(args: List[String]): Unit = {
@@ -36,6 +50,10 @@ object Main {
         csvWriter = new CSVWriter(arg)
         parseArgs(rest)
       }
+      case "-configurationsFile" :: arg :: rest => {
+        configurationsFile = arg
+        parseArgs(rest)
+      }
       case _ :: rest => {
         parseArgs(rest)
       }
@@ -66,11 +84,27 @@ object Main {
     // initialize spark
     val spark = context
     parseArgs(args.toList)
-    val cliParams = CliParamsSerializer.serialize(args)
 
     // initialize CSV writer
     csvWriter.createCsv()
 
+    if (configurationsFile.isEmpty) {
+      countWord(spark, CliParamsSerializer.serialize(args))
+    } else {
+      // several configurations in one submission: the arguments of a configuration per CSV record (name, value,
+      // name, value, ...), its metrics are tagged with its arguments. A configuration starts from the default values
+      // and the arguments of the command line, nothing is left over from the previous one
+      val parser = CSVParser.parse(new File(configurationsFile), StandardCharsets.UTF_8, CSVFormat.DEFAULT)
+      val configurations = try parser.getRecords.asScala.map(_.asScala.toArray).toList finally parser.close()
+      for (configurationArgs <- configurations) {
+        resetArgs()
+        parseArgs(args.toList ++ configurationArgs)
+        countWord(spark, CliParamsSerializer.serialize(configurationArgs))
+      }
+    }
+  }
+
+  def countWord(spark: SparkContext, cliParams: String): Unit = {
     for (i <- 1 to 3) {
       val t0 = System.nanoTime()
       val m0 = (runtime.totalMemory - runtime.freeMemory) / mb
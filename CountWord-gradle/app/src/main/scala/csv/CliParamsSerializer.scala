@@ -7,7 +7,7 @@ object CliParamsSerializer {
   def serialize(args: Array[String]): String = {
     val stringBuilder = new mutable.StringBuilder()
     for (index <- args.indices by 2) {
-      val paramName = args(index).replaceFirst("-", "")
+      val paramName = args(index).replaceFirst("^-+", "")
       val paramValue = args(index + 1)
       val serialized = "%s=%s".format(paramName, paramValue)
       stringBuilder.append(serialized)
@@ -0,0 +1,122 @@
+from benchmark.application.csv_utils import component_names
+from benchmark.data.metric import Metric
+from execo_engine import HashableDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+
+
+class ColumnarResultsWriter:
+    '''
+    Writer of the results as a table with one row per measurement round: one string column per parameter, the number
+    of the round, and one float column per metric component (named after the metric name, e.g. "[cpu(ms),memory(MB)]",
+    or metric_<i>). It needs pyarrow, which is imported when the writer is created.
+
+    The new rounds of a configuration are appended to an Arrow IPC stream (results_path + ".partial") as soon as it is
+    done: a stream is readable up to its last complete record batch, so a crashed sweep leaves the rounds of its done
+    configurations. At the end of the sweep, the results are written atomically to results_path, as Parquet if it ends
+    with ".parquet" and as an Arrow IPC file (Feather) otherwise, and the stream is removed.
+    '''
+
+    # rows of the record batches of the final results
+    _BATCH_ROWS = 65536
+
+    def __init__(self, results_path: str, parameter_names: List[str]):
+        # pyarrow is an optional dependency, a sweep with columnar results fails before the first submission without it
+        try:
+            import pyarrow
+            if results_path.endswith(".parquet"):
+                import pyarrow.parquet
+        except ImportError as err:
+            raise Exception(f"Install pyarrow (pip install pyarrow) to write the columnar results to {results_path}: " +
+                            f"{err}.")
+        self._pa = pyarrow
+        self.results_path = results_path
+        self.partial_path = f"{results_path}.partial"
+        self.parameter_names = parameter_names
+        self._schema = None
+        self._stream = None
+        self._sink = None
+        # config -> number of rounds appended to the stream
+        self._appended: Dict[HashableDict, int] = dict()
+
+    def append(self, config, score: List[Metric], metric_name: Optional[str]):
+        '''
+        Append the rounds of config that are not in the stream yet
+        '''
+        new_rounds = score[self._appended.get(config, 0):]
+        if len(new_rounds) == 0:
+            return
+        if self._stream is None:
+            self._schema_of(len(score[0].components()), metric_name)
+            self._sink = self._pa.OSFile(self.partial_path, "wb")
+            self._stream = self._pa.ipc.new_stream(self._sink, self._schema)
+        self._stream.write_batch(self._batch([(config, self._appended.get(config, 0), new_rounds)]))
+        self._sink.flush()
+        self._appended[config] = len(score)
+
+    def write(self, scores_by_config: Iterable[Tuple[HashableDict, List[Metric]]], metric_name: Optional[str]):
+        '''
+        Write the results of scores_by_config, (config, list of metrics) pairs
+        '''
+        self.close()
+        tmp_path = f"{self.results_path}.tmp"
+        writer, sink = None, None
+        chunk, rows = [], 0
+        for config, score in scores_by_config:
+            if len(score) == 0:
+                continue
+            if writer is None:
+                schema = self._schema_of(len(score[0].components()), metric_name)
+                if self.results_path.endswith(".parquet"):
+                    import pyarrow.parquet
+                    writer = pyarrow.parquet.ParquetWriter(tmp_path, schema)
+                else:
+                    sink = self._pa.OSFile(tmp_path, "wb")
+                    writer = self._pa.ipc.new_file(sink, schema)
+            chunk.append((config, 0, score))
+            rows += len(score)
+            if rows >= ColumnarResultsWriter._BATCH_ROWS:
+                writer.write_batch(self._batch(chunk))
+                chunk, rows = [], 0
+        if writer is None:
+            return
+        if len(chunk) > 0:
+            writer.write_batch(self._batch(chunk))
+        writer.close()
+        if sink is not None:
+            sink.close()
+        os.replace(tmp_path, self.results_path)
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+    def _schema_of(self, number_of_components: int, metric_name: Optional[str]):
+        if self._schema is not None:
+            return self._schema
+        names = component_names(metric_name, number_of_components) or \
+            [f"metric_{i}" for i in range(number_of_components)]
+        fields = [(name.lstrip("-"), self._pa.string()) for name in self.parameter_names]
+        fields.append(("round", self._pa.int32()))
+        fields += [(name, self._pa.float64()) for name in names]
+        self._schema = self._pa.schema(fields)
+        return self._schema
+
+    def _batch(self, rounds_by_config: List[Tuple[HashableDict, int, List[Metric]]]):
+        '''
+        Record batch of (config, number of the first round, metrics of the rounds) triples
+        '''
+        columns = [[] for _ in self._schema]
+        for config, first_round, score in rounds_by_config:
+            for i, metric in enumerate(score):
+                for position, name in enumerate(self.parameter_names):
+                    columns[position].append(config[name])
+                columns[len(self.parameter_names)].append(first_round + i)
+                for position, component in enumerate(metric.components(), len(self.parameter_names) + 1):
+                    columns[position].append(float(component))
+        return self._pa.record_batch(columns, schema=self._schema)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._sink.close()
+            self._stream = None
+            self._sink = None
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from execo_engine import HashableDict
 from benchmark.data.utils import DictUtil
+from typing import List, Optional
 
 
 class ApplicationConfigTransformer(ABC):
@@ -27,3 +28,26 @@ class ToCsvConfigTransformer(ApplicationConfigTransformer):
             cli_arguments.append(f"{cli_prefix_cut}={value}")
 
         return ",".join(cli_arguments)
+
+
+class FromCsvConfigTransformer:
+    '''
+    Inverse of ToCsvConfigTransformer: parse "key=value,key=value" back into a configuration. The CLI prefixes cut from
+    the keys are restored from the names of the parameters.
+    '''
+    def __init__(self, config_str: str, parameter_names: List[str]):
+        self.config_str = config_str
+        self.parameter_names = parameter_names
+
+    def transform(self) -> Optional[HashableDict]:
+        '''
+        Return None if a key is not the name of a parameter
+        '''
+        names = {name.lstrip("-"): name for name in self.parameter_names}
+        res = HashableDict()
+        for binding in self.config_str.split(","):
+            key, _, value = binding.partition("=")
+            if key not in names:
+                return None
+            res[names[key]] = value
+        return res
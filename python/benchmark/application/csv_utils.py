@@ -1,71 +1,247 @@
+from array import array
 from dataclasses import dataclass
-import csv
-from typing import List
-from benchmark.data.metric import Metric
+from execo_engine import HashableDict
+import csv, math, os, re
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from benchmark.data.metric import Metric, VectorMetric
+from benchmark.data.statistics import Aggregator, ScoreStatistics
 from benchmark.application.config_transformer import ToCsvConfigTransformer
 
 CSV_HEADERS = ["configuration", "metric_name", "metric_value"]
+# the all-in-one results also record the number of measurement rounds each configuration received, the half-width of
+# the confidence interval of its mean metric relative to the mean, whether its mean metric is on the Pareto front, the
+# statistic of its metrics chosen as the score (the aggregate) and the bounds of its confidence interval
+RESULTS_CSV_HEADERS = CSV_HEADERS + ["rounds", "precision", "pareto_optimal", "aggregator", "aggregate", "interval_low",
+                                     "interval_high"]
+
+
+def component_names(metric_name: Optional[str], number_of_components: int) -> Optional[List[str]]:
+    '''
+    Names of the components of a metric named like its value, e.g. "[cpu(ms),memory(MB)]", None otherwise
+    '''
+    if metric_name is None or not (metric_name.startswith("[") and metric_name.endswith("]")):
+        return None
+    names = [name.strip() for name in metric_name[1:-1].split(",")]
+    return names if len(names) == number_of_components else None
+
+
+class MetricSeries:
+    '''
+    Iterations of one metric of a metrics CSV: running aggregates of its components, and the components of every
+    iteration in a compact array (one row per iteration) if the series is kept
+    '''
+
+    def __init__(self, name: str, keep_values: bool = True):
+        self.name = name
+        self.statistics = ScoreStatistics()
+        self.width: Optional[int] = None
+        self._values = array("d") if keep_values else None
+
+    def __len__(self):
+        return self.statistics.count
+
+    def add(self, components: List[float]):
+        if self.width is None:
+            self.width = len(components)
+        elif len(components) != self.width:
+            raise Exception(f"The metric {self.name} has {len(components)} components instead of {self.width}.")
+        self.statistics.add_components(components)
+        if self._values is not None:
+            self._values.extend(components)
+
+    def values(self) -> np.ndarray:
+        if self._values is None:
+            raise Exception(f"The series of the metric {self.name} is not kept.")
+        return np.frombuffer(self._values, dtype=np.float64).reshape(-1, self.width or 0)
+
+    def names(self) -> Optional[List[str]]:
+        '''Names of the components, from the metric name'''
+        return component_names(self.name, self.width)
+
+
+class CsvReader:
+    '''
+    Reader of a metrics CSV written by the application, one row per iteration. The rows are folded into a MetricSeries
+    for each metric name in a single pass. The series of the iterations are needed by the steady state detection and
+    by the aggregators other than the mean, they are not kept if keep_series is False.
+    '''
+
+    def __init__(self, csv_path, keep_series: bool = True):
+        self.csv_path: str = csv_path
+        self.keep_series = keep_series
+        # metric name -> series, in the order of the first row of the metric
+        self.series: Dict[str, MetricSeries] = dict()
+
+    def read(self):
+        for _, metric_name, metric_value in CsvReader._rows(self.csv_path):
+            self._add(metric_name, metric_value)
+
+    @staticmethod
+    def read_by_configuration(csv_path, keep_series: bool = True) -> Dict[str, 'CsvReader']:
+        '''
+        Split the metrics CSV of several configurations (a batched submission) in a single pass: configuration column
+        (the arguments of the configuration, "key=value,...") -> reader of its rows
+        '''
+        readers: Dict[str, CsvReader] = dict()
+        for configuration, metric_name, metric_value in CsvReader._rows(csv_path):
+            reader = readers.get(configuration)
+            if reader is None:
+                reader = readers[configuration] = CsvReader(csv_path, keep_series)
+            reader._add(metric_name, metric_value)
+        return readers
+
+    @staticmethod
+    def _rows(csv_path) -> Iterable[Tuple[str, str, str]]:
+        with open(csv_path, 'r') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            configuration_column = header.index(CSV_HEADERS[0])
+            name_column = header.index(CSV_HEADERS[1])
+            value_column = header.index(CSV_HEADERS[2])
+            for row in reader:
+                if len(row) <= max(configuration_column, value_column):
+                    continue
+                yield row[configuration_column].strip("\""), row[name_column].strip("\""), row[value_column]
+
+    def _add(self, metric_name: str, metric_value: str):
+        series = self.series.get(metric_name)
+        if series is None:
+            series = self.series[metric_name] = MetricSeries(metric_name, self.keep_series)
+        metric_value = metric_value.strip("\" []")
+        series.add([float(component) for component in metric_value.split(",")])
+
+    def get_metric_names(self) -> List[str]:
+        return list(self.series.keys())
+
+    def get_metric_name(self):
+        '''The first metric name of the CSV'''
+        return next(iter(self.series), None)
+
+    def get_series(self, metric_name: str = None) -> Optional[np.ndarray]:
+        '''
+        Components of the iterations of a metric (the first one by default), one row per iteration, None if the CSV
+        has no such metric. The series must be kept (keep_series).
+        '''
+        series = self._series_of(metric_name)
+        return None if series is None else series.values()
+
+    def get_number_of_iterations(self, metric_name: str = None) -> int:
+        series = self._series_of(metric_name)
+        return 0 if series is None else len(series)
+
+    def get_summarized_metric(self, first_iteration: int = 0, aggregator: Aggregator = None, metric_name: str = None):
+        '''
+        Mean metric (statistic of the aggregator, if set) of the iterations of a metric (the first one by default),
+        from first_iteration on (e.g. the first iteration of the steady state)
+        '''
+        series = self._series_of(metric_name)
+        if series is None or len(series) == 0:
+            return None
+        mean = aggregator is None or aggregator.is_mean()
+        if mean and first_iteration == 0:
+            # from the running aggregates
+            return VectorMetric(np.array(series.statistics.sum) / len(series), series.names())
+
+        values = series.values()[first_iteration:]
+        statistic = values.mean(axis=0) if mean else aggregator.aggregate(values)
+        return VectorMetric(statistic, series.names())
+
+    def _series_of(self, metric_name: Optional[str]) -> Optional[MetricSeries]:
+        if metric_name is None:
+            metric_name = self.get_metric_name()
+        return self.series.get(metric_name)
 
 
 @dataclass
-class CsvRecord:
+class ResultsCsvRecord:
     configuration: str
     metric_name: str
-    metric_value: Metric
+    metric_values: List[Metric]
 
 
-class CsvReader:
+class ResultsCsvReader:
+    '''
+    Reader of the all-in-one results written by CsvWriter: the metrics of the rounds of each configuration
+    '''
 
     def __init__(self, csv_path):
         self.csv_path: str = csv_path
-        self.csv_records: List[CsvRecord] = []
+        self.csv_records: List[ResultsCsvRecord] = []
 
     def read(self):
         with open(self.csv_path, 'r') as file:
             reader = csv.DictReader(file)
-            for row in list(reader):
+            for row in reader:
                 configuration = row[CSV_HEADERS[0]].replace("\"", "")
                 metric_name = row[CSV_HEADERS[1]].replace("\"", "")
-                metric_value = row[CSV_HEADERS[2]].replace("\"", "")
-                metric = Metric.from_string(metric_value)
-                record = CsvRecord(configuration=configuration, metric_name=metric_name, metric_value=metric)
+                metric_values = row[CSV_HEADERS[2]].replace("\"", "").strip()
+                # a list of metrics "[[1,2], [3,4]]"
+                metrics = re.findall(r"\[[^\[\]]*\]", metric_values[1:-1]) if metric_values.startswith("[[") else []
+                record = ResultsCsvRecord(configuration=configuration, metric_name=metric_name,
+                                          metric_values=[Metric.from_string(metric) for metric in metrics])
                 self.csv_records.append(record)
 
-    def get_summarized_metric(self):
-        number_of_records = len(self.csv_records)
-        if number_of_records == 0:
-            return None
-
-        metric = self.csv_records[0].metric_value
-        if number_of_records == 1:
-            return metric
-
-        for record in self.csv_records[1:]:
-            metric += record.metric_value
-
-        return metric / number_of_records
-
-    def get_metric_name(self):
-        number_of_records = len(self.csv_records)
-        if number_of_records == 0:
-            return None
-        return self.csv_records[0].metric_name
-
 
 class CsvWriter:
-
-    def __init__(self, csv_path, scores_by_config, metric_name):
+    '''
+    Writer of the all-in-one results. The row of a configuration is appended and flushed to the disk as soon as the
+    configuration is done (append), so a crashed sweep leaves the results of its done configurations; the latest row of
+    a configuration wins. At the end of the sweep, the results are rewritten atomically with one row per configuration
+    (write).
+    '''
+
+    def __init__(self, csv_path, confidence_level: float = 0.95, aggregator: Aggregator = None):
         self.csv_path: str = csv_path
-        self.scores_by_config = scores_by_config
-        self.metric_name = metric_name
-
-    def write(self):
-        with open(self.csv_path, 'w') as file:
+        self.confidence_level = confidence_level
+        self.aggregator = Aggregator() if aggregator is None else aggregator
+        self._file = None
+        self._csv_writer = None
+
+    def append(self, config, score: List[Metric], metric_name: str, pareto_optimal: bool = False):
+        if self._file is None:
+            new_file = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+            self._file = open(self.csv_path, 'a')
+            self._csv_writer = csv.writer(self._file, quoting=csv.QUOTE_NONNUMERIC)
+            if new_file:
+                self._csv_writer.writerow(RESULTS_CSV_HEADERS)
+        self._csv_writer.writerow(self._row(config, score, metric_name, pareto_optimal))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def write(self, scores_by_config: Iterable[Tuple[HashableDict, List[Metric]]], metric_name: str, pareto_front=()):
+        '''
+        Replace the results by the rows of scores_by_config, (config, list of metrics) pairs
+        '''
+        self.close()
+        pareto_front = set(pareto_front)
+        tmp_path = f"{self.csv_path}.tmp"
+        with open(tmp_path, 'w') as file:
             csv_writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)  # write quotes around nonnumeric values
-            csv_writer.writerow(CSV_HEADERS)
-
-            for config, score in self.scores_by_config.items():
-                config_str = ToCsvConfigTransformer(config).transform()
-                score_str = str(score)
-                csv_row = [config_str, self.metric_name, score_str]
-                csv_writer.writerow(csv_row)
+            csv_writer.writerow(RESULTS_CSV_HEADERS)
+            for config, score in scores_by_config:
+                csv_writer.writerow(self._row(config, score, metric_name, config in pareto_front))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.csv_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._csv_writer = None
+
+    def _row(self, config, score: List[Metric], metric_name: str, pareto_optimal: bool) -> list:
+        config_str = ToCsvConfigTransformer(config).transform()
+        score_str = str(score)
+        precision = ScoreStatistics.of(score).relative_half_width(self.confidence_level)
+        # no confidence interval below two rounds (or for a mean of 0), the precision is left empty
+        if not math.isfinite(precision):
+            precision = ""
+        values = VectorMetric.stack(score)
+        low, high = self.aggregator.interval(values, self.confidence_level)
+        return [config_str, metric_name, score_str, len(score), precision, pareto_optimal, self.aggregator.name,
+                str(Metric.from_components(self.aggregator.aggregate(values))), str(Metric.from_components(low)),
+                str(Metric.from_components(high))]
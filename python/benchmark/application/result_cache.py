@@ -0,0 +1,99 @@
+from benchmark.data.metric import Metric
+from pathlib import Path
+from typing import List, Optional, Tuple
+import hashlib, json, os, time
+
+
+class ResultCache:
+    '''
+    Persistent cache of the measured metrics of the configurations, across benchmark runs.
+
+    The cache is content-addressed: an entry is a JSON file named after the SHA-256 digest of the configuration and of
+    the environment of the measurement (digest of the application JAR, classname, Spark and Java homes, shape of the
+    cluster and the options that summarize the metrics of a run). Rebuilding the JAR or changing the cluster thus
+    invalidates the entries. An entry holds the metrics of the rounds of the configuration, in the order they were
+    measured.
+
+    Entries older than max_age seconds are measured again. The modification time of an entry is its last access, the
+    least recently used entries are evicted once there are more than max_entries of them.
+    '''
+
+    _MAX_ENTRIES = 1000
+
+    def __init__(self, path: str, environment: dict, max_age: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_entries = max_entries or ResultCache._MAX_ENTRIES
+        self._environment = json.dumps(environment, sort_keys=True)
+        self._number_of_entries = sum(1 for _ in self.path.glob("*.json"))
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        '''
+        SHA-256 digest of the content of a file, of its path if it does not exist
+        '''
+        digest = hashlib.sha256()
+        if not os.path.isfile(path):
+            digest.update(path.encode())
+            return digest.hexdigest()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key(self, config: dict) -> str:
+        content = self._environment + json.dumps(dict(config), sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key: str) -> Tuple[Optional[str], List[Metric]]:
+        '''
+        Return the metric name and the cached metrics of an entry, (None, []) if it is missing or expired
+        '''
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rt") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None, []
+        if self.max_age is not None and time.time() - entry["created"] > self.max_age:
+            self._remove(entry_path)
+            return None, []
+        os.utime(entry_path)
+        return entry["metric_name"], [Metric.from_string(metric) for metric in entry["metrics"]]
+
+    def append(self, key: str, metric_name: str, metric: Metric):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rt") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = {"created": time.time(), "metric_name": metric_name, "metrics": []}
+            self._number_of_entries += 1
+        entry["metrics"].append(str(metric))
+
+        # the entry is replaced atomically, a crash leaves the previous version
+        tmp_path = entry_path.with_suffix(".tmp")
+        with open(tmp_path, "wt") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, entry_path)
+
+        if self._number_of_entries > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self.path.glob("*.json"), key=lambda entry_path: entry_path.stat().st_mtime)
+        for entry_path in entries[:len(entries) - self.max_entries]:
+            self._remove(entry_path)
+        self._number_of_entries = min(len(entries), self.max_entries)
+
+    def _remove(self, entry_path: Path):
+        try:
+            entry_path.unlink()
+            self._number_of_entries -= 1
+        except FileNotFoundError:
+            pass
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
@@ -12,6 +12,74 @@ class BenchmarkConfig:
     all_in_one_benchmark_results_csv_path: str
     metrics_csv_cli_param_name: Optional[str]
     metrics_csv_cli_param_value: Optional[str]
+    # seed of the Sweeper's random draws, set it to reproduce a sweep
+    seed: Optional[int] = None
+    # search strategy of the Sweeper: "priority" (default), "surrogate" (Bayesian optimization), "halving" (successive
+    # halving), "hyperband" or "racing"
+    strategy: Optional[str] = None
+    # maximal number of configurations scored by the "surrogate" strategy, number of configurations of the first rung
+    # of the "halving" and "hyperband" strategies (train * number of parameters by default)
+    budget: Optional[int] = None
+    # "halving" and "hyperband": the best 1/elimination_ratio configurations of a rung are promoted (3 by default) ...
+    elimination_ratio: Optional[int] = None
+    # ... and receive elimination_ratio times more rounds, from min_measurement_rounds (1 by default) up to
+    # measurement_rounds. "racing" eliminates candidates after min_measurement_rounds (2 by default) and fixes the
+    # parameter after measurement_rounds at the latest
+    min_measurement_rounds: Optional[int] = None
+    # adaptive measurement rounds: after measurement_rounds, a configuration is measured again until the half-width of
+    # the confidence interval of its mean metric is below target_precision * mean (e.g. 0.05), except with the
+    # strategies that decide the rounds ("halving", "hyperband" and "racing"), ...
+    target_precision: Optional[float] = None
+    # ... or until it received max_measurement_rounds (4 * measurement_rounds by default)
+    max_measurement_rounds: Optional[int] = None
+    # confidence level of the intervals and of the "racing" tests (0.95 by default)
+    confidence_level: Optional[float] = None
+    # discard the warm-up iterations of each run (MSER truncation of the rows of the metrics CSV), and skip the
+    # warmup_rounds once the measured configurations show no warm-up effect across runs
+    detect_steady_state: Optional[bool] = None
+    # number of applications submitted at once (1 by default). Each execution slot passes its own metrics CSV path to
+    # the application: metrics_csv_cli_param_value suffixed with the number of the slot
+    concurrent_submissions: Optional[int] = None
+    # resume the sweep of the sweeper_workdir (replay its journal) instead of starting a new one
+    resume: Optional[bool] = None
+    # comparison of the metrics with several components: "componentwise" (default, a metric is better if all its
+    # components are better), "pareto" (a metric is better if it dominates the other one, the best configuration is the
+    # non-dominated one closest to the ideal point) or "weighted" (default if objective_weights is set)
+    objective: Optional[str] = None
+    # weights of the components of the metrics for the "weighted" objective, e.g. [1.0, 0.01]
+    objective_weights: Optional[List[float]] = None
+    # statistic of the metrics of a configuration that is compared: "mean" (default), "median", a percentile "p<q>"
+    # (e.g. "p90", "p99"), "trimmed_mean" or "bootstrap" (the mean with a bootstrap confidence interval). It also
+    # summarizes the iterations of a run, and its confidence interval is written to the all-in-one results
+    aggregator: Optional[str] = None
+    # directory of the cache of the measured metrics, shared by the benchmark runs: the configurations with enough cached
+    # rounds are not submitted again (no cache by default). Rebuilding the JAR or changing the environment of the
+    # measurements invalidates the cache
+    result_cache_path: Optional[str] = None
+    # cached metrics older than result_cache_max_age seconds are measured again (they never expire by default)
+    result_cache_max_age: Optional[float] = None
+    # maximal number of cached configurations, the least recently used ones are evicted (1000 by default)
+    result_cache_max_entries: Optional[int] = None
+    # all-in-one results of previous sweeps (all_in_one_benchmark_results_csv_path files): their configurations are
+    # scored with their metrics and done before the sweep starts, they do not count in the budget
+    warm_start_csv_paths: Optional[List[str]] = None
+    # results with one row per measurement round and one typed column per parameter and per metric component: a Parquet
+    # file if the path ends with ".parquet", an Arrow IPC file otherwise (needs pyarrow)
+    columnar_results_path: Optional[str] = None
+    # run the workflow on an asyncio event loop: spark-submit runs as an asynchronous subprocess, and the metrics of the
+    # last round of an execution slot are read and recorded (and its next configuration selected) while the next
+    # round is running. Each slot alternates between two metrics CSV paths, suffixed with .0 and .1
+    pipelined: Optional[bool] = None
+    # number of configurations run by the application in one spark-submit (1 by default), to amortize the startup of
+    # the driver. The application receives the path of a CSV file in "-configurationsFile", with the arguments of one
+    # configuration per record (name, value, name, value, ...), each configuration starts from the default values of
+    # the application. It writes the arguments of each configuration ("key=value,...") in the configuration
+    # column of its rows of the metrics CSV. Only the configurations with the same Spark launch parameters (the
+    # parameters named "--<spark-submit option>") are submitted together
+    configurations_per_submission: Optional[int] = None
+    # a spark-submit running for longer than submission_timeout seconds is killed, its round is counted as an error (no
+    # timeout by default)
+    submission_timeout: Optional[float] = None
 
 
 @dataclass
@@ -35,6 +103,10 @@ class SparkConfig:
     java_home: str
     application_jar_path: str
     application_classname: str
+    # run the application in one long-lived PySpark session with this master (e.g. "local[*]") instead of submitting
+    # it at every round: application_jar_path is then a Python file and application_classname a function of it, called
+    # with the SparkSession and the arguments of the configuration (see PySparkSessionSubmit)
+    session_master: Optional[str] = None
 
 
 @dataclass
@@ -57,8 +129,17 @@ class ParameterBinding:
 
 @dataclass
 class ApplicationParameterConstraint:
+    '''
+    MUST: if source is bound, then each target parameter must have one of the target values.
+    FORBIDDEN: if source is bound, then no target parameter may have any of the target values.
+    '''
     source: ParameterBinding
     targets: List[ParameterBinding]
+    # name of a ConstraintType, MUST by default
+    type: Optional[str] = None
+
+    def get_type(self) -> ConstraintType:
+        return ConstraintType.MUST if self.type is None else ConstraintType[self.type]
 
 
 @dataclass
@@ -0,0 +1,179 @@
+from array import array
+from benchmark.data.config import ConstraintType
+from benchmark.data.space import ConfigurationSpace
+import numpy as np
+
+
+class CompiledConstraints:
+    '''
+    Constraints compiled against the value tables of a ConfigurationSpace.
+
+    Every (source parameter, target parameter) pair is compiled into a boolean lookup table indexed by the digits
+    (value positions) of the two parameters: table[source_digit, target_digit] is False if a constraint forbids the
+    combination. Blocks of configuration indexes are checked by decoding their digits with NumPy and looking them up in
+    the tables, so no configuration is decoded into a dict.
+    '''
+
+    # number of configuration indexes evaluated at once
+    _BLOCK_SIZE = 1 << 16
+    # NumPy evaluates a configuration about this many times faster than backtracking binds a parameter
+    _SPARSE_FACTOR = 64
+
+    def __init__(self, space: ConfigurationSpace, merged_constraints: dict):
+        '''
+        merged_constraints: output of ConstraintUtil._merge_constraints
+        '''
+        self.space = space
+
+        # (source_position, target_position) -> boolean table of shape (source_radix, target_radix)
+        tables = dict()
+        radices = space.radices
+        for constraint_source, constraint_targets in merged_constraints.items():
+            source_name = constraint_source["name"]
+            source_position = space.position_of(source_name)
+            source_digit = space.digit_of(source_name, constraint_source["value"])
+            if source_digit is None:
+                # the source value is not in the space, the constraint is never triggered
+                continue
+
+            must = constraint_source["type"] == ConstraintType.MUST
+            for target_name, target_values in constraint_targets.items():
+                target_position = space.position_of(target_name)
+                listed = np.zeros(radices[target_position], dtype=bool)
+                for value in target_values:
+                    digit = space.digit_of(target_name, value)
+                    if digit is not None:
+                        listed[digit] = True
+
+                key = (source_position, target_position)
+                if key not in tables:
+                    tables[key] = np.ones((radices[source_position], radices[target_position]), dtype=bool)
+                tables[key][source_digit] &= listed if must else ~listed
+
+        self._tables = [(source, target, table) for (source, target), table in tables.items()]
+        self._strides = np.array(space.strides, dtype=np.int64)
+        self._radices = np.array(radices, dtype=np.int64)
+
+        # tables checked when the parameter at a position is bound, i.e. whose other parameter is bound earlier:
+        # position -> [(other_position, table oriented as [other_digit, digit])]
+        self._bound_checks = [[] for _ in radices]
+        # live positions of each level: positions bound earlier that still constrain a later or the current position
+        self._live = [[] for _ in radices]
+        for source, target, table in self._tables:
+            first, last = min(source, target), max(source, target)
+            self._bound_checks[last].append((first, table if source == first else table.T))
+            for position in range(first + 1, last + 1):
+                self._live[position].append(first)
+        self._live = [sorted(set(live)) for live in self._live]
+
+    def __len__(self):
+        return len(self._tables)
+
+    def _digits(self, indexes: np.ndarray, position: int, cache: dict) -> np.ndarray:
+        if position not in cache:
+            cache[position] = (indexes // self._strides[position]) % self._radices[position]
+        return cache[position]
+
+    def mask(self, indexes: np.ndarray) -> np.ndarray:
+        '''
+        Return a boolean array which is True for the valid configuration indexes
+        '''
+        valid = np.ones(len(indexes), dtype=bool)
+        digits = dict()
+        for source, target, table in self._tables:
+            valid &= table[self._digits(indexes, source, digits), self._digits(indexes, target, digits)]
+        return valid
+
+    def is_valid(self, index: int) -> bool:
+        return bool(self.mask(np.array([index], dtype=np.int64))[0])
+
+    def _allowed_digits(self, position: int, digits: list, fixed: dict) -> np.ndarray:
+        '''
+        Digits of position that are compatible with the digits bound at the earlier positions
+        '''
+        if position in fixed:
+            allowed = np.zeros(self._radices[position], dtype=bool)
+            if fixed[position] is not None:
+                allowed[fixed[position]] = True
+        else:
+            allowed = np.ones(self._radices[position], dtype=bool)
+        for other_position, table in self._bound_checks[position]:
+            allowed &= table[digits[other_position]]
+        return np.flatnonzero(allowed)
+
+    def _to_fixed(self, prefix: dict) -> dict:
+        # position -> digit (None if the value is not in the space)
+        if prefix is None:
+            return dict()
+        return {self.space.position_of(key): self.space.digit_of(key, value) for key, value in prefix.items()}
+
+    def _count(self, position: int, digits: list, fixed: dict, memo: dict) -> int:
+        if position == len(digits):
+            return 1
+        # the valid completions only depend on the live digits
+        key = (position, tuple(digits[live] for live in self._live[position]))
+        if key not in memo:
+            res = 0
+            for digit in self._allowed_digits(position, digits, fixed):
+                digits[position] = digit
+                res += self._count(position + 1, digits, fixed, memo)
+            memo[key] = res
+        return memo[key]
+
+    def count(self, prefix: dict = None) -> int:
+        '''
+        Exact number of valid configurations (containing prefix, if set), without enumerating them.
+        Parameters are bound in the order of the space keys and the number of valid completions is memoized on the
+        digits that still constrain the unbound parameters.
+        '''
+        return self._count(0, [0] * len(self._radices), self._to_fixed(prefix), dict())
+
+    def enumerate(self, prefix: dict = None):
+        '''
+        Generate the valid configuration indexes (containing prefix, if set) in increasing order.
+        Constraints are applied as the parameters are bound, and the counts are used to prune the subtrees without
+        any valid configuration, so invalid configurations are never generated.
+        '''
+        fixed = self._to_fixed(prefix)
+        memo = dict()
+        digits = [0] * len(self._radices)
+        strides = self.space.strides
+
+        def backtrack(position: int, index: int):
+            if position == len(digits):
+                yield index
+                return
+            for digit in self._allowed_digits(position, digits, fixed):
+                digits[position] = digit
+                if self._count(position + 1, digits, fixed, memo) > 0:
+                    yield from backtrack(position + 1, index + int(digit) * strides[position])
+
+        yield from backtrack(0, 0)
+
+    def valid_indexes(self, prefix: dict = None) -> array:
+        '''
+        Return the valid configuration indexes (array of int), of the configurations that start with prefix if set.
+        The prefix must bind the leading keys of the space, so that its configurations are a contiguous index range.
+        '''
+        restricted = self.space.restrict(prefix or {})
+        # backtracking visits about count * len(keys) nodes, a block scan visits the whole range with NumPy
+        if self.count(prefix) * len(self._radices) < len(restricted) // CompiledConstraints._SPARSE_FACTOR:
+            return array("q", self.enumerate(prefix))
+        return self.filter(restricted)
+
+    def filter(self, indexes=None) -> array:
+        '''
+        Return the valid configuration indexes (array of int) among indexes, or among the whole space if None. A range
+        of indexes is evaluated block by block, without materializing it.
+        '''
+        if indexes is None:
+            indexes = range(len(self.space))
+        elif not isinstance(indexes, range):
+            indexes = np.asarray(indexes, dtype=np.int64)
+        res = array("q")
+        for start in range(0, len(indexes), CompiledConstraints._BLOCK_SIZE):
+            block = indexes[start:start + CompiledConstraints._BLOCK_SIZE]
+            if isinstance(block, range):
+                block = np.arange(block.start, block.stop, block.step, dtype=np.int64)
+            res.frombytes(block[self.mask(block)].tobytes())
+        return res
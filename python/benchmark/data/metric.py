@@ -2,6 +2,8 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
 
 
 @dataclass
@@ -51,151 +53,113 @@ class Metric(ABC):
     def get_value(self):
         pass
 
-    @staticmethod
-    def from_string(array_as_string: str):
-        array = array_as_string[1:-1].split(",")
-        metrics = [LongMetric(element) for element in array]
-        number_of_metrics = len(array)
-        if number_of_metrics == 3:
-            return Tuple3Metric(metrics[0], metrics[1], metrics[2])
-        elif number_of_metrics == 2:
-            return Tuple2Metric(metrics[0], metrics[1])
-        elif number_of_metrics == 1:
-            return metrics[0]
-        else:
-            raise Exception(f"Array contains more than three or zero metrics {metrics}.")
-
-
-@dataclass
-class LongMetric(Metric):
-
-    def __init__(self, value: int):
-        super().__init__()
-        self._value = int(value)
-
-    def __gt__(self, other: LongMetric) -> bool:
-        '''Return true if self > other'''
-        return self._value > other._value
-
-    def __ge__(self, other: LongMetric) -> bool:
-        '''Return true if self >= other'''
-        return self._value >= other._value
-
-    def __lt__(self, other: LongMetric) -> bool:
-        '''Return true if self < other'''
-        return self._value < other._value
-
-    def __le__(self, other: LongMetric) -> bool:
-        '''Return true if self <= other'''
-        return self._value <= other._value
-
-    def __add__(self, other: LongMetric) -> LongMetric:
-        return LongMetric(self._value + other._value)
-
-    def __iadd__(self, other: LongMetric):
-        self._value += other._value
-        return self
-
-    def __truediv__(self, num: int) -> LongMetric:
-        return LongMetric(round(self._value / num))
+    @abstractmethod
+    def components(self) -> List[float]:
+        '''Return the numeric components of the metric'''
+        pass
 
-    def __str__(self) -> str:
-        return f"[{self._value}]"
+    @staticmethod
+    def from_string(array_as_string: str, names: Optional[List[str]] = None):
+        '''
+        Parse "[v1,v2,...]" (integer or float components) into a VectorMetric
+        '''
+        array = array_as_string.strip()[1:-1].split(",")
+        if len(array) == 0 or array[0].strip() == "":
+            raise Exception(f"Array contains zero metrics {array_as_string}.")
+        return VectorMetric([float(element) for element in array], names)
 
-    def __repr__(self):
-        return self.__str__()
+    @staticmethod
+    def from_components(components, names: Optional[List[str]] = None):
+        '''
+        Inverse of components(): build the metric of the numeric components
+        '''
+        return VectorMetric(components, names)
 
-    def get_value(self):
-        return self._value
+    @staticmethod
+    def mean(metrics: List[Metric]) -> Metric:
+        '''
+        Mean of metrics, computed in one vectorized operation on their components
+        '''
+        return VectorMetric(VectorMetric.stack(metrics).mean(axis=0), getattr(metrics[0], "names", None))
 
 
 @dataclass
-class Tuple2Metric(Metric):
+class VectorMetric(Metric):
+    '''
+    Metric of any number of float components, optionally named, stored in a NumPy array.
+
+    A metric is lower (greater) than another one if all its components are lower (greater). It is written as
+    "[v1,v2,...]", integral components without decimals, so the metrics of the integer timings of the applications are
+    written as they are read.
+    '''
 
-    def __init__(self, v1: Metric, v2: Metric):
+    def __init__(self, values, names: Optional[List[str]] = None):
         super().__init__()
-        self._v1 = v1
-        self._v2 = v2
+        self._values = np.array(values, dtype=np.float64).reshape(-1)
+        if names is not None and len(names) != len(self._values):
+            raise Exception(f"{len(names)} names for the {len(self._values)} components of the metric {self}.")
+        self.names = names
 
-    def __gt__(self, other: Tuple2Metric) -> bool:
+    def __gt__(self, other: Metric) -> bool:
         '''Return true if self > other'''
-        return (self._v1 > other._v1) and (self._v2 > other._v2)
+        return bool(np.all(self._values > VectorMetric._values_of(other)))
 
-    def __ge__(self, other: Tuple2Metric) -> bool:
+    def __ge__(self, other: Metric) -> bool:
         '''Return true if self >= other'''
-        return (self._v1 >= other._v1) and (self._v2 >= other._v2)
+        return bool(np.all(self._values >= VectorMetric._values_of(other)))
 
-    def __lt__(self, other: Tuple2Metric) -> bool:
+    def __lt__(self, other: Metric) -> bool:
         '''Return true if self < other'''
-        return (self._v1 < other._v1) and (self._v2 < other._v2)
+        return bool(np.all(self._values < VectorMetric._values_of(other)))
 
-    def __le__(self, other: Tuple2Metric) -> bool:
+    def __le__(self, other: Metric) -> bool:
         '''Return true if self <= other'''
-        return (self._v1 <= other._v1) and (self._v2 <= other._v2)
+        return bool(np.all(self._values <= VectorMetric._values_of(other)))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Metric) and np.array_equal(self._values, VectorMetric._values_of(other))
 
-    def __add__(self, other: Tuple2Metric) -> Tuple2Metric:
-        return Tuple2Metric(self._v1 + other._v1, self._v2 + other._v2)
+    def __add__(self, other: Metric) -> VectorMetric:
+        return VectorMetric(self._values + VectorMetric._values_of(other), self.names)
 
-    def __iadd__(self, other: Tuple2Metric):
-        self._v1 += other._v1
-        self._v2 += other._v2
+    def __iadd__(self, other: Metric):
+        self._values += VectorMetric._values_of(other)
         return self
 
-    def __truediv__(self, num: int) -> Tuple2Metric:
-        return Tuple2Metric(self._v1 / num, self._v2 / num)
+    def __truediv__(self, num: int) -> VectorMetric:
+        return VectorMetric(self._values / num, self.names)
 
     def __str__(self) -> str:
-        return f"[{self._v1.get_value()},{self._v2.get_value()}]"
+        return f"[{','.join(np.format_float_positional(value, trim='-') for value in self._values)}]"
 
     def __repr__(self):
         return self.__str__()
 
+    def __len__(self):
+        return len(self._values)
+
     def get_value(self):
         return self
 
+    def get(self, name: str) -> float:
+        '''Return the component named name'''
+        if self.names is None or name not in self.names:
+            raise KeyError(f"The metric {self} has no component named {name}.")
+        return float(self._values[self.names.index(name)])
 
-@dataclass
-class Tuple3Metric(Metric):
-
-    def __init__(self, v1: Metric, v2: Metric, v3: Metric):
-        super().__init__()
-        self._v1 = v1
-        self._v2 = v2
-        self._v3 = v3
-
-    def __gt__(self, other: Tuple3Metric) -> bool:
-        '''Return true if self > other'''
-        return (self._v1 > other._v1) and (self._v2 > other._v2) and (self._v3 > other._v3)
-
-    def __ge__(self, other: Tuple3Metric) -> bool:
-        '''Return true if self >= other'''
-        return (self._v1 >= other._v1) and (self._v2 >= other._v2) and (self._v3 >= other._v3)
-
-    def __lt__(self, other: Tuple3Metric) -> bool:
-        '''Return true if self < other'''
-        return (self._v1 < other._v1) and (self._v2 < other._v2) and (self._v3 < other._v3)
-
-    def __le__(self, other: Tuple3Metric) -> bool:
-        '''Return true if self <= other'''
-        return (self._v1 <= other._v1) and (self._v2 <= other._v2) and (self._v3 <= other._v3)
-
-    def __add__(self, other: Tuple3Metric) -> Tuple3Metric:
-        return Tuple3Metric(self._v1 + other._v1, self._v2 + other._v2, self._v3 + other._v3)
-
-    def __iadd__(self, other: Tuple3Metric):
-        self._v1 += other._v1
-        self._v2 += other._v2
-        self._v3 += other._v3
-        return self
-
-    def __truediv__(self, num: int) -> Tuple3Metric:
-        return Tuple3Metric(self._v1 / num, self._v2 / num, self._v3 / num)
+    def components(self) -> List[float]:
+        return self._values.tolist()
 
-    def __str__(self) -> str:
-        return f"[{self._v1.get_value()},{self._v2.get_value()},{self._v3.get_value()}]"
+    def to_numpy(self) -> np.ndarray:
+        return self._values
 
-    def __repr__(self):
-        return self.__str__()
+    @staticmethod
+    def _values_of(metric: Metric) -> np.ndarray:
+        return metric._values if isinstance(metric, VectorMetric) else np.array(metric.components(), dtype=np.float64)
 
-    def get_value(self):
-        return self
+    @staticmethod
+    def stack(metrics: List[Metric]) -> np.ndarray:
+        '''
+        Components of metrics, one row per metric
+        '''
+        return np.stack([VectorMetric._values_of(metric) for metric in metrics])
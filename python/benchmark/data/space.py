@@ -0,0 +1,150 @@
+from typing import List
+from execo_engine import HashableDict
+import random
+
+
+class ConfigurationSpace:
+    '''
+    Lazy cartesian product of the values of the application parameters.
+
+    The space is stored as one value table per parameter. Every configuration is addressed by a mixed-radix integer
+    index, whose digits are the positions of the bound values in the value tables (the first key is the most
+    significant digit). Configurations are decoded into HashableDicts on demand only, so the product is never
+    materialized.
+    '''
+
+    def __init__(self, parameters_dict: dict, keys: List[str] = None):
+        # str -> List[str], the order of its keys is the order of the keys in the decoded configurations
+        self.parameters_dict = parameters_dict
+
+        # order of the digits in the index, the most significant first
+        self.keys = list(parameters_dict.keys()) if keys is None else list(keys)
+        if sorted(self.keys) != sorted(parameters_dict.keys()):
+            raise ValueError(f"Keys {self.keys} do not match the parameters {list(parameters_dict.keys())}.")
+
+        self._values = [list(parameters_dict[key]) for key in self.keys]
+        self._value_index = [{value: digit for digit, value in enumerate(values)} for values in self._values]
+        self._radices = [len(values) for values in self._values]
+        self._positions = {key: position for position, key in enumerate(self.keys)}
+        # digit positions in the order of the keys of the decoded configurations
+        self._output_positions = [self._positions[key] for key in parameters_dict.keys()]
+
+        # stride of a digit: number of consecutive indexes sharing the same value of the parameter
+        self._strides = [1] * len(self.keys)
+        for position in range(len(self.keys) - 2, -1, -1):
+            self._strides[position] = self._strides[position + 1] * self._radices[position + 1]
+        self._size = self._strides[0] * self._radices[0] if len(self.keys) > 0 else 1
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index: int) -> HashableDict:
+        return self.decode(index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self.decode(index)
+
+    def __contains__(self, config: dict) -> bool:
+        try:
+            self.index_of(config)
+            return True
+        except KeyError:
+            return False
+
+    def digits(self, index: int) -> List[int]:
+        '''
+        Return the position of the bound value of each parameter, in the order of keys
+        '''
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError(f"Configuration index {index} is out of the space of size {self._size}.")
+
+        res = []
+        for stride, radix in zip(self._strides, self._radices):
+            res.append((index // stride) % radix)
+        return res
+
+    def decode(self, index: int) -> HashableDict:
+        digits = self.digits(index)
+        config = HashableDict()
+        for key, position in zip(self.parameters_dict.keys(), self._output_positions):
+            config[key] = self._values[position][digits[position]]
+        return config
+
+    def index_of(self, config: dict) -> int:
+        '''
+        Encode a configuration into its index, raise a KeyError if it is not in the space
+        '''
+        index = 0
+        for position, key in enumerate(self.keys):
+            value = config[key]
+            if value not in self._value_index[position]:
+                raise KeyError(f"Value {value} of {key} is not in the configuration space.")
+            index += self._value_index[position][value] * self._strides[position]
+        return index
+
+    @property
+    def radices(self) -> List[int]:
+        '''Number of values of each parameter, in the order of keys'''
+        return self._radices
+
+    @property
+    def strides(self) -> List[int]:
+        '''Index stride of each parameter, in the order of keys'''
+        return self._strides
+
+    def position_of(self, key: str) -> int:
+        '''Position of the digit of key in the index, raise a KeyError if key is not a parameter'''
+        if key not in self._positions:
+            raise KeyError(f"Parameter {key} is not in the configuration space.")
+        return self._positions[key]
+
+    def digit_of(self, key: str, value: str):
+        '''Position of value in the value table of key, None if the parameter cannot have this value'''
+        return self._value_index[self.position_of(key)].get(value, None)
+
+    def value_of(self, index: int, key: str) -> str:
+        position = self._positions[key]
+        digit = (index // self._strides[position]) % self._radices[position]
+        return self._values[position][digit]
+
+    def matches(self, index: int, subdictionary: dict) -> bool:
+        '''
+        Return true if the configuration at index contains subdictionary
+        '''
+        for key, value in subdictionary.items():
+            if (key not in self._positions) or (self.value_of(index, key) != value):
+                return False
+        return True
+
+    def sample(self, k: int = 1, rng: random.Random = None) -> List[int]:
+        '''
+        Draw k distinct configuration indexes uniformly at random
+        '''
+        rng = random if rng is None else rng
+        return rng.sample(range(self._size), k)
+
+    def restrict(self, prefix: dict) -> range:
+        '''
+        Return the indexes of the configurations that start with prefix.
+        The prefix must bind the leading keys of the space, so that its configurations are a contiguous index range.
+        '''
+        start = 0
+        for position, key in enumerate(self.keys[:len(prefix)]):
+            if key not in prefix:
+                raise ValueError(f"Prefix {prefix} does not bind the leading keys {self.keys[:len(prefix)]}.")
+            value = prefix[key]
+            if value not in self._value_index[position]:
+                return range(0)
+            start += self._value_index[position][value] * self._strides[position]
+
+        length = self._strides[len(prefix) - 1] if len(prefix) > 0 else self._size
+        return range(start, start + length)
+
+    def __str__(self):
+        return f"ConfigurationSpace({self.parameters_dict}, size={self._size})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,200 @@
+from benchmark.data.metric import Metric
+from statistics import NormalDist
+from typing import List, Tuple
+import numpy as np
+import math, re
+
+
+def student_t_quantile(p: float, df: int) -> float:
+    '''
+    Quantile of the Student's t-distribution: exact for 1 and 2 degrees of freedom, Cornish-Fisher expansion of the
+    normal quantile otherwise (Abramowitz and Stegun 26.7.5)
+    '''
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+    z = NormalDist().inv_cdf(p)
+    return (z
+            + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * df ** 4))
+
+
+def mser_truncation(series: List[float]) -> int:
+    '''
+    Number of initial observations of series to discard as warm-up, with the MSER rule (White, 1997): the truncation
+    point minimizes the squared standard error of the mean of the remaining observations. Only the first half of the
+    series is considered, so the mean is always taken on at least half of the observations.
+    '''
+    n = len(series)
+    best_truncation, best_mser = 0, math.inf
+    # suffix sums, from the last observation backwards
+    total, total_squares = 0.0, 0.0
+    msers = [math.inf] * n
+    for d in range(n - 1, -1, -1):
+        total += series[d]
+        total_squares += series[d] ** 2
+        remaining = n - d
+        squared_deviations = max(total_squares - total * total / remaining, 0.0)
+        msers[d] = squared_deviations / remaining ** 2
+    for d in range((n + 1) // 2):
+        # strict comparison: the earliest truncation point wins a tie
+        if msers[d] < best_mser:
+            best_truncation, best_mser = d, msers[d]
+    return best_truncation
+
+
+def series_steady_state_start(series: np.ndarray) -> int:
+    '''
+    Index of the first iteration of the steady state of a series of metric components (one row per iteration): the
+    largest MSER truncation point of the components
+    '''
+    if len(series) < 3:
+        return 0
+    return max(mser_truncation(component) for component in series.T.tolist())
+
+
+class ScoreStatistics:
+    '''
+    Running aggregates of the metrics recorded for one configuration.
+
+    The sum of each metric component is kept, and the mean metric is built from the sums, so it has the same type
+    (and rounding) as the sum of the Metrics divided by their number. The mean and the sum of squared deviations (M2) of
+    each metric component are updated with Welford's algorithm.
+    '''
+
+    def __init__(self):
+        self.count: int = 0
+        self.sum: List[float] = []
+        self.mean: List[float] = []
+        self.m2: List[float] = []
+
+    def add(self, metric: Metric):
+        self.add_components(metric.components())
+
+    def add_components(self, components: List[float]):
+        self.count += 1
+        if self.count == 1:
+            self.sum = list(components)
+            self.mean = [float(component) for component in components]
+            self.m2 = [0.0] * len(components)
+        else:
+            for i, component in enumerate(components):
+                self.sum[i] += component
+                delta = component - self.mean[i]
+                self.mean[i] += delta / self.count
+                self.m2[i] += delta * (component - self.mean[i])
+
+    def get_mean(self) -> Metric:
+        if self.count == 0:
+            raise KeyError("No metric was recorded.")
+        return Metric.from_components(self.sum) / self.count
+
+    def variance(self) -> List[float]:
+        '''Sample variance of each metric component'''
+        if self.count < 2:
+            return [0.0] * len(self.m2)
+        return [m2 / (self.count - 1) for m2 in self.m2]
+
+    def half_width(self, confidence: float = 0.95) -> List[float]:
+        '''Half-width of the confidence interval of the mean of each metric component, infinite below two metrics'''
+        if self.count < 2:
+            return [math.inf] * len(self.m2)
+        t = student_t_quantile(0.5 + confidence / 2, self.count - 1)
+        return [t * math.sqrt(variance / self.count) for variance in self.variance()]
+
+    def relative_half_width(self, confidence: float = 0.95) -> float:
+        '''Largest half-width of the confidence intervals relative to the mean of the component'''
+        res = 0.0
+        for half_width, mean in zip(self.half_width(confidence), self.mean):
+            if half_width == 0:
+                continue
+            res = max(res, math.inf if mean == 0 else half_width / abs(mean))
+        return res
+
+    @staticmethod
+    def from_aggregates(count: int, sum: List[float], mean: List[float], m2: List[float]):
+        res = ScoreStatistics()
+        res.count = count
+        res.sum = sum
+        res.mean = mean
+        res.m2 = m2
+        return res
+
+    @staticmethod
+    def of(metrics: List[Metric]):
+        res = ScoreStatistics()
+        for metric in metrics:
+            res.add(metric)
+        return res
+
+
+class Aggregator:
+    '''
+    Statistic that summarizes the metrics of a configuration, computed for each component over the history of the
+    metrics (a NumPy array with one row per metric): "mean" (default), "median", a percentile "p<q>" (e.g. "p90",
+    "p99"), "trimmed_mean" (mean without the TRIM_PROPORTION lowest and highest metrics) or "bootstrap" (the mean,
+    with a bootstrap confidence interval).
+
+    The confidence interval of the mean is the Student's t interval, the intervals of the other statistics are bootstrap
+    percentile intervals. The resamples are drawn from a fixed seed, so the intervals are reproducible.
+    '''
+    MEAN = "mean"
+    MEDIAN = "median"
+    TRIMMED_MEAN = "trimmed_mean"
+    BOOTSTRAP = "bootstrap"
+    NAMES = (MEAN, MEDIAN, TRIMMED_MEAN, BOOTSTRAP, "p<q>")
+
+    # share of the lowest and of the highest metrics discarded by the trimmed mean
+    TRIM_PROPORTION = 0.1
+    # number of resamples of the bootstrap intervals
+    BOOTSTRAP_RESAMPLES = 1000
+    _BOOTSTRAP_SEED = 0
+
+    def __init__(self, name: str = MEAN):
+        percentile = re.fullmatch(r"p(\d+(\.\d+)?)", name)
+        if name not in Aggregator.NAMES[:-1] and (percentile is None or float(percentile.group(1)) > 100):
+            raise Exception(f"Unknown aggregator {name}, expected one of {Aggregator.NAMES}.")
+        self.name = name
+        self._percentile = float(percentile.group(1)) if percentile is not None else None
+
+    def is_mean(self) -> bool:
+        '''True if the statistic is the mean, which is maintained incrementally by ScoreStatistics'''
+        return self.name in (Aggregator.MEAN, Aggregator.BOOTSTRAP)
+
+    def aggregate(self, values: np.ndarray) -> np.ndarray:
+        '''
+        Statistic of each component of values (one row per metric), or of each resample of values (one matrix per
+        resample)
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        if self.is_mean():
+            return values.mean(axis=-2)
+        if self.name == Aggregator.MEDIAN:
+            return np.median(values, axis=-2)
+        if self.name == Aggregator.TRIMMED_MEAN:
+            trimmed = int(values.shape[-2] * Aggregator.TRIM_PROPORTION)
+            return np.sort(values, axis=-2)[..., trimmed:values.shape[-2] - trimmed, :].mean(axis=-2)
+        return np.percentile(values, self._percentile, axis=-2)
+
+    def interval(self, values: np.ndarray, confidence: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Bounds of the confidence interval of the statistic of each component, the statistic itself below two metrics
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        statistic = self.aggregate(values)
+        n = values.shape[0]
+        if n < 2:
+            return statistic, statistic
+        if self.name == Aggregator.MEAN:
+            t = student_t_quantile(0.5 + confidence / 2, n - 1)
+            half_width = t * values.std(axis=0, ddof=1) / math.sqrt(n)
+            return statistic - half_width, statistic + half_width
+
+        rng = np.random.default_rng(Aggregator._BOOTSTRAP_SEED)
+        resamples = values[rng.integers(0, n, size=(Aggregator.BOOTSTRAP_RESAMPLES, n))]
+        statistics = self.aggregate(resamples)
+        alpha = (1 - confidence) / 2
+        return np.quantile(statistics, alpha, axis=0), np.quantile(statistics, 1 - alpha, axis=0)
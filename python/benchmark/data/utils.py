@@ -1,43 +1,69 @@
 from abc import ABC
-from typing import final, List
+from typing import final, List, Union
 from execo_engine import HashableDict
 from pathlib import Path
-from benchmark.data.config import ApplicationParameterConstraint
+from benchmark.data.config import ApplicationParameterConstraint, ConstraintType
+from benchmark.data.constraint import CompiledConstraints
+from benchmark.data.space import ConfigurationSpace
 
 
 @final
 class ConstraintUtil(ABC):
 
     @staticmethod
-    def filter_valid_configs(configs: List[HashableDict], constraints: List[ApplicationParameterConstraint]):
+    def filter_valid_configs(configs: Union[List[HashableDict], ConfigurationSpace],
+                             constraints: List[ApplicationParameterConstraint], prefix: dict = None):
+        '''
+        Return the valid configurations of a list, or the indexes (array of int) of the valid configurations of a
+        ConfigurationSpace. The configurations of a ConfigurationSpace are restricted to the ones that start with prefix
+        if it is set, see ConfigurationSpace.restrict.
+        '''
+        if isinstance(configs, ConfigurationSpace):
+            return ConstraintUtil.compile(configs, constraints).valid_indexes(prefix)
         merged_constraints = ConstraintUtil._merge_constraints(constraints)
         return [config for config in configs if ConstraintUtil._is_config_valid(config, merged_constraints)]
 
+    @staticmethod
+    def compile(space: ConfigurationSpace, constraints: List[ApplicationParameterConstraint]) -> CompiledConstraints:
+        return CompiledConstraints(space, ConstraintUtil._merge_constraints(constraints))
+
     @staticmethod
     def _merge_constraints(constraints: List[ApplicationParameterConstraint]):
         # dict: constraint_source -> {parameter_name: [values]}
-        # constraint_source: ParameterBinding (name+value) that triggers the constraint.
+        # constraint_source: ParameterBinding (name+value) and ConstraintType that triggers the constraint.
         # saved_targets ({parameter_name: [values]}): a dictionary of parameter names and a list of values the
-        #                                             corresponding parameter is allowed to have
+        #                                             corresponding parameter is allowed (MUST) or not allowed
+        #                                             (FORBIDDEN) to have
+        # the constraints of the same source are merged: the values allowed by all of them (MUST), or forbidden by
+        # any of them (FORBIDDEN)
         merged_constraints = dict()
         for constraint in constraints:
             constraint_source = HashableDict()
             constraint_source["name"] = constraint.source.name
             constraint_source["value"] = constraint.source.value
+            constraint_source["type"] = constraint.get_type()
 
-            merged_targets = {}
-            merged_constraints[constraint_source] = merged_targets
-
+            targets = {}
             for target in constraint.targets:
                 target_name = target.name
                 # it's a contradiction if target_name == source_name, because value is already bound to source_value
                 if target_name == constraint_source["name"]:
                     continue
                 # if we have not seen this parameter name before
-                if target_name not in merged_targets:
-                    merged_targets[target_name] = list()
+                if target_name not in targets:
+                    targets[target_name] = list()
                 # save the value that is allowed for this parameter
-                merged_targets[target_name].append(target.value)
+                targets[target_name].append(target.value)
+
+            merged_targets = merged_constraints.setdefault(constraint_source, dict())
+            for target_name, values in targets.items():
+                if target_name not in merged_targets:
+                    merged_targets[target_name] = values
+                elif constraint_source["type"] == ConstraintType.MUST:
+                    merged_targets[target_name] = [value for value in merged_targets[target_name] if value in values]
+                else:
+                    merged_targets[target_name] += [value for value in values
+                                                    if value not in merged_targets[target_name]]
         return merged_constraints
 
     @staticmethod
@@ -45,8 +71,9 @@ class ConstraintUtil(ABC):
         for constraint_source, constraint_targets in constraints.items():
             source_name = constraint_source["name"]
             if config[source_name] == constraint_source["value"]:
+                must = constraint_source["type"] == ConstraintType.MUST
                 for target_name, target_values in constraint_targets.items():
-                    if config[target_name] not in target_values:
+                    if (config[target_name] in target_values) != must:
                         return False
         return True
 
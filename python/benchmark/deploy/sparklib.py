@@ -1,7 +1,9 @@
-import subprocess, os, multiprocessing, time
+import asyncio, csv, importlib.util, subprocess, os, multiprocessing, signal, threading, time
 from enoslib import *
 from enoslib.infra.enos_g5k.g5k_api_utils import get_api_username
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional
 
 
 class ClusterReserver(ABC):
@@ -235,6 +237,53 @@ class SparkSubmit(ABC):
             path_err:
                 Path to the file the error output will be printed in.
         """
+        str_spark_args, str_java_args = self._format_arguments(spark_args, java_args)
+
+        # Submit the application to the cluster
+        print("Submitting Spark application to the cluster.")
+        return self._on_submit(path_jar, classname, str_spark_args, str_java_args, path_metrics_csv, path_log, path_err)
+
+    async def submit_with_log_async(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                                    path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                                    path_err: str = "/tmp/out.err"):
+        """
+        Coroutine of submit_with_log: it waits for the Spark job without blocking the event loop, so that other
+        coroutines run while the job is running. Same arguments as submit_with_log.
+        """
+        str_spark_args, str_java_args = self._format_arguments(spark_args, java_args)
+
+        # Submit the application to the cluster
+        print("Submitting Spark application to the cluster.")
+        return await self._on_submit_async(path_jar, classname, str_spark_args, str_java_args, path_metrics_csv,
+                                           path_log, path_err)
+
+    def submit_with_result(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                           path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                           path_err: str = "/tmp/out.err") -> "SubmissionResult":
+        """
+        submit_with_log, returning the exit code and the wall time of the submission along with the metrics CSV path.
+        Same arguments as submit_with_log.
+        """
+        start = time.monotonic()
+        path = self.submit_with_log(path_jar, classname, spark_args, java_args, path_metrics_csv, path_log, path_err)
+        return SubmissionResult(path, 0 if path is not None else None, time.monotonic() - start)
+
+    async def submit_with_result_async(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                                       path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                                       path_err: str = "/tmp/out.err") -> "SubmissionResult":
+        """
+        Coroutine of submit_with_result.
+        """
+        start = time.monotonic()
+        path = await self.submit_with_log_async(path_jar, classname, spark_args, java_args, path_metrics_csv,
+                                                path_log, path_err)
+        return SubmissionResult(path, 0 if path is not None else None, time.monotonic() - start)
+
+    @staticmethod
+    def _format_arguments(spark_args, java_args):
+        """
+        Return the Spark arguments and the Java arguments (of the Jar) as single string values
+        """
         # java_args and spark_args default values
         if java_args is None:
             java_args = {}
@@ -253,10 +302,7 @@ class SparkSubmit(ABC):
         str_java_args = ""
         for arg, value in java_args.items():
             str_java_args += f"{arg} {value} "
-
-        # Submit the application to the cluster
-        print("Submitting Spark application to the cluster.")
-        return self._on_submit(path_jar, classname, str_spark_args, str_java_args, path_metrics_csv, path_log, path_err)
+        return str_spark_args, str_java_args
 
     def submit(self, path_jar: str, classname: str, path_metrics_csv: str, spark_args=None, java_args=None):
         """ Submit a Spark job on the cluster.
@@ -280,10 +326,25 @@ class SparkSubmit(ABC):
         return self.submit_with_log(path_jar, classname, spark_args, java_args, path_metrics_csv,
                                     SparkSubmit._NO_PATHLOG, SparkSubmit._NO_PATHERR)
 
-    @abstractmethod
     def _on_submit(self, path_jar: str, classname: str, spark_args: str, java_args: str, path_metrics_csv: str,
                    path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
-        pass
+        """
+        Submit with the arguments formatted as strings by _format_arguments. The subclasses that submit from an
+        argument vector (LocalSparkSubmit) override submit_with_log instead.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not submit from formatted arguments.")
+
+    async def _on_submit_async(self, path_jar: str, classname: str, spark_args: str, java_args: str,
+                               path_metrics_csv: str, path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
+        """
+        By default, the blocking _on_submit runs in a worker thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._on_submit, path_jar, classname, spark_args,
+                                                                java_args, path_metrics_csv, path_log, path_err)
+
+    @property
+    def _shell_set_java_cmd(self):
+        return f"JAVA_HOME={self._java} " if self._isSetJava else ""
 
     @abstractmethod
     def _on_start(self):
@@ -298,6 +359,12 @@ class LocalSparkSubmit(SparkSubmit):
     """
     SparkSubmit to deploy Spark applications on Spark clusters running on localhost.
 
+    spark-submit is started from its argument vector (see SparkSubmission), its output is written straight to path_log
+    and path_err. A submission running for longer than timeout seconds is killed, and the running submissions can be
+    cancelled. submit_with_result also returns the exit code and the wall time of the submission. The coroutines
+    (submit_with_result_async, ...) run spark-submit as an asyncio subprocess (AsyncSparkSubmission), so the running
+    submissions do not hold a thread each.
+
     Methods:
         setJavaPath, setSparkPath,
         start, stop,
@@ -327,8 +394,12 @@ class LocalSparkSubmit(SparkSubmit):
 
     __java_home_backup = None  # Original value of the JAVA_HOME environmental variable
 
-    def __init__(self):
+    def __init__(self, timeout: float = None):
         super().__init__()
+        # wall-clock timeout of a submission in seconds, none by default
+        self.timeout = timeout
+        self._submissions = set()
+        self._lock = threading.Lock()
 
     def _set_java_home(self):
         if not self._isSetJava:
@@ -370,51 +441,426 @@ class LocalSparkSubmit(SparkSubmit):
         process = subprocess.run(command, shell=True, capture_output=True, check=True)
 
     def _on_stop(self):
+        self.cancel()
         self._master_spark_process.terminate()
         self._worker_spark_process.terminate()
 
-    def _on_submit(self, path_jar: str, classname: str, spark_args: str, java_args: str, path_metrics_csv: str,
-                   path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
+    def submit_with_log(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                        path_metrics_csv: str = None, path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
+        return self.submit_with_result(path_jar, classname, spark_args, java_args, path_metrics_csv, path_log,
+                                       path_err).path_metrics_csv
+
+    async def submit_with_log_async(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                                    path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                                    path_err: str = "/tmp/out.err"):
+        result = await self.submit_with_result_async(path_jar, classname, spark_args, java_args, path_metrics_csv,
+                                                     path_log, path_err)
+        return result.path_metrics_csv
+
+    def submit_with_result(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                           path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                           path_err: str = "/tmp/out.err") -> "SubmissionResult":
+        print("Submitting Spark application to the cluster.")
+        submission = self.start_submission(path_jar, classname, spark_args, java_args, path_metrics_csv, path_log,
+                                           path_err)
+        if submission is None:
+            return SubmissionResult(None, None, 0.0)
+        return self._finish_submission(submission, submission.wait(self.timeout))
+
+    async def submit_with_result_async(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                                       path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                                       path_err: str = "/tmp/out.err") -> "SubmissionResult":
         """
-       Submit a Spark job on the cluster using files as output.
-
-       Args:
-           path_jar:
-               Path to the program as a jar file.
-           classname:
-               Main class to execute in path_jar.
-           spark_args:
-               A string of Spark arguments.
-           java_args:
-               A string of Java arguments for the main program.
-           path_metrics_csv:
-               Path of the metrics CSV.
-           path_log:
-               Path to the file the standard output will be printed in.
-           path_err:
-               Path to the file the error output will be printed in.
-       """
+        Coroutine of submit_with_result: spark-submit runs as an asyncio subprocess, so waiting for it does not block
+        a thread
+        """
+        print("Submitting Spark application to the cluster.")
+        argv = self._argv(path_jar, classname, spark_args, java_args)
         try:
-            self._set_java_home()
-            shell_out_log = f"> {path_log}" if path_log != SparkSubmit._NO_PATHLOG else ""
-            shell_out_err = f"2> {path_err}" if path_log != SparkSubmit._NO_PATHERR else ""
-            cmd = f"{self._spark}bin/spark-submit --master spark://localhost:7077 {spark_args} " + \
-                  f"--class {classname} {path_jar} {java_args} {shell_out_log} {shell_out_err}"
-            process = subprocess.run(cmd, shell=True, capture_output=True, check=True)
-            print(f"Returning metrics CSV local path: {path_metrics_csv}")
-            return path_metrics_csv
-        except Exception as e:
+            submission = await AsyncSparkSubmission.start(argv, path_metrics_csv, path_log, path_err, self._env())
+        except OSError as e:
             print(e)
-            print("Check application logs, because an exception might have occurred.")
+            print("spark-submit could not be started, check SPARK_HOME.")
+            return SubmissionResult(None, None, 0.0)
+        with self._lock:
+            self._submissions.add(submission)
+        try:
+            result = await submission.wait(self.timeout)
+        except asyncio.CancelledError:
+            submission.cancel()
+            with self._lock:
+                self._submissions.discard(submission)
+            raise
+        return self._finish_submission(submission, result)
+
+    def start_submission(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                         path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                         path_err: str = "/tmp/out.err") -> Optional["SparkSubmission"]:
+        """
+        Start spark-submit without waiting for the application, see submit_with_log. Return the handle of the
+        submission, None if spark-submit could not be started.
+        """
+        argv = self._argv(path_jar, classname, spark_args, java_args)
+        try:
+            submission = SparkSubmission(argv, path_metrics_csv, path_log, path_err, self._env())
+        except OSError as e:
+            print(e)
+            print("spark-submit could not be started, check SPARK_HOME.")
             return None
+        with self._lock:
+            self._submissions.add(submission)
+        return submission
+
+    def cancel(self):
+        """
+        Cancel the running submissions
+        """
+        with self._lock:
+            submissions = list(self._submissions)
+        for submission in submissions:
+            submission.cancel()
+
+    def _argv(self, path_jar: str, classname: str, spark_args: Optional[dict], java_args: Optional[dict]) -> List[str]:
+        """
+        Argument vector of spark-submit
+        """
+        spark_argv, java_argv = [], []
+        for arg, value in (spark_args or {}).items():
+            spark_argv += [arg if arg[0: 2] == "--" else f"--{arg}", str(value)]
+        for arg, value in (java_args or {}).items():
+            # an argument without name is positional
+            java_argv += [arg, str(value)] if arg != "" else [str(value)]
+        return [f"{self._spark}bin/spark-submit", "--master", "spark://localhost:7077", *spark_argv,
+                "--class", classname, path_jar, *java_argv]
+
+    def _env(self) -> Optional[dict]:
+        # JAVA_HOME is set for the process only, so that applications can be submitted from several threads
+        return dict(os.environ, JAVA_HOME=self._java) if self._isSetJava else None
+
+    def _finish_submission(self, submission: "SparkSubmission", result: "SubmissionResult") -> "SubmissionResult":
+        with self._lock:
+            self._submissions.discard(submission)
+        if result.path_metrics_csv is not None:
+            print(f"Returning metrics CSV local path: {result.path_metrics_csv}")
+            return result
+        if result.timed_out:
+            print(f"The application was killed after the timeout of {self.timeout}s.")
+        elif result.cancelled:
+            print("The application was cancelled.")
+        else:
+            print(f"spark-submit exited with code {result.return_code}.")
+        print("Check application logs, because an exception might have occurred.")
+        return result
+
+
+@dataclass
+class SubmissionResult:
+    """
+    Outcome of a spark-submit: the metrics CSV path (None if the application failed), the exit code (None if it is
+    unknown) and the wall time in seconds
+    """
+    path_metrics_csv: Optional[str]
+    return_code: Optional[int]
+    wall_time: float
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+class SparkSubmission:
+    """
+    Handle of a running spark-submit process. The process is started from its argument vector, without a shell, and
+    its standard output and error are streamed straight to the log files (discarded for the _NO_PATHLOG path). It runs
+    in its own process group, so that cancelling it also stops the processes it started.
+    """
+
+    # seconds between the termination of a cancelled submission and its kill
+    _CANCEL_GRACE = 10
+
+    def __init__(self, argv: List[str], path_metrics_csv: str, path_log: str, path_err: str, env: dict = None):
+        self._open(argv, path_metrics_csv, path_log, path_err)
+        try:
+            self._process = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=self._log, stderr=self._err,
+                                             env=env, start_new_session=True)
+        except OSError:
+            self._close_logs()
+            raise
+
+    def _open(self, argv: List[str], path_metrics_csv: str, path_log: str, path_err: str):
+        self.argv = argv
+        self.path_metrics_csv = path_metrics_csv
+        self._log = self._open_log(path_log)
+        self._err = self._open_log(path_err)
+        self._timed_out = False
+        self._cancelled = False
+        self._start = time.monotonic()
+
+    def poll(self) -> Optional[int]:
+        """
+        Exit code of spark-submit, None if it is still running
+        """
+        return self._process.poll()
+
+    def wait(self, timeout: float = None) -> SubmissionResult:
+        """
+        Wait for spark-submit, at most timeout seconds: it is cancelled after the timeout
+        """
+        try:
+            return_code = self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._timed_out = True
+            self.cancel()
+            return_code = self._process.wait()
         finally:
-            if path_log != "":
-                cmd = f"mv {path_log} ~"
-                process = subprocess.run(cmd, shell=True, capture_output=True, check=True)
-            if path_err != "":
-                cmd = f"mv {path_err} ~"
-                process = subprocess.run(cmd, shell=True, capture_output=True, check=True)
-            self._restore_java_home()
+            wall_time = time.monotonic() - self._start
+            self._close_logs()
+        return self._result(return_code, wall_time)
+
+    def _result(self, return_code: int, wall_time: float) -> SubmissionResult:
+        failed = return_code != 0 or self._timed_out or self._cancelled
+        return SubmissionResult(None if failed else self.path_metrics_csv, return_code, wall_time, self._timed_out,
+                                self._cancelled and not self._timed_out)
+
+    def cancel(self):
+        """
+        Terminate spark-submit (kill it if it is still running after a grace period)
+        """
+        if self._process.poll() is not None:
+            return
+        self._cancelled = True
+        try:
+            os.killpg(self._process.pid, signal.SIGTERM)
+            self._process.wait(SparkSubmission._CANCEL_GRACE)
+        except subprocess.TimeoutExpired:
+            os.killpg(self._process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _open_log(path: str):
+        if path in ("", SparkSubmit._NO_PATHLOG):
+            return subprocess.DEVNULL
+        return open(path, "wb")
+
+    def _close_logs(self):
+        for log in (self._log, self._err):
+            if log is not subprocess.DEVNULL:
+                log.close()
+
+
+class AsyncSparkSubmission(SparkSubmission):
+    """
+    SparkSubmission of an asyncio subprocess, started with the start coroutine: waiting for it does not block a thread.
+    A cancelled submission is killed by the event loop after the grace period.
+    """
+
+    def __init__(self, argv: List[str], path_metrics_csv: str, path_log: str, path_err: str):
+        # the process is started by start
+        self._open(argv, path_metrics_csv, path_log, path_err)
+        self._process = None
+        self._loop = None
+
+    @staticmethod
+    async def start(argv: List[str], path_metrics_csv: str, path_log: str, path_err: str,
+                    env: dict = None) -> "AsyncSparkSubmission":
+        res = AsyncSparkSubmission(argv, path_metrics_csv, path_log, path_err)
+        try:
+            res._process = await asyncio.create_subprocess_exec(*argv, stdin=subprocess.DEVNULL, stdout=res._log,
+                                                                stderr=res._err, env=env, start_new_session=True)
+        except OSError:
+            res._close_logs()
+            raise
+        res._loop = asyncio.get_running_loop()
+        return res
+
+    def poll(self) -> Optional[int]:
+        return self._process.returncode
+
+    async def wait(self, timeout: float = None) -> SubmissionResult:
+        """
+        Wait for spark-submit, at most timeout seconds: it is cancelled after the timeout
+        """
+        try:
+            return_code = await asyncio.wait_for(self._process.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out = True
+            self.cancel()
+            return_code = await self._process.wait()
+        finally:
+            wall_time = time.monotonic() - self._start
+            self._close_logs()
+        return self._result(return_code, wall_time)
+
+    def cancel(self):
+        """
+        Terminate spark-submit, it is killed if it is still running after a grace period. Can be called from any
+        thread.
+        """
+        if self._process.returncode is not None:
+            return
+        self._cancelled = True
+        try:
+            os.killpg(self._process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        self._loop.call_soon_threadsafe(self._loop.call_later, SparkSubmission._CANCEL_GRACE, self._kill)
+
+    def _kill(self):
+        if self._process.returncode is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class PySparkSessionSubmit(SparkSubmit):
+    """
+    SparkSubmit that runs Python benchmark functions in one long-lived PySpark session, instead of paying the startup
+    of a JVM and of a SparkContext at every spark-submit.
+
+    The application is a Python file (path_jar) and the name of one of its functions (classname). The function is
+    called as function(spark, arguments), with the SparkSession and the Java arguments of the configuration (their
+    names without the leading "-"), and may return a dict of additional metrics. Its wall time is measured in-process,
+    and written with these metrics as one row of the metrics CSV (path_metrics_csv), in the format of the JAR
+    applications: metric name "[time(ms),...]".
+
+    Arguments named after a Spark property ("spark.sql.shuffle.partitions", ...) are set in the runtime configuration
+    of the session for the call. The properties and the cached tables and RDDs are reset after each call. A call with a
+    property that is not modifiable at runtime (spark.executor.memory, ...) fails before running. The launch
+    arguments (spark_args) cannot change in a running session, they are ignored. The calls run one at a time.
+
+    Examples:
+        .. code-block:: python
+            from sparklib import PySparkSessionSubmit
+
+            ...
+            # count_word(spark, arguments) is a function of countword.py
+            spark_submit = PySparkSessionSubmit("local[*]")
+            try:
+                spark_submit.start()
+                spark_submit.submit_with_log("countword.py", "count_word", java_args={"-partition": "2"},
+                                             path_metrics_csv="/tmp/metrics.csv")
+            finally:
+                spark_submit.stop()
+    """
+
+    _DEFAULT_MASTER = "local[*]"
+
+    def __init__(self, master: str = None):
+        super().__init__()
+        self._master = master or PySparkSessionSubmit._DEFAULT_MASTER
+        self._session = None
+        # path -> imported Python file of the benchmark functions
+        self._modules = dict()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the PySpark session. SPARK_HOME is optional, the pyspark package ships with Spark.
+        """
+        self._on_start()
+
+    def stop(self):
+        self._on_stop()
+
+    def submit_with_log(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                        path_metrics_csv: str = None, path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
+        """
+        Call a benchmark function in the session, see the class documentation. The output of the function is printed,
+        path_log and path_err are ignored.
+        """
+        print("Running the benchmark function in the PySpark session.")
+        return self._on_submit(path_jar, classname, spark_args or {}, java_args or {}, path_metrics_csv, path_log,
+                               path_err)
+
+    async def submit_with_log_async(self, path_jar: str, classname: str, spark_args=None, java_args=None,
+                                    path_metrics_csv: str = None, path_log: str = "/tmp/out.log",
+                                    path_err: str = "/tmp/out.err"):
+        return await asyncio.to_thread(self.submit_with_log, path_jar, classname, spark_args, java_args,
+                                       path_metrics_csv, path_log, path_err)
+
+    def _on_start(self):
+        try:
+            from pyspark.sql import SparkSession
+        except ImportError:
+            raise Exception("Install pyspark to run the benchmark functions in a PySpark session.")
+        if self._isSetJava:
+            os.environ["JAVA_HOME"] = self._java
+        if self._isSetSpark:
+            os.environ["SPARK_HOME"] = self._spark
+        print(f"Starting the PySpark session on {self._master}")
+        self._session = SparkSession.builder.master(self._master).appName("multi-parameter-benchmark").getOrCreate()
+
+    def _on_stop(self):
+        if self._session is not None:
+            self._session.stop()
+            self._session = None
+
+    def _on_submit(self, path_jar: str, classname: str, spark_args: dict, java_args: dict, path_metrics_csv: str,
+                   path_log: str = "/tmp/out.log", path_err: str = "/tmp/out.err"):
+        arguments = {str(name).lstrip("-"): value for name, value in java_args.items()}
+        properties = {name: str(value) for name, value in arguments.items() if name.startswith("spark.")}
+        with self._lock:
+            static = [name for name in properties if not self._session.conf.isModifiable(name)]
+            if static:
+                print(f"The Spark properties {', '.join(static)} cannot change in a running session, set them when "
+                      f"the session starts or benchmark them with another SparkSubmit.")
+                return None
+            # previous values of the properties set for the call, None if they were not set
+            previous = dict()
+            try:
+                function = self._function(path_jar, classname)
+                for name, value in properties.items():
+                    previous[name] = self._session.conf.get(name, None)
+                    self._session.conf.set(name, value)
+                start = time.perf_counter()
+                metrics = function(self._session, arguments) or {}
+                elapsed = (time.perf_counter() - start) * 1000
+                self._write_metrics(path_metrics_csv, java_args, {"time(ms)": round(elapsed, 3), **metrics})
+                print(f"Returning metrics CSV local path: {path_metrics_csv}")
+                return path_metrics_csv
+            except Exception as e:
+                print(e)
+                print("Check the output of the benchmark function, because an exception might have occurred.")
+                return None
+            finally:
+                for name, value in previous.items():
+                    try:
+                        if value is None:
+                            self._session.conf.unset(name)
+                        else:
+                            self._session.conf.set(name, value)
+                    except Exception as e:
+                        print(f"The Spark property {name} could not be restored: {e}")
+                self._clear_cache()
+
+    def _function(self, path: str, name: str):
+        """
+        Benchmark function of a Python file, the file is imported once and shipped to the executors
+        """
+        if path not in self._modules:
+            spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._session.sparkContext.addPyFile(path)
+            self._modules[path] = module
+        return getattr(self._modules[path], name)
+
+    def _clear_cache(self):
+        self._session.catalog.clearCache()
+        # the persisted RDDs are only listed by the JVM SparkContext
+        for rdd in self._session.sparkContext._jsc.getPersistentRDDs().values():
+            rdd.unpersist()
+
+    @staticmethod
+    def _write_metrics(path_metrics_csv: str, java_args: dict, metrics: dict):
+        if path_metrics_csv is None:
+            return
+        configuration = ",".join(f"{str(name).lstrip('-')}={value}" for name, value in java_args.items())
+        with open(path_metrics_csv, "w", newline="") as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+            writer.writerow(["configuration", "metric_name", "metric_value"])
+            writer.writerow([configuration, f"[{','.join(metrics)}]",
+                             f"[{','.join(str(value) for value in metrics.values())}]"])
 
 
 class G5kSparkSubmit(SparkSubmit):
@@ -540,7 +986,3 @@ class G5kSparkSubmit(SparkSubmit):
             finally:
                 p.fetch(src=path_log, dest="~")
                 p.fetch(src=path_err, dest="~")
-
-    @property
-    def _shell_set_java_cmd(self):
-        return f"JAVA_HOME={self._java} " if self._isSetJava else ""
@@ -0,0 +1,96 @@
+from benchmark.data.space import ConfigurationSpace
+import numpy as np
+
+
+class ConfigurationIndex:
+    '''
+    Inverted index of a set of configurations (the universe) of a ConfigurationSpace: for each parameter value, a
+    bitmap of the configurations that bind the parameter to this value.
+
+    Bitmaps are packed NumPy bit arrays over the positions of the configurations in the sorted universe, so selecting the
+    configurations that contain a sub-configuration is an intersection of bitmaps. The index is built from the
+    configuration indexes in one vectorized pass, therefore it is rebuilt on resume instead of being persisted.
+    '''
+
+    def __init__(self, space: ConfigurationSpace, ids):
+        self.space = space
+        # sorted configuration indexes of the universe
+        self._universe = np.unique(np.asarray(ids, dtype=np.int64))
+
+        # position of the parameter in the space -> packed bitmaps, one row per digit
+        self._bitmaps = []
+        for stride, radix in zip(space.strides, space.radices):
+            digits = (self._universe // stride) % radix
+            self._bitmaps.append(np.packbits(digits[np.newaxis, :] == np.arange(radix)[:, np.newaxis], axis=1))
+
+    def __len__(self):
+        return len(self._universe)
+
+    def __contains__(self, config_id: int) -> bool:
+        position = int(np.searchsorted(self._universe, config_id))
+        return position < len(self._universe) and self._universe[position] == config_id
+
+    def _position_of(self, config_id: int) -> int:
+        position = int(np.searchsorted(self._universe, config_id))
+        if position == len(self._universe) or self._universe[position] != config_id:
+            raise KeyError(f"Configuration {self.space.decode(config_id)} is not in the index.")
+        return position
+
+    def empty(self) -> np.ndarray:
+        return np.zeros((len(self._universe) + 7) // 8, dtype=np.uint8)
+
+    def full(self) -> np.ndarray:
+        return np.packbits(np.ones(len(self._universe), dtype=bool))
+
+    def bitmap(self, ids) -> np.ndarray:
+        '''
+        Bitmap of configuration indexes, all of them must be in the universe
+        '''
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return self.empty()
+        positions = np.searchsorted(self._universe, ids)
+        if np.any(positions >= len(self._universe)) or np.any(self._universe[positions % len(self._universe)] != ids):
+            raise KeyError(f"Configurations {ids} are not all in the index.")
+        selected = np.zeros(len(self._universe), dtype=bool)
+        selected[positions] = True
+        return np.packbits(selected)
+
+    def add(self, bitmap: np.ndarray, config_id: int):
+        position = self._position_of(config_id)
+        bitmap[position >> 3] |= np.uint8(0x80 >> (position & 7))
+
+    def discard(self, bitmap: np.ndarray, config_id: int):
+        position = self._position_of(config_id)
+        bitmap[position >> 3] &= np.uint8(~(0x80 >> (position & 7)) & 0xFF)
+
+    def contains(self, bitmap: np.ndarray, config_id: int) -> bool:
+        try:
+            position = self._position_of(config_id)
+        except KeyError:
+            return False
+        return bool(bitmap[position >> 3] & (0x80 >> (position & 7)))
+
+    def select(self, subdictionary: dict, bitmap: np.ndarray = None) -> np.ndarray:
+        '''
+        Bitmap of the configurations (of bitmap, if set) that contain subdictionary
+        '''
+        res = self.full() if bitmap is None else bitmap.copy()
+        for key, value in subdictionary.items():
+            digit = self.space.digit_of(key, value)
+            if digit is None:
+                return self.empty()
+            res &= self._bitmaps[self.space.position_of(key)][digit]
+        return res
+
+    def ids(self, bitmap: np.ndarray) -> np.ndarray:
+        '''
+        Sorted configuration indexes of a bitmap
+        '''
+        return self._universe[np.flatnonzero(np.unpackbits(bitmap, count=len(self._universe)))]
+
+    def matching(self, subdictionary: dict, bitmap: np.ndarray = None) -> np.ndarray:
+        '''
+        Sorted indexes of the configurations (of bitmap, if set) that contain subdictionary
+        '''
+        return self.ids(self.select(subdictionary, bitmap))
@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import List
+import json, os, time
+
+
+class SweeperJournal:
+    '''
+    Append-only journal of the events of a sweep (one JSON object per line), written ahead of the snapshot of the
+    SweeperState.
+
+    Every event is flushed to the operating system, so it survives a crash of the process. The journal is fsynced after
+    _SYNC_EVERY events or _SYNC_INTERVAL seconds, so a burst of events costs one fsync.
+    '''
+
+    _SYNC_EVERY = 16
+    _SYNC_INTERVAL = 1.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, event: dict):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "at")
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+        self._unsynced += 1
+        if self._unsynced >= SweeperJournal._SYNC_EVERY or \
+                time.monotonic() - self._last_sync >= SweeperJournal._SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._unsynced > 0:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def read(self) -> List[dict]:
+        '''
+        Return the events of the journal, without the last line if it was torn by a crash
+        '''
+        if not self.path.exists():
+            return []
+        res = []
+        with open(self.path, "rt") as file:
+            for line in file:
+                try:
+                    res.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return res
+
+    def truncate(self):
+        '''
+        Remove all events, once they are contained in a snapshot
+        '''
+        self.close()
+        with open(self.path, "wt") as file:
+            os.fsync(file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
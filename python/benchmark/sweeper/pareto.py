@@ -0,0 +1,122 @@
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+def dominates(point: Tuple[float, ...], other: Tuple[float, ...]) -> bool:
+    '''
+    Return true if point is not worse than other on every objective and better on one (objectives are minimized)
+    '''
+    return all(a <= b for a, b in zip(point, other)) and point != other
+
+
+class ParetoArchive:
+    '''
+    Non-dominated set (Pareto front) of the mean metrics of the scored configurations, objectives are minimized.
+
+    The front is a skyline sorted lexicographically on the objectives: a point can only be dominated by the points
+    sorted before it, and only dominate the points sorted after it. With two objectives, the second objective decreases
+    along the skyline, so the dominance check of a new point is a binary search. With more objectives, the points
+    before (after) it are checked in one vectorized operation.
+
+    The mean of a configuration changes as it receives more rounds. An improved mean is inserted again, but a member
+    of the front whose mean got worse may uncover dominated points, so the front is then rebuilt from all the points
+    when it is queried.
+    '''
+
+    def __init__(self):
+        # all the points, by configuration index
+        self._all: Dict[int, Tuple[float, ...]] = dict()
+        # the skyline: sorted points of the front, and their configuration indexes
+        self._points: List[Tuple[float, ...]] = []
+        self._ids: List[int] = []
+        self._members = set()
+        self._outdated = False
+
+    def __len__(self):
+        return len(self.front())
+
+    def __contains__(self, config_id: int) -> bool:
+        self.front()
+        return config_id in self._members
+
+    def update(self, config_id: int, point):
+        point = tuple(float(value) for value in point)
+        previous = self._all.get(config_id)
+        self._all[config_id] = point
+        if self._outdated:
+            return
+        if config_id in self._members:
+            if all(a <= b for a, b in zip(point, previous)):
+                # the points dominated by the previous point are dominated by the new one
+                self._remove(config_id, previous)
+            else:
+                self._outdated = True
+                return
+        self._insert(config_id, point)
+
+    def front(self) -> List[int]:
+        '''
+        Configuration indexes of the non-dominated points, sorted lexicographically on the points
+        '''
+        if self._outdated:
+            self._points, self._ids, self._members = [], [], set()
+            for config_id, point in sorted(self._all.items(), key=lambda item: item[1]):
+                self._insert(config_id, point)
+            self._outdated = False
+        return list(self._ids)
+
+    def point(self, config_id: int) -> Tuple[float, ...]:
+        return self._all[config_id]
+
+    @staticmethod
+    def front_of(ids: List[int], points) -> List[int]:
+        '''
+        Non-dominated configuration indexes of ids, given their points
+        '''
+        archive = ParetoArchive()
+        for config_id, point in sorted(zip(ids, (tuple(float(value) for value in point) for point in points)),
+                                       key=lambda item: item[1]):
+            archive._all[config_id] = point
+            archive._insert(config_id, point)
+        return archive.front()
+
+    def _remove(self, config_id: int, point: Tuple[float, ...]):
+        position = bisect_right(self._points, point) - 1
+        while self._ids[position] != config_id:
+            position -= 1
+        del self._points[position]
+        del self._ids[position]
+        self._members.discard(config_id)
+
+    def _insert(self, config_id: int, point: Tuple[float, ...]):
+        position = bisect_right(self._points, point)
+        if len(point) == 2:
+            # the last point before has the lowest second objective of the points before
+            before = position - 1
+            while before >= 0 and self._points[before] == point:
+                before -= 1
+            if before >= 0 and self._points[before][1] <= point[1]:
+                return
+            # the dominated points after are contiguous, their second objective is not lower
+            end = position
+            while end < len(self._points) and self._points[end][1] >= point[1]:
+                end += 1
+        else:
+            if position > 0:
+                before = np.array(self._points[:position])
+                if np.any(np.all(before <= point, axis=1) & np.any(before < point, axis=1)):
+                    return
+            end = position
+            if position < len(self._points):
+                after = np.array(self._points[position:])
+                dominated = np.all(after >= point, axis=1) & np.any(after > point, axis=1)
+                if np.any(dominated):
+                    self._members.difference_update(self._ids[position + i] for i in np.flatnonzero(dominated))
+                    kept = [position + i for i in np.flatnonzero(~dominated)]
+                    self._points[position:] = [self._points[i] for i in kept]
+                    self._ids[position:] = [self._ids[i] for i in kept]
+        self._members.difference_update(self._ids[position:end])
+        self._points[position:end] = [point]
+        self._ids[position:end] = [config_id]
+        self._members.add(config_id)
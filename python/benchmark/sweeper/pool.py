@@ -0,0 +1,61 @@
+from array import array
+import random
+
+
+class ConfigurationPool:
+    '''
+    Unordered set of configuration indexes with O(1) random draw, membership test and removal.
+
+    The indexes are kept in a dense array, and a position map tells where each index is. A removal moves the last
+    index of the array into the hole (swap-remove), so the array stays dense.
+    '''
+
+    def __init__(self, ids=()):
+        self._items = array("q", ids)
+        # configuration index -> position in _items
+        self._positions = {config_id: position for position, config_id in enumerate(self._items)}
+        if len(self._positions) != len(self._items):
+            raise ValueError("Configuration indexes of a pool must be unique.")
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, config_id: int) -> bool:
+        return config_id in self._positions
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, position: int) -> int:
+        return self._items[position]
+
+    def add(self, config_id: int):
+        if config_id not in self._positions:
+            self._positions[config_id] = len(self._items)
+            self._items.append(config_id)
+
+    def remove(self, config_id: int):
+        '''
+        Remove config_id, raise a KeyError if it is not in the pool
+        '''
+        position = self._positions.pop(config_id)
+        last = self._items.pop()
+        if last != config_id:
+            self._items[position] = last
+            self._positions[last] = position
+
+    def discard(self, config_id: int):
+        if config_id in self._positions:
+            self.remove(config_id)
+
+    def choice(self, rng: random.Random = None) -> int:
+        '''
+        Draw a configuration index uniformly at random, without removing it
+        '''
+        if len(self._items) == 0:
+            raise IndexError("Cannot choose from an empty pool.")
+        rng = random if rng is None else rng
+        return self._items[rng.randrange(len(self._items))]
+
+    def to_array(self) -> array:
+        return array("q", self._items)
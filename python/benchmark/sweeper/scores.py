@@ -0,0 +1,102 @@
+from array import array
+from benchmark.data.metric import Metric
+from benchmark.data.statistics import ScoreStatistics
+from typing import List, Optional
+import numpy as np
+
+
+class ScoreTable:
+    '''
+    Metrics recorded for the configurations of a sweep, stored as columns: the configuration index and the components
+    of each metric are appended to flat arrays, in the order the metrics are recorded. The rows of a configuration are
+    found with its index, and the configurations iterate in the order of their first metric.
+    '''
+
+    def __init__(self, width: Optional[int] = None):
+        # number of components of the metrics, set by the first metric
+        self.width = width
+        self._ids = array("q")
+        self._values = array("d")
+        # configuration index -> rows of its metrics
+        self._rows = dict()
+
+    def __len__(self):
+        '''Number of scored configurations'''
+        return len(self._rows)
+
+    def __contains__(self, config_id: int) -> bool:
+        return config_id in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def number_of_metrics(self) -> int:
+        return len(self._ids)
+
+    def append(self, config_id: int, metric: Metric):
+        components = metric.components()
+        if self.width is None:
+            self.width = len(components)
+        elif len(components) != self.width:
+            raise Exception(f"The metric {metric} has {len(components)} components, but the metrics of the sweep " +
+                            f"have {self.width}.")
+        self._rows.setdefault(config_id, []).append(len(self._ids))
+        self._ids.append(config_id)
+        self._values.extend(components)
+
+    def count(self, config_id: int) -> int:
+        rows = self._rows.get(config_id)
+        return 0 if rows is None else len(rows)
+
+    def components(self, config_id: int, rounds: Optional[int] = None) -> np.ndarray:
+        '''
+        Components of the first rounds metrics of config_id (all of them if None), one row per metric
+        '''
+        rows = np.asarray(self._rows[config_id][:rounds], dtype=np.int64)
+        values = np.frombuffer(self._values, dtype=np.float64).reshape(-1, self.width)
+        return values[rows]
+
+    def metrics(self, config_id: int) -> List[Metric]:
+        return [Metric.from_components(row) for row in self.components(config_id)]
+
+    def columns(self):
+        '''
+        Return the configuration indexes (1-d) and the components (2-d) of all the metrics, in the order they were
+        recorded
+        '''
+        ids = np.frombuffer(self._ids, dtype=np.int64).copy()
+        values = np.frombuffer(self._values, dtype=np.float64).copy()
+        return ids, values.reshape(len(ids), -1) if len(ids) > 0 else values.reshape(0, 0)
+
+    def statistics(self) -> dict:
+        '''
+        Return the ScoreStatistics of each configuration index, aggregated in one vectorized pass over the columns
+        '''
+        res = dict()
+        if len(self._ids) == 0:
+            return res
+        ids, values = self.columns()
+        order = np.argsort(ids, kind="stable")
+        ids, values = ids[order], values[order]
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        counts = np.diff(np.append(starts, len(ids)))
+        sums = np.add.reduceat(values, starts, axis=0)
+        means = sums / counts[:, np.newaxis]
+        m2 = np.add.reduceat((values - np.repeat(means, counts, axis=0)) ** 2, starts, axis=0)
+
+        counts, sums, means, m2 = counts.tolist(), sums.tolist(), means.tolist(), m2.tolist()
+        group = {config_id: position for position, config_id in enumerate(ids[starts].tolist())}
+        for config_id in self._rows:
+            position = group[config_id]
+            res[config_id] = ScoreStatistics.from_aggregates(counts[position], sums[position], means[position],
+                                                             m2[position])
+        return res
+
+    @staticmethod
+    def from_columns(ids: np.ndarray, values: np.ndarray):
+        res = ScoreTable(None if len(ids) == 0 else values.shape[1])
+        res._ids.frombytes(np.ascontiguousarray(ids, dtype=np.int64).tobytes())
+        res._values.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        for row, config_id in enumerate(res._ids):
+            res._rows.setdefault(config_id, []).append(row)
+        return res
@@ -0,0 +1,555 @@
+# to type hint with SweeperState without a circular import
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, TYPE_CHECKING
+from execo_engine import HashableDict
+from benchmark.data.metric import Metric
+from benchmark.data.statistics import student_t_quantile
+import numpy as np
+import math
+
+if TYPE_CHECKING:
+    from benchmark.sweeper.sweep import SweeperState
+
+
+@dataclass
+class ScheduleStep:
+    # number of configurations handed out, and how many of them are handed out for the first time
+    configs: int
+    new_configs: int
+    # measurement rounds run for each configuration, None for the measurement_rounds of the benchmark
+    rounds: Optional[int]
+
+
+class SearchStrategy(ABC):
+    '''
+    Decides which configuration the Sweeper scores next (ask) and learns from the recorded metrics (tell).
+
+    A strategy keeps all its persistent data in the SweeperState, so it can be recreated from a loaded state when a
+    sweep is resumed from the sweeper_workdir.
+
+    When configurations are scored concurrently, ask never returns a configuration in flight (state.inflight_configs),
+    and returns None while the next configuration depends on the metrics of the in-flight ones.
+    '''
+
+    def __init__(self, state: SweeperState):
+        self.state = state
+
+    @abstractmethod
+    def ask(self) -> Optional[HashableDict]:
+        '''Return the next configuration to score, None if the search is finished'''
+        pass
+
+    @abstractmethod
+    def has_next(self) -> bool:
+        pass
+
+    def tell(self, config: HashableDict, score: Metric):
+        '''Called for each metric recorded for config'''
+        pass
+
+    def imported(self, config: HashableDict):
+        '''Called for each configuration imported from the results of a previous sweep, once its metrics are told'''
+        pass
+
+    def rounds(self, config: HashableDict) -> Optional[int]:
+        '''Number of measurement rounds to run for the asked config, None to use the benchmark's measurement_rounds'''
+        return None
+
+    def best(self) -> Optional[HashableDict]:
+        '''Return the best configuration found so far'''
+        return self.state.best_starting_with(self.state.selected)
+
+    @abstractmethod
+    def schedule(self, valid_size: int) -> List[ScheduleStep]:
+        '''
+        Upper bound of the configurations handed out by a new sweep of valid_size configurations, without enumerating
+        them. Only the options of the strategy_state, the budget, the train and the parameters of the state are used.
+        '''
+        pass
+
+    @staticmethod
+    def create(name: str, state: SweeperState) -> SearchStrategy:
+        strategies = {
+            PrioritySearchStrategy.NAME: PrioritySearchStrategy,
+            SurrogateSearchStrategy.NAME: SurrogateSearchStrategy,
+            SuccessiveHalvingSearchStrategy.NAME: SuccessiveHalvingSearchStrategy,
+            HyperbandSearchStrategy.NAME: HyperbandSearchStrategy,
+            RacingSearchStrategy.NAME: RacingSearchStrategy,
+        }
+        if name not in strategies:
+            raise Exception(f"Unknown search strategy {name}, use one of {list(strategies.keys())}.")
+        return strategies[name](state)
+
+
+class PrioritySearchStrategy(SearchStrategy):
+    '''
+    Greedy sweep in the order of the parameter priorities: `train` random configurations are scored, then the value
+    of the current parameter is fixed to its value in the best configuration, and the next parameter is trained.
+    '''
+    NAME = "priority"
+
+    def ask(self) -> Optional[HashableDict]:
+        state = self.state
+        if len(state.remaining_configs) == 0:
+            return None
+        elif state.remaining_train == 0:
+            # the value of the parameter is fixed when all its trained configurations are scored
+            if len(state.inflight_configs) > 0:
+                return None
+            # Find best sequence of argument, starting with already selected ones
+            best = state.best_starting_with(state.selected)
+            # Add the new config value to the selected ones
+            state.selected[state.current_parameter_key] = best[state.current_parameter_key]
+            state.narrow(state.selected)
+            if len(state.remaining_configs) != 0:
+                # Increase the index of the focused param
+                state.current_parameter_key = state.get_next_key()
+                # Restart the maximal number of train
+                state.remaining_train = state.train
+                return self.ask()
+        else:
+            res = state.draw()
+            if res is not None:
+                state.remaining_train -= 1
+            return res
+
+    def has_next(self) -> bool:
+        return len(self.state.remaining_configs) != 0
+
+    def schedule(self, valid_size: int) -> List[ScheduleStep]:
+        # at most train configurations are scored for each parameter
+        configs = min(valid_size, self.state.train * len(self.state.parameters))
+        return [ScheduleStep(configs=configs, new_configs=configs, rounds=None)]
+
+
+class SurrogateSearchStrategy(SearchStrategy):
+    '''
+    Bayesian optimization: a Gaussian process is fitted on the score (the mean metric by default) of the scored
+    configurations, and the remaining configuration with the highest expected improvement is scored next.
+
+    Configurations are encoded as the value positions of their categorical parameters, and the kernel decays with the
+    share of parameters that have different values (Hamming distance). Metrics with several components are scalarized
+    as the average (weighted with the objective_weights of the sweep) of the standardized components. The search stops
+    after `budget` configurations.
+
+    The in-flight configurations of a batch are added to the model with the best objective observed so far (constant
+    liar), so that the next configurations of the batch are drawn away from them.
+    '''
+    NAME = "surrogate"
+
+    # random configurations scored before the first model is fitted
+    _MIN_INITIAL_DESIGN = 3
+    # maximal number of remaining configurations whose expected improvement is computed at each ask
+    _MAX_CANDIDATES = 2048
+    # kernel length scales and noise variances tried when fitting the model
+    _LENGTH_SCALES = [0.1, 0.2, 0.5, 1.0, 2.0]
+    _NOISES = [1e-4, 1e-2, 1e-1, 5e-1]
+    # exploration margin of the expected improvement (in standard deviations of the objective)
+    _XI = 0.01
+
+    def has_next(self) -> bool:
+        state = self.state
+        evaluated = len(state.done_configs) + len(state.skipped_configs) + len(state.inflight_configs) - \
+            state.imported_configs
+        return len(state.remaining_configs) != 0 and evaluated < state.budget
+
+    def schedule(self, valid_size: int) -> List[ScheduleStep]:
+        configs = min(valid_size, self.state.budget)
+        return [ScheduleStep(configs=configs, new_configs=configs, rounds=None)]
+
+    def ask(self) -> Optional[HashableDict]:
+        state = self.state
+        if not self.has_next():
+            return None
+
+        observed = [config_id for config_id in state.statistics if config_id not in state.inflight_configs]
+        initial_design = max(SurrogateSearchStrategy._MIN_INITIAL_DESIGN, len(state.parameters) + 1)
+        if len(observed) < initial_design:
+            return state.draw()
+
+        objective = self._objective(observed)
+        observed_ids = np.array(observed, dtype=np.int64)
+        inflight_ids = np.fromiter(state.inflight_configs, dtype=np.int64, count=len(state.inflight_configs))
+        x = self._encode(np.concatenate([observed_ids, inflight_ids]))
+        y = np.concatenate([objective, np.full(len(inflight_ids), np.min(objective))])
+        model = self._fit(x, y)
+
+        candidates = self._candidates()
+        candidates = candidates[np.isin(candidates, inflight_ids, invert=True)]
+        if len(candidates) == 0:
+            return None
+        mean, std = self._predict(model, self._encode(candidates))
+        improvement = self._expected_improvement(mean, std, np.min(objective))
+        return state.space.decode(int(candidates[int(np.argmax(improvement))]))
+
+    def _objective(self, config_ids: List[int]) -> np.ndarray:
+        '''Standardized objective of the scored configurations, to be minimized'''
+        components = np.array([self.state.get_score_by_index(config_id).components() for config_id in config_ids],
+                              dtype=float)
+        std = components.std(axis=0)
+        std[std == 0] = 1.0
+        standardized = (components - components.mean(axis=0)) / std
+        objective = np.average(standardized, axis=1, weights=self.state.objective_weights)
+        return objective if self.state.lower else -objective
+
+    def _encode(self, ids: np.ndarray) -> np.ndarray:
+        space = self.state.space
+        return np.stack([(ids // stride) % radix for stride, radix in zip(space.strides, space.radices)], axis=1)
+
+    def _candidates(self) -> np.ndarray:
+        remaining = self.state.remaining_configs
+        if len(remaining) <= SurrogateSearchStrategy._MAX_CANDIDATES:
+            return np.frombuffer(remaining.to_array(), dtype=np.int64)
+        positions = self.state.rng.sample(range(len(remaining)), SurrogateSearchStrategy._MAX_CANDIDATES)
+        return np.array([remaining[position] for position in positions], dtype=np.int64)
+
+    @staticmethod
+    def _kernel(a: np.ndarray, b: np.ndarray, length_scale: float) -> np.ndarray:
+        distance = (a[:, np.newaxis, :] != b[np.newaxis, :, :]).mean(axis=2)
+        return np.exp(-distance / length_scale)
+
+    @staticmethod
+    def _fit(x: np.ndarray, y: np.ndarray) -> dict:
+        # the hyperparameters with the highest log marginal likelihood are kept
+        best = None
+        for length_scale in SurrogateSearchStrategy._LENGTH_SCALES:
+            kernel = SurrogateSearchStrategy._kernel(x, x, length_scale)
+            for noise in SurrogateSearchStrategy._NOISES:
+                try:
+                    cholesky = np.linalg.cholesky(kernel + noise * np.eye(len(x)))
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = np.linalg.solve(cholesky.T, np.linalg.solve(cholesky, y))
+                likelihood = -0.5 * y @ alpha - np.log(np.diag(cholesky)).sum()
+                if best is None or likelihood > best["likelihood"]:
+                    best = {"likelihood": likelihood, "length_scale": length_scale, "cholesky": cholesky,
+                            "alpha": alpha, "x": x, "y": y}
+        return best
+
+    @staticmethod
+    def _predict(model: dict, x: np.ndarray):
+        cross = SurrogateSearchStrategy._kernel(x, model["x"], model["length_scale"])
+        mean = cross @ model["alpha"]
+        v = np.linalg.solve(model["cholesky"], cross.T)
+        variance = np.maximum(1.0 - (v * v).sum(axis=0), 1e-12)
+        return mean, np.sqrt(variance)
+
+    @staticmethod
+    def _expected_improvement(mean: np.ndarray, std: np.ndarray, best: float) -> np.ndarray:
+        improvement = best - mean - SurrogateSearchStrategy._XI
+        z = improvement / std
+        cdf = 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+        pdf = np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+        return improvement * cdf + std * pdf
+
+
+class SuccessiveHalvingSearchStrategy(SearchStrategy):
+    '''
+    Successive halving over the measurement rounds: `budget` random configurations receive min_rounds measurement
+    rounds, then the best 1/eta of them are promoted to eta times more rounds, and so on, until one configuration is
+    left or the configurations received max_rounds.
+
+    The progress (bracket, rung and configurations of the rung) is kept in the strategy_state of the SweeperState, a
+    configuration is asked again when it is promoted. The best configuration is the best of the finalists of the
+    brackets and of the configurations imported from previous sweeps.
+    '''
+    NAME = "halving"
+
+    _DEFAULT_ETA = 3
+
+    def __init__(self, state: SweeperState):
+        super().__init__(state)
+        options = state.strategy_state
+        self.eta = options.setdefault("eta", SuccessiveHalvingSearchStrategy._DEFAULT_ETA)
+        self.min_rounds = options.setdefault("min_rounds", 1)
+        self.max_rounds = max(options.setdefault("max_rounds", 1), self.min_rounds)
+        if self.eta < 2:
+            raise Exception(f"The elimination ratio (eta) must be at least 2, but it is {self.eta}.")
+
+        options.setdefault("bracket", 0)
+        options.setdefault("rung", 0)
+        # configuration indexes of the current rung, None before the bracket starts
+        options.setdefault("members", None)
+        # survivors of the last rung of each finished bracket
+        options.setdefault("finalists", [])
+        # configurations imported from previous sweeps, they compete with the finalists
+        options.setdefault("imported", [])
+
+    def _brackets(self) -> List[Tuple[int, int]]:
+        '''
+        (number of configurations, rounds of the first rung) of each bracket
+        '''
+        return [(self.state.budget, self.min_rounds)]
+
+    def _rung_rounds(self) -> int:
+        options = self.state.strategy_state
+        first_rung_rounds = self._brackets()[options["bracket"]][1]
+        return min(self.max_rounds, first_rung_rounds * self.eta ** options["rung"])
+
+    def _received(self, config_id: int) -> int:
+        return self.state.scores.count(config_id)
+
+    def _survivors(self, members: List[int]) -> List[int]:
+        # configurations that finished with an error are eliminated
+        measured = [member for member in members
+                    if member not in self.state.skipped_configs and self._received(member) > 0]
+        return self.state.sort_best_first(measured)
+
+    def _start_bracket(self) -> bool:
+        options = self.state.strategy_state
+        brackets = self._brackets()
+        while options["bracket"] < len(brackets):
+            remaining = self.state.remaining_configs
+            number_of_configs = min(brackets[options["bracket"]][0], len(remaining))
+            if number_of_configs > 0:
+                positions = self.state.rng.sample(range(len(remaining)), number_of_configs)
+                options["members"] = [remaining[position] for position in positions]
+                options["rung"] = 0
+                return True
+            options["bracket"] += 1
+        return False
+
+    def _current(self) -> Optional[int]:
+        '''
+        Return the next configuration of the current rung which needs more rounds, promote or start brackets if needed
+        '''
+        options = self.state.strategy_state
+        while True:
+            if options["members"] is None and not self._start_bracket():
+                return None
+
+            rounds = self._rung_rounds()
+            for member in options["members"]:
+                if member not in self.state.skipped_configs and member not in self.state.inflight_configs and \
+                        self._received(member) < rounds:
+                    return member
+
+            # the rung is finished when none of its members is in flight
+            if any(member in self.state.inflight_configs for member in options["members"]):
+                return None
+            survivors = self._survivors(options["members"])
+            if len(survivors) <= 1 or rounds >= self.max_rounds:
+                options["finalists"].extend(survivors[:1])
+                options["bracket"] += 1
+                options["members"] = None
+            else:
+                options["members"] = survivors[:max(1, len(survivors) // self.eta)]
+                options["rung"] += 1
+
+    def ask(self) -> Optional[HashableDict]:
+        current = self._current()
+        return None if current is None else self.state.space.decode(current)
+
+    def has_next(self) -> bool:
+        return self._current() is not None
+
+    def rounds(self, config: HashableDict) -> Optional[int]:
+        return max(self._rung_rounds() - self._received(self.state.space.index_of(config)), 0)
+
+    def schedule(self, valid_size: int) -> List[ScheduleStep]:
+        # every member of a rung is measured and no configuration fails: the brackets draw distinct configurations
+        res = []
+        for number_of_configs, first_rung_rounds in self._brackets():
+            members = min(number_of_configs, valid_size)
+            valid_size -= members
+            rung = 0
+            received = 0
+            while members > 0:
+                rounds = min(self.max_rounds, first_rung_rounds * self.eta ** rung)
+                # a promoted configuration only runs its missing rounds
+                res.append(ScheduleStep(configs=members, new_configs=members if rung == 0 else 0,
+                                        rounds=rounds - received))
+                if members <= 1 or rounds >= self.max_rounds:
+                    break
+                members = max(1, members // self.eta)
+                received = rounds
+                rung += 1
+        return res
+
+    def imported(self, config: HashableDict):
+        self.state.strategy_state["imported"].append(self.state.space.index_of(config))
+
+    def best(self) -> Optional[HashableDict]:
+        options = self.state.strategy_state
+        finalists = [finalist for finalist in options["finalists"] + options["imported"]
+                     if finalist not in self.state.skipped_configs]
+        if len(finalists) == 0:
+            return super().best()
+        return self.state.space.decode(self.state.sort_best_first(finalists)[0])
+
+
+class HyperbandSearchStrategy(SuccessiveHalvingSearchStrategy):
+    '''
+    Hyperband: successive halving brackets from the most exploratory one (budget configurations with few rounds) to the
+    most conservative one (few configurations with max_rounds from the start).
+    '''
+    NAME = "hyperband"
+
+    def _brackets(self) -> List[Tuple[int, int]]:
+        # number of halvings of the most exploratory bracket
+        s_max = 0
+        while self.min_rounds * self.eta ** (s_max + 1) <= self.max_rounds:
+            s_max += 1
+
+        res = []
+        for s in range(s_max, -1, -1):
+            number_of_configs = math.ceil(self.state.budget * (s_max + 1) / ((s + 1) * self.eta ** (s_max - s)))
+            first_rung_rounds = max(self.min_rounds, self.max_rounds // self.eta ** s)
+            res.append((max(1, number_of_configs), first_rung_rounds))
+        return res
+
+
+class RacingSearchStrategy(SearchStrategy):
+    '''
+    Racing in the order of the parameter priorities: for the current parameter, one configuration is taken for each of
+    its values (starting with the already selected values), and the candidates are measured round by round. The
+    candidate of a value is its best scored configuration if there is one, which keeps its rounds (the leader of the
+    previous race, a configuration imported from a previous sweep), a random remaining configuration otherwise.
+    After min_rounds, a candidate is eliminated as soon as a paired t-test shows that it is worse than the leader
+    (the rounds of the same index are paired). The parameter is fixed to the value of the leader when one candidate
+    survives or the candidates received max_rounds.
+
+    Metrics with several components are compared on the average (weighted with the objective_weights of the sweep) of
+    their components relative to the mean of the component over the candidates.
+    '''
+    NAME = "racing"
+
+    def __init__(self, state: SweeperState):
+        super().__init__(state)
+        options = state.strategy_state
+        self.min_rounds = max(options.setdefault("min_rounds", 2), 2)
+        self.max_rounds = max(options.setdefault("max_rounds", 1), self.min_rounds)
+        self.confidence_level = options.setdefault("confidence_level", 0.95)
+
+        # value of the current parameter -> configuration index of its candidate, None before the race starts
+        options.setdefault("candidates", None)
+        options.setdefault("survivors", [])
+        # number of rounds each survivor receives in the current step of the race
+        options.setdefault("round", 1)
+
+    def _received(self, config_id: int) -> int:
+        return self.state.scores.count(config_id)
+
+    def _start_race(self) -> bool:
+        state = self.state
+        options = state.strategy_state
+        key = state.current_parameter_key
+        remaining = np.frombuffer(state.remaining_configs.to_array(), dtype=np.int64)
+
+        candidates = dict()
+        for value in state.parameters_dict[key]:
+            prefix = dict(state.selected)
+            prefix[key] = value
+            scored = [int(config_id) for config_id in state.index.matching(prefix, state.scored)
+                      if config_id not in state.skipped_configs and config_id not in state.inflight_configs]
+            if len(scored) > 0:
+                candidates[value] = self.state.sort_best_first(scored)[0]
+                continue
+            matching = np.intersect1d(remaining, state.index.matching(prefix), assume_unique=True)
+            if len(matching) > 0:
+                candidates[value] = int(matching[state.rng.randrange(len(matching))])
+        if len(candidates) == 0:
+            return False
+
+        options["candidates"] = candidates
+        options["survivors"] = list(candidates.keys())
+        options["round"] = 1
+        return True
+
+    def _objectives(self, survivors: List[str]) -> np.ndarray:
+        '''
+        Scalar objective of the first rounds of the survivors (one row per survivor), to be minimized
+        '''
+        state = self.state
+        rounds = state.strategy_state["round"]
+        candidates = [state.strategy_state["candidates"][value] for value in survivors]
+        components = np.stack([state.scores.components(candidate, rounds) for candidate in candidates])
+        scale = np.abs(components.mean(axis=(0, 1)))
+        scale[scale == 0] = 1.0
+        objectives = np.average(components / scale, axis=2, weights=state.objective_weights)
+        return objectives if state.lower else -objectives
+
+    def _eliminate(self, survivors: List[str]) -> List[str]:
+        objectives = self._objectives(survivors)
+        leader = int(np.argmin(objectives.mean(axis=1)))
+        rounds = objectives.shape[1]
+        t = student_t_quantile(self.confidence_level, rounds - 1)
+
+        res = []
+        for position, value in enumerate(survivors):
+            differences = objectives[position] - objectives[leader]
+            mean = differences.mean()
+            std = differences.std(ddof=1)
+            worse = mean > 0 and (std == 0 or mean / (std / math.sqrt(rounds)) > t)
+            if position == leader or not worse:
+                res.append(value)
+        return res
+
+    def _leader(self, survivors: List[str]) -> str:
+        return survivors[int(np.argmin(self._objectives(survivors).mean(axis=1)))]
+
+    def _current(self) -> Optional[int]:
+        '''
+        Return the next candidate which needs more rounds, eliminate candidates and fix parameters if needed
+        '''
+        state = self.state
+        options = state.strategy_state
+        while True:
+            if state.current_parameter_key is None:
+                return None
+            if options["candidates"] is None and not self._start_race():
+                return None
+
+            candidates = options["candidates"]
+            survivors = [value for value in options["survivors"]
+                         if candidates[value] not in state.skipped_configs]
+            for value in survivors:
+                candidate = candidates[value]
+                if candidate not in state.inflight_configs and self._received(candidate) < options["round"]:
+                    return candidate
+
+            # the step of the race is finished when none of the candidates is in flight
+            if any(candidates[value] in state.inflight_configs for value in survivors):
+                return None
+
+            if len(survivors) > 1 and options["round"] >= self.min_rounds:
+                survivors = self._eliminate(survivors)
+            options["survivors"] = survivors
+
+            if len(survivors) > 1 and options["round"] < self.max_rounds:
+                options["round"] += 1
+                continue
+
+            # the race is finished: fix the parameter to the value of the leader
+            if len(survivors) > 0:
+                state.selected[state.current_parameter_key] = self._leader(survivors)
+                state.narrow(state.selected)
+            options["candidates"] = None
+            if state.parameter_index < len(state.parameters) and len(state.remaining_configs) > 0:
+                state.current_parameter_key = state.get_next_key()
+            else:
+                state.current_parameter_key = None
+
+    def ask(self) -> Optional[HashableDict]:
+        current = self._current()
+        return None if current is None else self.state.space.decode(current)
+
+    def has_next(self) -> bool:
+        return self._current() is not None
+
+    def rounds(self, config: HashableDict) -> Optional[int]:
+        target = self.state.strategy_state["round"]
+        return max(target - self._received(self.state.space.index_of(config)), 0)
+
+    def schedule(self, valid_size: int) -> List[ScheduleStep]:
+        # no candidate is eliminated before max_rounds: a race hands out each candidate once per round
+        res = []
+        for position, key in enumerate(self.state.parameters):
+            candidates = min(len(self.state.parameters_dict[key]), valid_size)
+            rounds = self.max_rounds if candidates > 1 else 1
+            # the leader of the previous race is the candidate of the selected value
+            new_configs = candidates if position == 0 else max(candidates - 1, 0)
+            res.append(ScheduleStep(configs=candidates * rounds, new_configs=new_configs, rounds=1))
+        return res
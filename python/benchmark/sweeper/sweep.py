@@ -1,13 +1,21 @@
-# https://github.com/lovasoa/execo/blob/master/src/execo_engine/sweep.py
-from execo_engine import sweep, HashableDict
+from execo_engine import HashableDict
 from benchmark.data.config import ApplicationParameter, ApplicationParameters
 from benchmark.data.metric import Metric
-from benchmark.data.utils import ConstraintUtil, JsonUtil, DictUtil, ListUtil
+from benchmark.data.statistics import Aggregator, ScoreStatistics
+from benchmark.data.space import ConfigurationSpace
+from benchmark.data.utils import ConstraintUtil, JsonUtil, DictUtil
+from benchmark.sweeper.index import ConfigurationIndex
+from benchmark.sweeper.journal import SweeperJournal
+from benchmark.sweeper.pareto import ParetoArchive, dominates
+from benchmark.sweeper.pool import ConfigurationPool
+from benchmark.sweeper.scores import ScoreTable
+from benchmark.sweeper.strategy import SearchStrategy, PrioritySearchStrategy, ScheduleStep
 from marshmallow import fields, Schema, post_load
-from typing import List
+from typing import List, Set, Optional
 from pathlib import Path
 from abc import ABC
 from dataclasses import dataclass
+import numpy as np
 import shutil, os, random
 
 
@@ -17,27 +25,51 @@ class SweeperState:
     !!! TODO Should you add any new fields to SweeperState, please extend SweeperStateSchema too!
     '''
 
+    # objectives of the metrics with several components
+    COMPONENTWISE = "componentwise"
+    PARETO = "pareto"
+    WEIGHTED = "weighted"
+    OBJECTIVES = (COMPONENTWISE, PARETO, WEIGHTED)
+
     # use lt comparison when searching for the best configuration
     lower: bool
 
+    # how metrics with several components are compared: "componentwise" (a metric is better if all its components are
+    # better), "pareto" (a metric is better if it dominates the other one, the best configuration is the one of the
+    # Pareto front closest to the ideal point) or "weighted" (weighted sum of the components, objective_weights)
+    objective: str
+    objective_weights: Optional[List[float]]
+    # statistic of the scores of a configuration that is compared, the mean by default
+    aggregator: Aggregator
+
     # maximal number of train before picking one configuration for a parameter
     train: int
     remaining_train: int
 
+    # name of the SearchStrategy and its maximal number of scored configurations
+    strategy: str
+    budget: int
+    # options and progress of the SearchStrategy
+    strategy_state: dict
+
     """
-    scores :  mapping between a configuration and a list of results 
-                (e.g, {config1 -> [2s, 3s, 1.5s], config3 -> [2s, 3s, 1.5s], ...}). 
+    scores :  mapping between a configuration index and a list of results 
+                (e.g, {config1 -> [2s, 3s, 1.5s], config3 -> [2s, 3s, 1.5s], ...}), stored as columns.
                 Instantiated empty
     """
-    scores: dict
+    scores: ScoreTable
 
     # str -> List[int]
     parameters_dict: dict
 
-    # configurations
-    remaining_configs: List[HashableDict]
-    done_configs: List[HashableDict]
-    skipped_configs: List[HashableDict]
+    # lazy cartesian product of parameters_dict, its keys are ordered by priority (not serialized, derived from
+    # parameters_dict and parameters)
+    space: ConfigurationSpace
+
+    # configurations as indexes in space
+    remaining_configs: ConfigurationPool
+    done_configs: Set[int]
+    skipped_configs: Set[int]
 
     parameters: List[str]
     parameter_index: int
@@ -46,6 +78,36 @@ class SweeperState:
     # the concrete value bindings (configuration) for each parameter, that produce the best metric
     selected: HashableDict
 
+    # inverted index of the remaining, done and skipped configurations, and bitmap of the scored ones in it
+    # (not serialized, rebuilt on load)
+    index: ConfigurationIndex
+    scored: np.ndarray
+
+    # draws the configurations, its state is persisted so that a resumed sweep draws the same configurations
+    rng: random.Random
+
+    # running aggregates of the scores of each configuration index (not serialized, folded from scores on load)
+    statistics: dict
+    # config index -> rank of its first score, ties are broken in favour of the first scored configuration
+    scored_order: dict
+    # index of the best scored configuration starting with selected (not serialized, searched again on load)
+    incumbent: Optional[int]
+    incumbent_outdated: bool
+    # Pareto front of the mean metrics of the scored configurations (not serialized, folded from scores on load)
+    pareto: ParetoArchive
+
+    # indexes of the configurations handed out by a batch and not done or skipped yet (not serialized: the in-flight
+    # configurations of an interrupted sweep are handed out again)
+    inflight_configs: Set[int]
+
+    # index of a configuration handed out and not done or skipped yet -> number of metrics recorded since it was handed
+    # out, in the order they were handed out
+    pending: dict
+    # number of events of the journal applied to the state
+    journal_sequence: int
+    # number of done configurations imported from the results of previous sweeps, they do not count in the budget
+    imported_configs: int
+
     def __init__(self, **kwargs):
         if len(kwargs) == 0:
             pass
@@ -53,45 +115,101 @@ class SweeperState:
             application_parameters = kwargs.get("application_parameters", None)
             train = kwargs.get("train", 0)
             lower = kwargs.get("lower", True)
-            self._normal_init(application_parameters, train, lower)
-
-    def _normal_init(self, application_parameters, train, lower):
+            seed = kwargs.get("seed", None)
+            strategy = kwargs.get("strategy", PrioritySearchStrategy.NAME)
+            budget = kwargs.get("budget", None)
+            strategy_options = kwargs.get("strategy_options", None)
+            objective = kwargs.get("objective", None)
+            objective_weights = kwargs.get("objective_weights", None)
+            aggregator = kwargs.get("aggregator", None)
+            self._normal_init(application_parameters, train, lower, seed, strategy, budget, strategy_options,
+                              objective, objective_weights, aggregator)
+
+    def _normal_init(self, application_parameters, train, lower, seed, strategy, budget, strategy_options,
+                     objective=None, objective_weights=None, aggregator=None):
         # use lt comparison when searching for the best configuration
         self.lower = lower
 
+        # weights alone select the weighted sum
+        if objective is None:
+            objective = SweeperState.WEIGHTED if objective_weights is not None else SweeperState.COMPONENTWISE
+        if objective not in SweeperState.OBJECTIVES:
+            raise Exception(f"Unknown objective {objective}, expected one of {SweeperState.OBJECTIVES}.")
+        if objective == SweeperState.WEIGHTED and objective_weights is None:
+            raise Exception("The weighted objective needs objective_weights.")
+        self.objective = objective
+        self.objective_weights = objective_weights if objective == SweeperState.WEIGHTED else None
+        self.aggregator = Aggregator(aggregator or Aggregator.MEAN)
+
+        # by default, as many configurations as the priority sweep trains at most
+        self.strategy = strategy
+        self.budget = budget if budget is not None else train * len(application_parameters.parameters)
+        self.strategy_state = dict() if strategy_options is None else dict(strategy_options)
+
+        # a sweep is reproducible if the seed is set
+        self.rng = random.Random(seed)
+
         # maximal number of train before picking one configuration for a parameter
         self.remaining_train = self.train = train
 
         """
-        __scores :  mapping between a configuration and a list of results 
-                    (e.g, {config1 -> [2s, 3s, 1.5s], config3 -> [2s, 3s, 1.5s], ...}). 
+        __scores :  mapping between a configuration index and a list of results 
+                    (e.g, {config1 -> [2s, 3s, 1.5s], config3 -> [2s, 3s, 1.5s], ...}), stored as columns.
                     Instantiated empty
         """
-        self.scores = dict()
+        self.scores = ScoreTable()
 
-        # setup parameter_dict
+        # setup parameter_dict and parameter names
         parameters = application_parameters.parameters
         self.parameters_dict = self._to_parameters_dict(parameters)
-        filtered_after_constraints = sweep(self.parameters_dict)
+        self.parameters = self._to_list_of_key(parameters)
+        self.space = ConfigurationSpace(self.parameters_dict, self.parameters)
 
         # apply constraints
         constraints = application_parameters.constraints
         if constraints is not None:
-            filtered_after_constraints = ConstraintUtil.filter_valid_configs(filtered_after_constraints, constraints)
+            filtered_after_constraints = ConstraintUtil.filter_valid_configs(self.space, constraints)
+        else:
+            filtered_after_constraints = range(len(self.space))
 
-        # a list of configuration that have not been scored yet
-        self.remaining_configs = filtered_after_constraints
+        # indexes of the configurations that have not been scored yet
+        self.remaining_configs = ConfigurationPool(filtered_after_constraints)
         self.done_configs = set()
         self.skipped_configs = set()
+        self.inflight_configs = set()
+
+        self.pending = dict()
+        self.journal_sequence = 0
+        self.imported_configs = 0
 
-        # setup parameter names
-        self.parameters = self._to_list_of_key(parameters)
         self.parameter_index = 0
         self.current_parameter_key = self.get_next_key()
 
         # the concrete value bindings (configuration) for each parameter, that produce the best metric
         self.selected = HashableDict()
 
+        self._build_index()
+
+    def _build_index(self):
+        universe = np.concatenate([np.frombuffer(self.remaining_configs.to_array(), dtype=np.int64),
+                                   np.fromiter(self.done_configs, dtype=np.int64, count=len(self.done_configs)),
+                                   np.fromiter(self.skipped_configs, dtype=np.int64, count=len(self.skipped_configs))])
+        self.index = ConfigurationIndex(self.space, universe)
+        self.scored = self.index.bitmap(list(self.scores))
+
+        self.statistics = self.scores.statistics()
+        self.scored_order = {config_id: rank for rank, config_id in enumerate(self.scores)}
+        self.incumbent = None
+        self.incumbent_outdated = True
+
+        self.pareto = ParetoArchive()
+        for config_id in self.statistics:
+            self.pareto.update(config_id, self._oriented(self.get_score_by_index(config_id).components()))
+
+    def _oriented(self, components: List[float]) -> List[float]:
+        '''Components of a mean metric, to be minimized'''
+        return components if self.lower else [-component for component in components]
+
     def get_next_key(self):
         '''
         works as an iterator on all ApplicationParameters keys
@@ -100,15 +218,211 @@ class SweeperState:
         self.parameter_index += 1
         return res
 
+    def score(self, config, score):
+        config_id = self.space.index_of(config)
+        if config_id not in self.scores:
+            self.statistics[config_id] = ScoreStatistics()
+            self.scored_order[config_id] = len(self.scored_order)
+            self.index.add(self.scored, config_id)
+            previous = None
+        else:
+            previous = self.get_score_by_index(config_id)
+        self.scores.append(config_id, score)
+        if config_id in self.pending:
+            self.pending[config_id] += 1
+
+        self.statistics[config_id].add(score)
+        current = self.get_score_by_index(config_id)
+        self.pareto.update(config_id, self._oriented(current.components()))
+        self._update_incumbent(config_id, previous, current)
+
+    def get_score(self, config) -> Metric:
+        config_id = self.space.index_of(config)
+        if config_id not in self.statistics:
+            raise KeyError(f'The config {config} has not been tested yet.')
+        return self.get_score_by_index(config_id)
+
+    def get_score_by_index(self, config_id: int) -> Metric:
+        '''
+        the statistic of the aggregator over the scores of a configuration, maintained incrementally for the mean
+        '''
+        if self.aggregator.is_mean():
+            return self.statistics[config_id].get_mean()
+        return Metric.from_components(self.aggregator.aggregate(self.scores.components(config_id)))
+
+    def get_statistics(self, config) -> ScoreStatistics:
+        config_id = self.space.index_of(config)
+        if config_id not in self.statistics:
+            raise KeyError(f'The config {config} has not been tested yet.')
+        return self.statistics[config_id]
+
+    def is_better(self, score: Metric, other: Metric) -> bool:
+        if self.objective == SweeperState.COMPONENTWISE:
+            return score < other if self.lower else score > other
+        if self.objective == SweeperState.PARETO:
+            return dominates(tuple(self._oriented(score.components())),
+                             tuple(self._oriented(other.components())))
+        weighted_score = float(np.dot(self.objective_weights, score.components()))
+        weighted_other = float(np.dot(self.objective_weights, other.components()))
+        return weighted_score < weighted_other if self.lower else weighted_score > weighted_other
+
+    def _update_incumbent(self, config_id: int, previous: Optional[Metric], score: Metric):
+        if self.objective == SweeperState.PARETO:
+            # the point closest to the ideal point depends on the whole front
+            self.incumbent_outdated = True
+            return
+        if self.incumbent_outdated or self.selected is None or not self.space.matches(config_id, self.selected):
+            return
+        if self.incumbent is None:
+            self.incumbent = config_id
+        elif self.incumbent == config_id:
+            # the incumbent got worse, another scored configuration might be better now
+            if previous is not None and self.is_better(previous, score):
+                self.incumbent_outdated = True
+        elif self.is_better(score, self.get_score(self.space.decode(self.incumbent))):
+            self.incumbent = config_id
+
+    def scored_starting_with(self, start: dict) -> List[HashableDict]:
+        '''
+        return the scored configurations which start with start, in the order of their first score
+        '''
+        indexes = sorted((int(index) for index in self.index.matching(start, self.scored)),
+                         key=lambda index: self.scored_order[index])
+        return [self.space.decode(index) for index in indexes]
+
+    def _search_best(self, start: dict) -> Optional[HashableDict]:
+        if self.objective == SweeperState.PARETO:
+            return self._search_best_compromise(start)
+        best_config = None
+        best_score = None
+        for config in self.scored_starting_with(start):
+            score = self.get_score(config)
+            if best_config is None or self.is_better(score, best_score):
+                best_config = config
+                best_score = score
+        return best_config
+
+    def _search_best_compromise(self, start: dict) -> Optional[HashableDict]:
+        '''
+        The configuration of the Pareto front of the configurations which start with start that is the closest to the
+        ideal point, once the objectives are normalized to [0, 1] over the front
+        '''
+        ids = self.index.matching(start, self.scored).tolist()
+        if len(ids) == 0:
+            return None
+        front = ParetoArchive.front_of(ids, [self.pareto.point(config_id) for config_id in ids])
+        # ties are broken in favour of the first scored configuration
+        front.sort(key=lambda config_id: self.scored_order[config_id])
+        points = np.array([self.pareto.point(config_id) for config_id in front])
+        span = points.max(axis=0) - points.min(axis=0)
+        span[span == 0] = 1.0
+        distances = np.linalg.norm((points - points.min(axis=0)) / span, axis=1)
+        return self.space.decode(front[int(np.argmin(distances))])
+
+    def sort_best_first(self, config_ids: List[int]) -> List[int]:
+        '''
+        Sort scored configuration indexes from the best one with a total order, since the componentwise and the
+        Pareto comparisons are partial: the weighted sum of the components for the weighted objective, otherwise the
+        rank of the non-dominated front of the configuration (a configuration better than another one is on an earlier
+        front), then its distance to the ideal point of its front, once the objectives are normalized to [0, 1] over
+        the front. Ties keep the order of config_ids
+        '''
+        if len(config_ids) == 0:
+            return []
+        points = np.array([self._oriented(self.get_score_by_index(config_id).components()) for config_id in config_ids],
+                          dtype=np.float64)
+        if self.objective == SweeperState.WEIGHTED:
+            order = np.argsort(points @ np.array(self.objective_weights, dtype=np.float64), kind="stable")
+            return [config_ids[position] for position in order]
+
+        keys = [None] * len(config_ids)
+        positions = list(range(len(config_ids)))
+        rank = 0
+        while len(positions) > 0:
+            front = ParetoArchive.front_of(positions, points[positions])
+            front_points = points[front]
+            span = front_points.max(axis=0) - front_points.min(axis=0)
+            span[span == 0] = 1.0
+            distances = np.linalg.norm((front_points - front_points.min(axis=0)) / span, axis=1)
+            for position, distance in zip(front, distances):
+                keys[position] = (rank, float(distance))
+            members = set(front)
+            positions = [position for position in positions if position not in members]
+            rank += 1
+        order = sorted(range(len(config_ids)), key=lambda position: keys[position])
+        return [config_ids[position] for position in order]
+
+    def pareto_front(self) -> List[HashableDict]:
+        '''
+        the scored configurations whose mean metric is not dominated by the mean metric of another one
+        '''
+        return [self.space.decode(config_id) for config_id in self.pareto.front()]
+
+    def best_starting_with(self, start: dict) -> Optional[HashableDict]:
+        '''
+        return the best scored configuration which starts with start
+        '''
+        if start is None:
+            return None
+        if start != self.selected:
+            return self._search_best(start)
+
+        # the incumbent stays valid when a value of the incumbent is added to selected
+        if self.incumbent_outdated:
+            best = self._search_best(start)
+            self.incumbent = None if best is None else self.space.index_of(best)
+            self.incumbent_outdated = False
+        return None if self.incumbent is None else self.space.decode(self.incumbent)
+
+    def narrow(self, start: dict):
+        '''
+        keep the remaining configurations which start with start
+        '''
+        remaining = np.frombuffer(self.remaining_configs.to_array(), dtype=np.int64)
+        narrowed = np.intersect1d(remaining, self.index.matching(start), assume_unique=True)
+        self.remaining_configs = ConfigurationPool(narrowed.tolist())
+
+    def draw(self) -> Optional[HashableDict]:
+        '''
+        draw a remaining configuration which is not in flight, None if all of them are in flight
+        '''
+        inflight_remaining = sum(1 for index in self.inflight_configs if index in self.remaining_configs)
+        if inflight_remaining == len(self.remaining_configs):
+            return None
+        while True:
+            index = self.remaining_configs.choice(self.rng)
+            if index not in self.inflight_configs:
+                return self.space.decode(index)
+
     def done(self, config):
-        self.remaining_configs.remove(config)
-        self.done_configs.add(config)
-        SweeperStatePersistence.persist_state(self)
+        # a strategy may score a configuration again after it is done
+        index = self.space.index_of(config)
+        self.remaining_configs.discard(index)
+        self.inflight_configs.discard(index)
+        self.pending.pop(index, None)
+        self.done_configs.add(index)
 
     def skipped(self, config):
-        self.skipped_configs.add(config)
-        self.remaining_configs.remove(config)
-        SweeperStatePersistence.persist_state(self)
+        index = self.space.index_of(config)
+        self.skipped_configs.add(index)
+        self.remaining_configs.discard(index)
+        self.inflight_configs.discard(index)
+        self.pending.pop(index, None)
+
+    def can_import(self, config) -> bool:
+        '''
+        a configuration of a previous sweep can be imported if it is a valid configuration not scored yet
+        '''
+        if config not in self.space:
+            return False
+        index = self.space.index_of(config)
+        return index in self.remaining_configs and index not in self.statistics and index not in self.pending
+
+    def imported(self, config, metrics: List[Metric]):
+        for metric in metrics:
+            self.score(config, metric)
+        self.done(config)
+        self.imported_configs += 1
 
     @staticmethod
     def _to_list_of_key(parameters: List[ApplicationParameter]):
@@ -124,102 +438,278 @@ class SweeperState:
         return SweeperStateSchema()
 
 
+@dataclass
+class SweepPlan:
+    # number of configurations in the cartesian product of the parameter values
+    space_size: int
+    # number of configurations that satisfy the constraints
+    valid_size: int
+    # upper bound of the number of configurations scored by the Sweeper
+    max_scored_configs: int
+    # upper bound of the configurations handed out by the SearchStrategy, step by step
+    schedule: List[ScheduleStep]
+
+
 class Sweeper:
+    '''
+    Every configuration handed out, metric and done or skipped configuration is appended to a journal before it is
+    applied to the SweeperState. The state is loaded from its last snapshot and the journal is replayed when a sweep is
+    resumed, then the configurations that were not done are handed out again, and they only need their missing rounds.
+    The snapshot is rewritten (and the journal emptied) after _SNAPSHOT_EVERY events.
+    '''
+
+    _SNAPSHOT_EVERY = 1000
 
     def __init__(self, application_parameters: ApplicationParameters, train: int, lower: bool = True,
-                 remove_workdir: bool = False):
+                 remove_workdir: bool = False, seed: Optional[int] = None,
+                 strategy: str = PrioritySearchStrategy.NAME, budget: Optional[int] = None,
+                 strategy_options: Optional[dict] = None, objective: Optional[str] = None,
+                 objective_weights: Optional[List[float]] = None, aggregator: Optional[str] = None):
+        '''
+        strategy: name of the SearchStrategy, "priority", "surrogate", "halving", "hyperband" or "racing"
+        budget: maximal number of scored configurations of the "surrogate" strategy, number of configurations of the
+                first rung of "halving" and "hyperband" (train * number of parameters by default)
+        strategy_options: options of the strategy, e.g. "eta", "min_rounds" and "max_rounds" of "halving", or
+                          "confidence_level" of "racing"
+        objective: comparison of the metrics with several components, "componentwise" (default), "pareto" or
+                   "weighted" (default if objective_weights is set)
+        objective_weights: weights of the components of the metrics for the "weighted" objective
+        aggregator: name of the Aggregator of the scores of a configuration, "mean" (default), "median", "p90",
+                    "trimmed_mean", "bootstrap"...
+        '''
         if remove_workdir:
             SweeperStatePersistence.remove_workdir()
+        self.__journal = SweeperStatePersistence.journal()
         if SweeperStatePersistence.persisted_state_exists():
             self.__state = SweeperStatePersistence.load_state()
+            self.__strategy = SearchStrategy.create(self.__state.strategy, self.__state)
+            self._replay(self.__journal.read())
+        else:
+            self.__state = SweeperState(application_parameters=application_parameters, train=train, lower=lower,
+                                        seed=seed, strategy=strategy, budget=budget,
+                                        strategy_options=strategy_options, objective=objective,
+                                        objective_weights=objective_weights, aggregator=aggregator)
+            self.__strategy = SearchStrategy.create(self.__state.strategy, self.__state)
+            # the journal is written ahead of this first snapshot
+            self._snapshot()
+        self.__snapshot_sequence = self.__state.journal_sequence
+        # configurations handed out before the sweep was interrupted, they are handed out again first
+        self.__resumed = list(self.__state.pending)
+
+    @staticmethod
+    def plan(application_parameters: ApplicationParameters, train: int, budget: Optional[int] = None,
+             strategy: str = PrioritySearchStrategy.NAME, strategy_options: Optional[dict] = None) -> SweepPlan:
+        '''
+        Size the sweep without enumerating the configurations
+        '''
+        parameters = application_parameters.parameters
+        space = ConfigurationSpace(SweeperState._to_parameters_dict(parameters), SweeperState._to_list_of_key(parameters))
+        constraints = application_parameters.constraints
+        valid_size = len(space) if constraints is None else ConstraintUtil.compile(space, constraints).count()
+
+        # the strategy only reads its options and the size of the sweep from the state
+        state = SweeperState()
+        state.train = train
+        state.budget = budget if budget is not None else train * len(parameters)
+        state.strategy_state = dict() if strategy_options is None else dict(strategy_options)
+        state.parameters = SweeperState._to_list_of_key(parameters)
+        state.parameters_dict = SweeperState._to_parameters_dict(parameters)
+        schedule = SearchStrategy.create(strategy, state).schedule(valid_size)
+        return SweepPlan(space_size=len(space), valid_size=valid_size,
+                         max_scored_configs=sum(step.new_configs for step in schedule), schedule=schedule)
+
+    def _record(self, event: dict):
+        state = self.__state
+        state.journal_sequence += 1
+        event["seq"] = state.journal_sequence
+        self.__journal.append(event)
+
+    def _snapshot(self):
+        SweeperStatePersistence.persist_state(self.__state)
+        self.__journal.truncate()
+        self.__snapshot_sequence = self.__state.journal_sequence
+
+    def _replay(self, events: List[dict]):
+        '''
+        Apply the events of the journal that are not in the snapshot. The configurations are asked from the strategy
+        again, which draws the same ones because its progress and the random generator are in the state.
+        '''
+        state = self.__state
+        for event in events:
+            if event["seq"] <= state.journal_sequence:
+                continue
+            config_id = event["config"]
+            config = state.space.decode(config_id)
+            if event["event"] == "ask":
+                asked = self.__strategy.ask()
+                if asked != config:
+                    raise Exception(f"The journal of the sweeper does not match its state: {config} was handed out, " +
+                                    f"but the strategy asks {asked}.")
+                state.pending[config_id] = 0
+                if event["batch"]:
+                    state.inflight_configs.add(config_id)
+            elif event["event"] == "score":
+                score = Metric.from_string(event["metric"])
+                state.score(config, score)
+                self.__strategy.tell(config, score)
+            elif event["event"] == "done":
+                state.done(config)
+            elif event["event"] == "skipped":
+                state.skipped(config)
+            elif event["event"] == "import":
+                metrics = [Metric.from_string(metric) for metric in event["metrics"]]
+                state.imported(config, metrics)
+                for metric in metrics:
+                    self.__strategy.tell(config, metric)
+                self.__strategy.imported(config)
+            state.journal_sequence = event["seq"]
+        # the pending configurations are handed out again
+        state.inflight_configs.clear()
+
+    def _hand_out(self, batch: bool) -> Optional[HashableDict]:
+        state = self.__state
+        if len(self.__resumed) > 0:
+            config_id = self.__resumed.pop(0)
         else:
-            self.__state = SweeperState(application_parameters=application_parameters, train=train, lower=lower)
+            config = self.__strategy.ask()
+            if config is None:
+                return None
+            config_id = state.space.index_of(config)
+            self._record({"event": "ask", "config": config_id, "batch": batch})
+            state.pending[config_id] = 0
+        if batch:
+            state.inflight_configs.add(config_id)
+        return state.space.decode(config_id)
 
     def done(self, config):
+        self._record({"event": "done", "config": self.__state.space.index_of(config)})
         self.__state.done(config)
+        self._compact()
 
     def skipped(self, config):
+        self._record({"event": "skipped", "config": self.__state.space.index_of(config)})
         self.__state.skipped(config)
+        self._compact()
 
-    def _find_best(self, scores: dict, starting_with: dict):
+    def warm_start(self, scores_by_config: dict) -> int:
         '''
-        scores: dict: dict -> Metric 
-        starting_with: dict
-        The returned solution must start with starting_with
+        Import the metrics of configurations measured by previous sweeps (config -> list of metrics): they are scored
+        and done, so the search starts from the best of them. Configurations that are not valid in this sweep or already
+        scored are ignored. Return the number of imported configurations.
         '''
-        best_config = None
-        best_score = None
-        for config in scores:
-            score = self.get_score(config)
-            if DictUtil.contains_subdictionary(config, starting_with):
-                if best_config is None:
-                    best_config = config
-                    best_score = score
-                elif self.__state.lower:
-                    if score < best_score:
-                        best_config = config
-                        best_score = score
-                else:
-                    if score > best_score:
-                        best_config = config
-                        best_score = score
-        return best_config
+        state = self.__state
+        res = 0
+        for config, metrics in scores_by_config.items():
+            if len(metrics) == 0 or not state.can_import(config):
+                continue
+            self._record({"event": "import", "config": state.space.index_of(config),
+                          "metrics": [str(metric) for metric in metrics]})
+            state.imported(config, metrics)
+            for metric in metrics:
+                self.__strategy.tell(config, metric)
+            self.__strategy.imported(config)
+            res += 1
+        if res > 0:
+            self._snapshot()
+        return res
+
+    def _compact(self):
+        if self.__state.journal_sequence - self.__snapshot_sequence >= Sweeper._SNAPSHOT_EVERY:
+            self._snapshot()
+
+    def close(self):
+        '''
+        Snapshot the state and close the journal, at the end of a sweep
+        '''
+        self._snapshot()
+        self.__journal.close()
 
     def get_next(self):
+        res = self._hand_out(batch=False)
+        if res is None:
+            self._finalize_selected()
+        return res
+
+    def get_next_batch(self, k: int) -> List[HashableDict]:
+        '''
+        Return at most k configurations to score concurrently, they are in flight until they are done or skipped.
+        Fewer configurations are returned if the next ones depend on the metrics of the in-flight configurations,
+        none if the sweep is finished.
+        '''
         state = self.__state
-        if len(state.remaining_configs) == 0:
+        res = []
+        while len(res) < k:
+            config = self._hand_out(batch=True)
+            if config is None:
+                break
+            res.append(config)
+        if len(res) == 0 and len(state.inflight_configs) == 0:
             self._finalize_selected()
-            return None
-        elif state.remaining_train == 0:
-            # Find best sequence of argument, starting with already selected ones
-            best = self._find_best(state.scores, state.selected)
-            # Add the new config value to the selected ones
-            state.selected[state.current_parameter_key] = best[state.current_parameter_key]
-            state.remaining_configs = Sweeper._all_start_with(state.remaining_configs, state.selected)
-            if len(state.remaining_configs) != 0:
-                # Increase the index of the focused param
-                state.current_parameter_key = state.get_next_key()
-                # Restart the maximal number of train
-                state.remaining_train = state.train
-                return self.get_next()
-        else:
-            res = random.choice(state.remaining_configs)
-            state.remaining_train -= 1
-            return res
+        return res
 
     def has_next(self):
-        has_remaining = len(self.__state.remaining_configs) != 0
+        # the strategy is not called before the resumed configurations are done, as in the interrupted sweep
+        has_remaining = len(self.__resumed) > 0 or len(self.__state.inflight_configs) > 0 or \
+                        self.__strategy.has_next()
         if not has_remaining:
             self._finalize_selected()
         return has_remaining
 
     def _finalize_selected(self):
-        self.__state.selected = self._find_best(self.__state.scores, self.__state.selected)
+        self.__state.selected = self.__strategy.best()
 
     def score(self, config, score):
-        if config not in self.__state.scores:
-            self.__state.scores[config] = list()
-        self.__state.scores[config].append(score)
+        self._record({"event": "score", "config": self.__state.space.index_of(config), "metric": str(score)})
+        self.__state.score(config, score)
+        self.__strategy.tell(config, score)
 
-    def get_score(self, config) -> Metric:
-        if config in self.__state.scores:
-            metrics = self.__state.scores[config]
-            length = len(metrics)
+    def get_rounds(self, config, default: int) -> int:
+        '''
+        Number of measurement rounds to run for config, default if the strategy does not decide it
+        '''
+        rounds = self.__strategy.rounds(config)
+        if rounds is None:
+            # a configuration handed out again after an interruption only needs its missing rounds
+            rounds = max(default - self.__state.pending.get(self.__state.space.index_of(config), 0), 0)
+        return rounds
 
-            if length == 0:
-                raise KeyError(f"No metric was recorded for the config: {config}")
+    def strategy_decides_rounds(self, config) -> bool:
+        '''
+        Whether the strategy decides the number of measurement rounds of config, instead of the benchmark
+        '''
+        return self.__strategy.rounds(config) is not None
 
-            sum = metrics[0]
-            for metric in metrics[1:]:
-                # do not replace it with += otherwise metrics[0] will be modified!
-                sum = sum + metric
+    def get_rounds_received(self, config) -> int:
+        return self.__state.scores.count(self.__state.space.index_of(config))
 
-            return sum / length
-        else:
-            raise KeyError(f'The config {config} has not been tested yet.')
+    def get_score(self, config) -> Metric:
+        return self.__state.get_score(config)
+
+    def get_statistics(self, config) -> ScoreStatistics:
+        return self.__state.get_statistics(config)
+
+    def get_scores(self, config) -> List[Metric]:
+        return self.__state.scores.metrics(self.__state.space.index_of(config))
 
     def get_all_scores_by_config(self):
-        return self.__state.scores
+        return dict(self.iter_scores_by_config())
+
+    def iter_scores_by_config(self):
+        '''
+        (config, list of metrics) pairs of the scored configurations, decoded one at a time
+        '''
+        state = self.__state
+        for config_id in state.scores:
+            yield state.space.decode(config_id), state.scores.metrics(config_id)
+
+    def is_pareto_optimal(self, config) -> bool:
+        return self.__state.space.index_of(config) in self.__state.pareto
+
+    def get_pareto_front(self) -> List[HashableDict]:
+        '''
+        The scored configurations whose mean metric is not dominated, whatever the objective of the sweep
+        '''
+        return self.__state.pareto_front()
 
     def has_best(self):
         return self.best is not None
@@ -230,63 +720,86 @@ class Sweeper:
 
     @property
     def skipped_configs(self):
-        return self.__state.skipped_configs
+        return [self.__state.space.decode(index) for index in self.__state.skipped_configs]
 
     def __str__(self):
         state = self.__state
         res = f"Parameters fields: {state.parameters_dict}\n"
-        res += f"Current scored configurations: {state.scores}\n"
+        res += f"Current scored configurations: {self.get_all_scores_by_config()}\n"
         res += f"Number of not-scored configurations: {len(state.remaining_configs)}\n"
-        res += f"Skipped configurations: {state.skipped_configs}\n"
+        res += f"Skipped configurations: {self.skipped_configs}\n"
         res += f"Current best configuration: {state.selected}"
         return res
 
-    @staticmethod
-    def _all_start_with(sequences: List[dict], start: dict):
-        '''
-        return the sequences which starts with start
-        '''
-        return [seq for seq in sequences if DictUtil.contains_subdictionary(seq, start)]
+
+class ConfigurationField(fields.Integer):
+    '''
+    Index of a configuration in the ConfigurationSpace. States written before the indexes stored the configurations as
+    dicts, they are converted once the ConfigurationSpace is known
+    '''
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, dict):
+            return DictUtil.clone_into(value, HashableDict())
+        return super()._deserialize(value, attr, data, **kwargs)
 
 
 class SweeperStateSchema(Schema):
     lower = fields.Boolean()
     train = fields.Integer()
     remaining_train = fields.Integer()
-    # are serialized as two lists, because marshmallow cannot serialize dicts whose keys are dicts
+    strategy = fields.String(load_default=PrioritySearchStrategy.NAME)
+    budget = fields.Integer(load_default=None, allow_none=True)
+    strategy_state = fields.Dict(load_default=dict)
+    objective = fields.String(load_default=SweeperState.COMPONENTWISE)
+    objective_weights = fields.List(fields.Float(), load_default=None, allow_none=True)
+    aggregator = fields.Method("serialize_aggregator", deserialize="deserialize_aggregator", load_default=Aggregator)
+    # are serialized as columns: configuration indexes and flat metric components
     scores = fields.Method("serialize_scores", deserialize="deserialize_scores")
     parameters_dict = fields.Dict()
-    # fields.Method() is not embedded in fields.List() due to a bug in marshmallow
-    remaining_configs = fields.Method("serialize_remaining_configs", deserialize="deserialize_hashable_dict_list")
-    # fields.Method() is not embedded in fields.List() due to a bug in marshmallow
-    done_configs = fields.Method("serialize_done_configs", deserialize="deserialize_hashable_dict_set")
-    # fields.Method() is not embedded in fields.List() due to a bug in marshmallow
-    skipped_configs = fields.Method("serialize_skipped_configs", deserialize="deserialize_hashable_dict_set")
+    # configurations are serialized as their indexes in the ConfigurationSpace
+    remaining_configs = fields.List(ConfigurationField())
+    done_configs = fields.List(ConfigurationField())
+    skipped_configs = fields.List(ConfigurationField())
     parameters = fields.List(fields.String())
     parameter_index = fields.Integer()
-    current_parameter_key = fields.String()
+    current_parameter_key = fields.String(allow_none=True)
     selected = fields.Method("serialize_selected", deserialize="deserialize_hashable_dict")
+    rng = fields.Method("serialize_rng", deserialize="deserialize_rng", load_default=random.Random)
+    # [config index, number of metrics] pairs, in the order the configurations were handed out
+    pending = fields.Method("serialize_pending", deserialize="deserialize_pending", load_default=list)
+    journal_sequence = fields.Integer(load_default=0)
+    imported_configs = fields.Integer(load_default=0)
 
-    def serialize_scores(self, obj):
-        keys = ListUtil.to_list(obj.scores.keys())
-
-        # [serialized_metric_1_1;serialized_metric_1_2;...],[s_m_2_1;s_m_2_2]
-        values = [f"[{';'.join(str(metric) for metric in metrics)}]" for metrics in obj.scores.values()]
-        return [keys, values]
+    # fields stored as NumPy arrays by the binary snapshot
+    ARRAY_FIELDS = ("scores", "remaining_configs", "done_configs", "skipped_configs")
 
-    def serialize_remaining_configs(self, obj):
-        return DictUtil.clone_list_of_dictionaries(obj.remaining_configs)
-
-    def serialize_done_configs(self, obj):
-        return DictUtil.clone_list_of_dictionaries(obj.done_configs)
+    def serialize_scores(self, obj):
+        ids, values = obj.scores.columns()
+        return {"width": obj.scores.width, "ids": ids.tolist(), "values": values.ravel().tolist()}
 
-    def serialize_skipped_configs(self, obj):
-        return DictUtil.clone_list_of_dictionaries(obj.skipped_configs)
+    def serialize_aggregator(self, obj):
+        return obj.aggregator.name
 
     def serialize_selected(self, obj):
         return DictUtil.clone(obj.selected)
 
+    def serialize_rng(self, obj):
+        # (version, internal state, gauss_next)
+        return obj.rng.getstate()
+
+    def serialize_pending(self, obj):
+        return [[config_id, rounds] for config_id, rounds in obj.pending.items()]
+
     def deserialize_scores(self, value):
+        if isinstance(value, dict):
+            width = value["width"]
+            values = np.array(value["values"], dtype=np.float64)
+            return ScoreTable.from_columns(np.array(value["ids"], dtype=np.int64),
+                                           values.reshape(-1, width) if width is not None else values.reshape(0, 0))
+
+        # states written before the columns: [configurations, "[metric_1;metric_2;...]" strings], converted to a
+        # ScoreTable once the ConfigurationSpace is known
         keys = value[0]
         values_list = value[1]
 
@@ -299,40 +812,86 @@ class SweeperStateSchema(Schema):
 
         return deserialized
 
+    def deserialize_aggregator(self, value):
+        return Aggregator(value)
+
     def deserialize_hashable_dict(self, value):
         return DictUtil.clone_into(value, HashableDict())
 
-    def deserialize_hashable_dict_list(self, value):
-        return [self.deserialize_hashable_dict(item) for item in value]
+    def deserialize_pending(self, value):
+        return {config_id: rounds for config_id, rounds in value}
 
-    def deserialize_hashable_dict_set(self, value):
-        return {self.deserialize_hashable_dict(item) for item in value}
+    def deserialize_rng(self, value):
+        rng = random.Random()
+        rng.setstate((value[0], tuple(value[1]), value[2]))
+        return rng
 
     @post_load
     def create_state(self, deserialized, **kwargs):
+        # the header of a binary snapshot, its array fields are added by SweeperStatePersistence
+        if any(name not in deserialized for name in SweeperStateSchema.ARRAY_FIELDS):
+            return deserialized
+        return SweeperStateSchema.to_state(deserialized)
+
+    @staticmethod
+    def to_state(deserialized: dict) -> SweeperState:
         res = SweeperState()
         res.lower = deserialized["lower"]
         res.train = deserialized["train"]
         res.remaining_train = deserialized["remaining_train"]
-        res.scores = deserialized["scores"]
-        res.remaining_configs = deserialized["remaining_configs"]
-        res.done_configs = deserialized["done_configs"]
-        res.skipped_configs = deserialized["skipped_configs"]
+        res.strategy = deserialized["strategy"]
+        res.budget = deserialized["budget"]
+        res.strategy_state = deserialized["strategy_state"]
+        res.objective = deserialized["objective"]
+        res.objective_weights = deserialized["objective_weights"]
+        res.aggregator = deserialized["aggregator"]
         res.parameters = deserialized["parameters"]
         res.parameter_index = deserialized["parameter_index"]
         res.current_parameter_key = deserialized["current_parameter_key"]
         res.selected = deserialized["selected"]
         res.parameters_dict = deserialized["parameters_dict"]
+        res.space = ConfigurationSpace(res.parameters_dict, res.parameters)
+
+        def indexes(configs):
+            return [res.space.index_of(config) if isinstance(config, dict) else config for config in configs]
+
+        res.remaining_configs = ConfigurationPool(indexes(deserialized["remaining_configs"]))
+        res.done_configs = set(indexes(deserialized["done_configs"]))
+        res.skipped_configs = set(indexes(deserialized["skipped_configs"]))
+        res.inflight_configs = set()
+        res.rng = deserialized["rng"]
+        res.pending = dict(deserialized["pending"])
+        res.journal_sequence = deserialized["journal_sequence"]
+        res.imported_configs = deserialized["imported_configs"]
+
+        res.scores = deserialized["scores"]
+        if not isinstance(res.scores, ScoreTable):
+            scores = ScoreTable()
+            for config, metrics in res.scores.items():
+                for metric in metrics:
+                    scores.append(res.space.index_of(config), metric)
+            res.scores = scores
+
+        res._build_index()
         return res
 
 
 class SweeperStatePersistence(ABC):
+    """
+    The state is snapshotted in a binary file: a NumPy .npz archive with the configurations and the score columns as
+    arrays, and the other fields as a JSON header. States of the JSON format (sweeper_state.json) are still loaded.
+    """
     _WORKDIR_PATH = Path("./sweeper_workdir")
     _WORKDIR_PATH_STR = str(_WORKDIR_PATH)
 
     _STATE_FILE = _WORKDIR_PATH / "sweeper_state.json"
     _STATE_FILE_STR = str(_STATE_FILE)
 
+    _BINARY_STATE_FILE_STR = str(_WORKDIR_PATH / "sweeper_state.npz")
+    _BINARY_STATE_TMP_FILE_STR = str(_WORKDIR_PATH / "sweeper_state.npz.tmp")
+
+    _JOURNAL_FILE = _WORKDIR_PATH / "sweeper_journal.jsonl"
+
     @staticmethod
     def remove_workdir():
         if os.path.isdir(SweeperStatePersistence._WORKDIR_PATH_STR):
@@ -345,13 +904,39 @@ class SweeperStatePersistence(ABC):
 
     @staticmethod
     def load_state() -> SweeperState:
-        return JsonUtil.deserialize(SweeperStatePersistence._STATE_FILE_STR, SweeperState)
+        if not os.path.exists(SweeperStatePersistence._BINARY_STATE_FILE_STR):
+            return JsonUtil.deserialize(SweeperStatePersistence._STATE_FILE_STR, SweeperState)
+
+        with np.load(SweeperStatePersistence._BINARY_STATE_FILE_STR) as snapshot:
+            schema = SweeperStateSchema(exclude=SweeperStateSchema.ARRAY_FIELDS)
+            deserialized = schema.loads(str(snapshot["header"]))
+            deserialized["scores"] = ScoreTable.from_columns(snapshot["score_ids"], snapshot["score_values"])
+            deserialized["remaining_configs"] = snapshot["remaining_configs"].tolist()
+            deserialized["done_configs"] = snapshot["done_configs"].tolist()
+            deserialized["skipped_configs"] = snapshot["skipped_configs"].tolist()
+        return SweeperStateSchema.to_state(deserialized)
 
     @staticmethod
     def persist_state(state: SweeperState):
+        # the snapshot is replaced atomically, so a crash leaves either the previous or the new one
         SweeperStatePersistence.create_workdir()
-        JsonUtil.serialize(SweeperStatePersistence._STATE_FILE_STR, state, SweeperState)
+        header = SweeperStateSchema(exclude=SweeperStateSchema.ARRAY_FIELDS).dumps(state)
+        score_ids, score_values = state.scores.columns()
+        with open(SweeperStatePersistence._BINARY_STATE_TMP_FILE_STR, "wb") as file:
+            np.savez(file, header=np.array(header), score_ids=score_ids, score_values=score_values,
+                     remaining_configs=np.frombuffer(state.remaining_configs.to_array(), dtype=np.int64),
+                     done_configs=np.fromiter(state.done_configs, dtype=np.int64, count=len(state.done_configs)),
+                     skipped_configs=np.fromiter(state.skipped_configs, dtype=np.int64,
+                                                 count=len(state.skipped_configs)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(SweeperStatePersistence._BINARY_STATE_TMP_FILE_STR, SweeperStatePersistence._BINARY_STATE_FILE_STR)
+
+    @staticmethod
+    def journal() -> SweeperJournal:
+        return SweeperJournal(SweeperStatePersistence._JOURNAL_FILE)
 
     @staticmethod
     def persisted_state_exists() -> bool:
-        return os.path.exists(SweeperStatePersistence._STATE_FILE_STR)
+        return os.path.exists(SweeperStatePersistence._BINARY_STATE_FILE_STR) or \
+               os.path.exists(SweeperStatePersistence._STATE_FILE_STR)
@@ -0,0 +1,43 @@
+from benchmark.data.config import ApplicationParameterConstraint, ParameterBinding, ConstraintType
+from benchmark.data.space import ConfigurationSpace
+from benchmark.data.utils import ConstraintUtil
+from execo_engine import sweep
+import random, time
+
+"""
+Filtering throughput of the constraints: list of configurations (Python loop over every merged constraint for every
+configuration) vs ConfigurationSpace (compiled constraints evaluated with NumPy masks).
+"""
+
+number_of_parameters = 9
+number_of_values = 4
+number_of_constraints = 40
+rng = random.Random(42)
+
+parameters_dict = {f"-p{p}": [f"v{v}" for v in range(number_of_values)] for p in range(number_of_parameters)}
+names = list(parameters_dict.keys())
+
+constraints = []
+for _ in range(number_of_constraints):
+    source, target = rng.sample(names, 2)
+    constraint_type = rng.choice([ConstraintType.MUST, ConstraintType.FORBIDDEN])
+    targets = [ParameterBinding(name=target, value=value) for value in rng.sample(parameters_dict[target], 2)]
+    constraints.append(ApplicationParameterConstraint(source=ParameterBinding(source, rng.choice(parameters_dict[source])),
+                                                      targets=targets, type=constraint_type.name))
+
+space = ConfigurationSpace(parameters_dict)
+print(f"{len(space)} configurations, {len(constraints)} constraints")
+
+start = time.perf_counter()
+configs = sweep(parameters_dict)
+valid_configs = ConstraintUtil.filter_valid_configs(configs, constraints)
+list_seconds = time.perf_counter() - start
+print(f"list:  {len(valid_configs)} valid in {list_seconds:.3f}s, {len(space) / list_seconds:,.0f} configs/s")
+
+start = time.perf_counter()
+valid_indexes = ConstraintUtil.filter_valid_configs(space, constraints)
+space_seconds = time.perf_counter() - start
+print(f"space: {len(valid_indexes)} valid in {space_seconds:.3f}s, {len(space) / space_seconds:,.0f} configs/s")
+
+assert {space.index_of(config) for config in valid_configs} == set(valid_indexes)
+print(f"speedup: {list_seconds / space_seconds:.1f}x")
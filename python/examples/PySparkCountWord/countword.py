@@ -0,0 +1,21 @@
+from pyspark import StorageLevel
+import re
+
+
+def count_word(spark, arguments):
+    '''
+    Count word of ParametrizableCountWord.jar, run in the PySpark session of the benchmark
+    '''
+    partition = int(arguments.get("partition", 4))
+    lines = spark.sparkContext.textFile(arguments["filename"], partition)
+    for _ in range(1, int(arguments.get("replicate", 1))):
+        lines = lines.union(spark.sparkContext.textFile(arguments["filename"], partition))
+    if arguments.get("storageLevel", "NONE") != "NONE":
+        lines = lines.persist(getattr(StorageLevel, arguments["storageLevel"]))
+
+    counts = lines.flatMap(lambda line: line.split(" ")) \
+        .map(lambda word: (re.sub(r"[-+.^:,;)(_]", "", word), 1)) \
+        .reduceByKey(lambda a, b: a + b) \
+        .sortBy(lambda count: count[1], ascending=False) \
+        .collect()
+    print(counts[0])
@@ -1,11 +1,21 @@
-import argparse
+import argparse, asyncio, csv, math, os
 from benchmark.data.config import Configuration, ApplicationParameters, SparkConfig, G5kClusterConfig, BenchmarkConfig
-from benchmark.sweeper.sweep import Sweeper
-from benchmark.application.config_transformer import ToCliConfigTransformer, ToCsvConfigTransformer
+from benchmark.sweeper.sweep import Sweeper, SweepPlan
+from benchmark.sweeper.strategy import PrioritySearchStrategy
+from benchmark.application.config_transformer import ToCliConfigTransformer, ToCsvConfigTransformer, \
+    FromCsvConfigTransformer
 from benchmark.deploy.sparklib import ClusterReserver, NoopClusterReserver, SparkSubmit, LocalSparkSubmit, \
-    G5kClusterReserver, G5kSparkSubmit
-from benchmark.application.csv_utils import CsvReader, CsvWriter
+    G5kClusterReserver, G5kSparkSubmit, PySparkSessionSubmit, SubmissionResult
+from benchmark.application.csv_utils import CsvReader, CsvWriter, ResultsCsvReader
+from benchmark.application.columnar import ColumnarResultsWriter
+from benchmark.application.result_cache import ResultCache
+from benchmark.data.statistics import Aggregator, ScoreStatistics, series_steady_state_start
 from benchmark.data.utils import JsonUtil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from datetime import timedelta
+from execo_engine import HashableDict
+from typing import List, Optional
 
 """
 INPUT:
@@ -20,7 +30,7 @@ OUTPUT:
 ALGORITHM:
 1. Load parameters from a JSON file.
 2. Instantiate Sweeper with these parameters.
-3. Get the next config from sweeper.
+3. Get the next config from sweeper (one for each free execution slot, if several applications are submitted at once).
 4. Submit the application to the cluster, wait for it until it finishes, collect the output CSVs after finishing 
     (or upload them somewhere from the application).
   4.1. Rerun the experiments N number of times and collect the metrics.
@@ -35,9 +45,45 @@ ALGORITHM:
 """
 
 
+@dataclass
+class ConfigurationRun:
+    '''
+    Warmup and benchmark rounds of a configuration, submitted one after the other in an execution slot
+    '''
+    config: HashableDict
+    slot: int
+    cli_arguments: dict
+    log_arguments: str
+    warmup_rounds: int
+    measurement_rounds: int
+    warmup_iteration: int = 0
+    iteration: int = 0
+    warmup_statistics: ScoreStatistics = field(default_factory=ScoreStatistics)
+    finished_with_error: bool = False
+    # key of the configuration in the ResultCache
+    cache_key: Optional[str] = None
+    # name of the metrics of the configuration, measured or cached
+    metric_name: Optional[str] = None
+    # pipelined workflow: rounds submitted and collected, and whether the configuration needs no more rounds
+    submitted: int = 0
+    collected: int = 0
+    complete: bool = False
+
+    def in_warmup(self) -> bool:
+        return self.warmup_iteration < self.warmup_rounds
+
+
 class BenchmarkExecutor:
     # block spark-submit until the application finishes
     _spark_args = {"deploy-mode": "client"}
+    # default maximal number of measurement rounds of the adaptive rounds, times measurement_rounds
+    _MAX_ROUNDS_FACTOR = 4
+    # configurations whose warm-up effect is measured before deciding that the application does not warm up across
+    # runs, and the relative warm-up effect below which it is negligible
+    _MIN_WARMUP_EVIDENCE = 5
+    _WARMUP_TOLERANCE = 0.05
+    # argument of the file of the configurations of a batched submission
+    _configurations_file_param_name = "-configurationsFile"
 
     def __init__(self, args):
         self._initialize_configs(args)
@@ -47,10 +93,50 @@ class BenchmarkExecutor:
         self._setup_spark()
         self._setup_sweeper()
 
-        self._execute_workflow()
-
-        self._stop_spark()
-        self._stop_cluster()
+        try:
+            if self.configurations_per_submission > 1:
+                self._execute_batched_workflow()
+            elif self.benchmark_config.pipelined:
+                self._execute_pipelined_workflow()
+            else:
+                self._execute_workflow()
+        finally:
+            # an interrupted benchmark cancels its running submissions
+            self._stop_spark()
+            self._stop_cluster()
+
+    def dry_run(self, seconds_per_submit: float):
+        '''
+        Report the size of the sweep and the cost of the benchmark, without deploying anything
+        '''
+        strategy = self.benchmark_config.strategy or PrioritySearchStrategy.NAME
+        plan: SweepPlan = Sweeper.plan(self.application_parameters, self.benchmark_config.train,
+                                       self.benchmark_config.budget, strategy, self._strategy_options())
+        # the rounds of the configurations whose rounds are not decided by the strategy, adaptive if a target precision
+        # is set
+        default_rounds = self.benchmark_config.measurement_rounds
+        if self.benchmark_config.target_precision is not None:
+            default_rounds = max(default_rounds, self._max_measurement_rounds())
+        measurement_rounds = sum(step.configs * (default_rounds if step.rounds is None else step.rounds)
+                                 for step in plan.schedule)
+        warmup_rounds = plan.max_scored_configs * self.benchmark_config.warmup_rounds
+        submits = warmup_rounds + measurement_rounds
+
+        print(f"Configuration space: {plan.space_size} configurations, {plan.valid_size} satisfy the constraints.")
+        if strategy == PrioritySearchStrategy.NAME:
+            print(f"Scored configurations: at most {plan.max_scored_configs} " +
+                  f"(train={self.benchmark_config.train} for each of the " +
+                  f"{len(self.application_parameters.parameters)} parameters).")
+        else:
+            print(f"Scored configurations: at most {plan.max_scored_configs} (strategy={strategy}).")
+        if any(step.rounds is None for step in plan.schedule) and self.benchmark_config.target_precision is not None:
+            print(f"Measurement rounds: up to {default_rounds} per configuration until the target precision " +
+                  f"({self.benchmark_config.target_precision:.1%}) is reached.")
+        print(f"spark-submits: at most {submits} ({plan.max_scored_configs} configurations * " +
+              f"{self.benchmark_config.warmup_rounds} warmup rounds + {measurement_rounds} measurement rounds).")
+        print(f"Estimated wall time: " +
+              f"{timedelta(seconds=round(submits * seconds_per_submit / self.concurrent_submissions))} " +
+              f"({seconds_per_submit}s per spark-submit, {self.concurrent_submissions} at once).")
 
     def _initialize_configs(self, args):
         # load application parameters
@@ -58,18 +144,64 @@ class BenchmarkExecutor:
 
         # load benchmark config
         config = JsonUtil.deserialize(args.benchmarkConfig, Configuration)
+        self.cluster_config: Optional[G5kClusterConfig] = config.cluster_config
         self.spark_config: SparkConfig = config.spark_config
 
         self.benchmark_config: BenchmarkConfig = config.benchmark_config
         self.all_in_one_csv_path = self.benchmark_config.all_in_one_benchmark_results_csv_path
         self.metrics_csv_param_name = self.benchmark_config.metrics_csv_cli_param_name
+        self.confidence_level = self.benchmark_config.confidence_level or 0.95
+        # statistic of the metrics of a run and of the rounds of a configuration
+        self.aggregator = Aggregator(self.benchmark_config.aggregator or Aggregator.MEAN)
         self.path_metrics_csv = self.benchmark_config.metrics_csv_cli_param_value
+        self.detect_steady_state = bool(self.benchmark_config.detect_steady_state)
+        # whether the application warms up across runs: None until detected, assumed if the detection is disabled
+        self.cross_run_warmup = None if self.detect_steady_state else True
+        # relative warm-up effects of the measured configurations, while cross_run_warmup is undecided
+        self.warmup_effects = ScoreStatistics()
+        self.concurrent_submissions = self.benchmark_config.concurrent_submissions or 1
+        if self.concurrent_submissions < 1:
+            raise Exception(f"\"concurrent_submissions\" must be at least 1, but it is {self.concurrent_submissions}.")
+        self.configurations_per_submission = self.benchmark_config.configurations_per_submission or 1
+        if self.configurations_per_submission > 1 and \
+                (self.benchmark_config.pipelined or self.spark_config.session_master is not None):
+            raise Exception("\"configurations_per_submission\" is only supported by the JAR applications, " +
+                            "without \"pipelined\".")
 
         if self.metrics_csv_param_name is not None and self.path_metrics_csv is None:
             raise Exception(
                 "Set \"application_metrics_csv_path\" in the BenchmarkConfig, " +
                 "because \"application_metrics_csv_param_name\" is set.")
 
+        # number of spark-submits and their total wall time in seconds
+        self.submissions = 0
+        self.submission_time = 0.0
+
+        # a dry run does not create the cache directory nor hash the application
+        self.result_cache = None
+        if self.benchmark_config.result_cache_path is not None and not args.dry_run:
+            self.result_cache = ResultCache(self.benchmark_config.result_cache_path, self._measurement_environment(),
+                                            self.benchmark_config.result_cache_max_age,
+                                            self.benchmark_config.result_cache_max_entries)
+
+    def _measurement_environment(self) -> dict:
+        '''
+        Everything but the configuration that determines the metrics of a run, the key of the cached metrics
+        '''
+        cluster_shape = None
+        if self.cluster_config is not None:
+            cluster_shape = {"site": self.cluster_config.site, "cluster": self.cluster_config.cluster,
+                             "worker": self.cluster_config.worker}
+        return {"jar": ResultCache.file_digest(self.spark_config.application_jar_path),
+                "classname": self.spark_config.application_classname,
+                "spark_home": self.spark_config.spark_home,
+                "java_home": self.spark_config.java_home,
+                "session_master": self.spark_config.session_master,
+                "cluster": cluster_shape,
+                "spark_args": self._spark_args,
+                "detect_steady_state": self.detect_steady_state,
+                "aggregator": self.aggregator.name}
+
     def _setup_cluster(self):
         print("Reserving the computation cluster.")
         # g5k_config: G5kClusterConfig = config.cluster_config
@@ -85,15 +217,65 @@ class BenchmarkExecutor:
         # roles = cluster_reserver.roles
         # username = cluster_reserver.username
         # spark_submit: SparkSubmit = G5kSparkSubmit(username=username, roles=roles)
-        self.spark_submit: SparkSubmit = LocalSparkSubmit()
+        if self.spark_config.session_master is not None:
+            self.spark_submit: SparkSubmit = PySparkSessionSubmit(self.spark_config.session_master)
+        else:
+            self.spark_submit: SparkSubmit = LocalSparkSubmit(self.benchmark_config.submission_timeout)
         self.spark_submit.set_spark_path(self.spark_config.spark_home)
         self.spark_submit.set_java_path(self.spark_config.java_home)
         self.spark_submit.start()
 
     def _setup_sweeper(self):
         print("Starting the parametrization provider.")
-        self.sweeper: Sweeper = Sweeper(application_parameters=self.application_parameters, remove_workdir=True,
-                                        train=self.benchmark_config.train)
+        self.sweeper: Sweeper = Sweeper(application_parameters=self.application_parameters,
+                                        remove_workdir=not self.benchmark_config.resume,
+                                        train=self.benchmark_config.train, seed=self.benchmark_config.seed,
+                                        strategy=self.benchmark_config.strategy or PrioritySearchStrategy.NAME,
+                                        budget=self.benchmark_config.budget,
+                                        strategy_options=self._strategy_options(),
+                                        objective=self.benchmark_config.objective,
+                                        objective_weights=self.benchmark_config.objective_weights,
+                                        aggregator=self.aggregator.name)
+        # a resumed sweep imported the results already
+        if self.benchmark_config.warm_start_csv_paths is not None and not self.benchmark_config.resume:
+            self._warm_start_sweeper(self.benchmark_config.warm_start_csv_paths)
+        self._setup_results_writers()
+
+    def _setup_results_writers(self):
+        '''
+        The results of the done configurations are appended to the all-in-one results (and to the columnar results) of
+        the sweep: they are started again by a new sweep, and continued by a resumed sweep
+        '''
+        self.csv_writer = CsvWriter(self.all_in_one_csv_path, self.confidence_level, self.aggregator)
+        if not self.benchmark_config.resume and os.path.exists(self.all_in_one_csv_path):
+            os.remove(self.all_in_one_csv_path)
+        self.columnar_writer = None
+        if self.benchmark_config.columnar_results_path is not None:
+            parameter_names = [parameter.name for parameter in self.application_parameters.parameters]
+            self.columnar_writer = ColumnarResultsWriter(self.benchmark_config.columnar_results_path, parameter_names)
+
+    def _warm_start_sweeper(self, csv_paths: List[str]):
+        '''
+        Import the all-in-one results of previous sweeps into the Sweeper, the latest result of a configuration wins
+        '''
+        parameter_names = [parameter.name for parameter in self.application_parameters.parameters]
+        scores_by_config = dict()
+        for csv_path in csv_paths:
+            csv_reader = ResultsCsvReader(csv_path)
+            csv_reader.read()
+            for record in csv_reader.csv_records:
+                config = FromCsvConfigTransformer(record.configuration, parameter_names).transform()
+                if config is not None:
+                    scores_by_config[config] = record.metric_values
+        imported = self.sweeper.warm_start(scores_by_config)
+        print(f"Imported {imported} of the {len(scores_by_config)} configurations of {len(csv_paths)} result files.")
+
+    def _strategy_options(self):
+        options = {"eta": self.benchmark_config.elimination_ratio,
+                   "min_rounds": self.benchmark_config.min_measurement_rounds,
+                   "max_rounds": self.benchmark_config.measurement_rounds,
+                   "confidence_level": self.benchmark_config.confidence_level}
+        return {key: value for key, value in options.items() if value is not None}
 
     def _stop_cluster(self):
         # Undeploy computation platform
@@ -116,61 +298,412 @@ class BenchmarkExecutor:
 
     def _execute_workflow(self):
         metric_name = None  # used in CSV Writer to print the metric name
-        while self.sweeper.has_next():
-            # In each iteration of the loop:
-            # 0. get th next parametrization
-            application_configuration = self.sweeper.get_next()
-
-            # 1. Serialize the arguments received from the param sweeper
-            cli_arguments = ToCliConfigTransformer(application_configuration).transform()
-            log_arguments = ToCsvConfigTransformer(application_configuration).transform()
-            print()
-            print(f"Deploying spark application with parameters: {log_arguments}")
-
-            # Setup parameters
-            if self.metrics_csv_param_name is not None:
-                cli_arguments[self.metrics_csv_param_name] = self.path_metrics_csv
-
-            # 2. Warmup rounds: submit the application to the cluster, but discard the results
-            for iteration in range(self.benchmark_config.warmup_rounds):
-                print()
-                print(f"{iteration + 1}. warmup round of {log_arguments}")
-                self._submit_application_to_cluster(cli_arguments)
-
-            # 2. Benchmark rounds: submit the application to the cluster, but save the results
-            finished_with_error = False
-            for iteration in range(self.benchmark_config.measurement_rounds):
-                print()
-                print(f"{iteration + 1}. benchmark round of {log_arguments}")
-                csv_path = self._submit_application_to_cluster(cli_arguments)
-
-                if csv_path is None:
-                    finished_with_error = True
-                    break
-
-                # 3. Collect the CSVs from the cluster
-                print("Reading metrics from CSV.")
-                csv_reader = CsvReader(csv_path)
-
-                # 4. Get metrics from the CSVs
-                csv_reader.read()
-                metric_name = csv_reader.get_metric_name()
-                metric = csv_reader.get_summarized_metric()
-
-                # 5. Save the metrics + the parametrization in the ParamSweeper
-                print(f"Saving metric ({metric}) to parametrization ({log_arguments}).")
-                self.sweeper.score(application_configuration, metric)
-
-            if not finished_with_error:
-                self.sweeper.done(application_configuration)
+        # execution slots without a running configuration
+        free_slots = list(range(self.concurrent_submissions - 1, -1, -1))
+        # future of the current submission -> run of the configuration
+        runs = dict()
+        with ThreadPoolExecutor(max_workers=self.concurrent_submissions) as pool:
+            while True:
+                # In each iteration of the loop:
+                # 0. get the next parametrizations, one for each free execution slot
+                batch = self.sweeper.get_next_batch(len(free_slots))
+                for application_configuration in batch:
+                    run = self._start_run(application_configuration, free_slots.pop())
+                    metric_name = run.metric_name or metric_name
+                    self._schedule(pool, runs, run, free_slots)
+
+                if len(runs) == 0:
+                    if len(batch) == 0:
+                        break
+                    continue
+
+                # wait for a submission, then submit the next round of its configuration or free its slot
+                finished, _ = wait(runs, return_when=FIRST_COMPLETED)
+                for future in sorted(finished, key=lambda f: runs[f].slot):
+                    run = runs.pop(future)
+                    metric_name = self._collect_round(run, self._record_submission(future.result())) or metric_name
+                    self._schedule(pool, runs, run, free_slots)
+
+        print()
+        print("Benchmark finished for all parameters. Parametrization provider does not return any new configuration.")
+        print()
+
+        self._export_results(metric_name)
+
+    def _execute_pipelined_workflow(self):
+        metric_name = asyncio.run(self._run_pipeline())
+
+        print()
+        print("Benchmark finished for all parameters. Parametrization provider does not return any new configuration.")
+        print()
+
+        self._export_results(metric_name)
+
+    async def _run_pipeline(self) -> Optional[str]:
+        '''
+        One worker coroutine per execution slot, on a single event loop: the sweeper is only used from the thread of
+        the loop, and the metrics CSVs are read in worker threads
+        '''
+        # configurations started and not finished yet
+        self._pipeline_runs = 0
+        # set (and replaced) whenever a round is collected or a configuration is finished
+        self._pipeline_changed = asyncio.Event()
+        metric_names = await asyncio.gather(*(self._pipeline_worker(slot)
+                                              for slot in range(self.concurrent_submissions)))
+        return next((metric_name for metric_name in metric_names if metric_name is not None), None)
+
+    async def _pipeline_worker(self, slot: int) -> Optional[str]:
+        '''
+        Submit the rounds of the configurations of a slot one after the other. The last round is collected while the
+        next one is running: the next round of the same configuration if its number of rounds is known, the first round
+        of the next configuration otherwise. A round that depends on the metrics (target precision) waits for them.
+        '''
+        metric_name = None
+        run: Optional[ConfigurationRun] = None
+        # (run, metrics CSV path) of the last round, not collected yet
+        uncollected = None
+        # rounds submitted by the slot: consecutive rounds alternate between two metrics CSV paths, even across
+        # configurations
+        submitted = 0
+        while True:
+            if run is None:
+                batch = self.sweeper.get_next_batch(1)
+                if len(batch) > 0:
+                    run = self._start_run(batch[0], slot)
+                    run.submitted = run.collected = run.iteration
+                    self._pipeline_runs += 1
+                    metric_name = run.metric_name or metric_name
+                elif uncollected is not None:
+                    # the strategy may wait for the metrics of the last round
+                    metric_name = await self._collect_pipelined_round(*uncollected) or metric_name
+                    uncollected = None
+                    continue
+                elif self._pipeline_runs > 0:
+                    # wait for the configurations of the other slots
+                    await self._pipeline_changed.wait()
+                    continue
+                else:
+                    return metric_name
+
+            if run.finished_with_error:
+                submit = False
+            elif run.submitted < run.warmup_rounds + run.measurement_rounds:
+                submit = True
+            elif self.benchmark_config.target_precision is None:
+                submit = False
+            elif uncollected is not None and uncollected[0] is run:
+                metric_name = await self._collect_pipelined_round(*uncollected) or metric_name
+                uncollected = None
+                continue
             else:
-                print(f"Parametrization ({log_arguments}) finished with error.")
-                self.sweeper.skipped(application_configuration)
+                submit = self._needs_measurement(run.config, run.iteration, run.measurement_rounds)
+
+            if not submit:
+                run.complete = True
+                if run.collected == run.submitted:
+                    self._finish_pipelined_run(run)
+                run = None
+                continue
+
+            job = asyncio.ensure_future(self._submit_round(run, submitted % 2))
+            submitted += 1
+            if uncollected is not None:
+                metric_name = await self._collect_pipelined_round(*uncollected) or metric_name
+            uncollected = (run, self._record_submission(await job))
+
+    async def _submit_round(self, run: ConfigurationRun, buffer: int):
+        '''
+        Submit the next round of run, with the metrics CSV path of buffer (0 or 1)
+        '''
+        print()
+        if run.submitted < run.warmup_rounds:
+            print(f"{run.submitted + 1}. warmup round of {run.log_arguments}")
+        else:
+            print(f"{run.submitted - run.warmup_rounds + 1}. benchmark round of {run.log_arguments}")
+        cli_arguments = dict(run.cli_arguments)
+        if self.metrics_csv_param_name is not None:
+            base, extension = os.path.splitext(cli_arguments[self.metrics_csv_param_name])
+            cli_arguments[self.metrics_csv_param_name] = f"{base}.{buffer}{extension}"
+        run.submitted += 1
+        spark_arguments, java_arguments = self._launch_arguments(cli_arguments)
+        return await self.spark_submit.submit_with_result_async(
+            path_jar=self.spark_config.application_jar_path, classname=self.spark_config.application_classname,
+            spark_args={**BenchmarkExecutor._spark_args, **spark_arguments}, java_args=java_arguments,
+            path_metrics_csv=cli_arguments.get(self.metrics_csv_param_name),
+            path_log=self._log_path("out.log", run.slot), path_err=self._log_path("out.err", run.slot))
+
+    async def _collect_pipelined_round(self, run: ConfigurationRun, csv_path: Optional[str]) -> Optional[str]:
+        '''
+        Collect a round of run (its metrics CSV is read in a worker thread), and finish run if it was the last one
+        '''
+        metric_name = None
+        if not run.finished_with_error:
+            metrics = None
+            if csv_path is not None and (not run.in_warmup() or self.cross_run_warmup is None):
+                metrics = await asyncio.to_thread(self._read_metrics_csv, csv_path)
+            metric_name = self._collect_round(run, csv_path, metrics)
+        run.collected += 1
+        if run.complete and run.collected == run.submitted:
+            self._finish_pipelined_run(run)
+        else:
+            self._notify_pipeline()
+        return metric_name
+
+    def _finish_pipelined_run(self, run: ConfigurationRun):
+        self._finish_run(run)
+        self._pipeline_runs -= 1
+        self._notify_pipeline()
+
+    def _notify_pipeline(self):
+        self._pipeline_changed.set()
+        self._pipeline_changed = asyncio.Event()
+
+    def _execute_batched_workflow(self):
+        '''
+        Workflow of _execute_workflow, but the application runs a round of several configurations in each submission
+        '''
+        metric_name = None
+        free_slots = list(range(self.concurrent_submissions - 1, -1, -1))
+        # future of the current submission -> runs of the configurations of the submission
+        submissions = dict()
+        # configurations received from the sweeper and waiting for a slot, by Spark launch arguments
+        queued = dict()
+        with ThreadPoolExecutor(max_workers=self.concurrent_submissions) as pool:
+            while True:
+                number_of_queued = sum(len(configs) for configs in queued.values())
+                batch = self.sweeper.get_next_batch(
+                    max(len(free_slots) * self.configurations_per_submission - number_of_queued, 0))
+                for application_configuration in batch:
+                    launch_arguments = tuple(self._launch_arguments(application_configuration)[0].items())
+                    queued.setdefault(launch_arguments, []).append(application_configuration)
+
+                # the largest groups of configurations first
+                while len(free_slots) > 0 and len(queued) > 0:
+                    launch_arguments = max(queued, key=lambda key: len(queued[key]))
+                    configs = queued[launch_arguments][:self.configurations_per_submission]
+                    del queued[launch_arguments][:self.configurations_per_submission]
+                    if len(queued[launch_arguments]) == 0:
+                        del queued[launch_arguments]
+                    slot = free_slots.pop()
+                    runs = [self._start_run(application_configuration, slot) for application_configuration in configs]
+                    for run in runs:
+                        metric_name = run.metric_name or metric_name
+                    self._schedule_batch(pool, submissions, runs, slot, free_slots)
+
+                if len(submissions) == 0:
+                    if len(batch) == 0 and len(queued) == 0:
+                        break
+                    continue
+
+                finished, _ = wait(submissions, return_when=FIRST_COMPLETED)
+                for future in sorted(finished, key=lambda f: submissions[f][0].slot):
+                    runs = submissions.pop(future)
+                    metric_name = self._collect_batch(runs, self._record_submission(future.result())) or metric_name
+                    self._schedule_batch(pool, submissions, runs, runs[0].slot, free_slots)
 
         print()
         print("Benchmark finished for all parameters. Parametrization provider does not return any new configuration.")
         print()
 
+        self._export_results(metric_name)
+
+    def _schedule_batch(self, pool: ThreadPoolExecutor, submissions: dict, runs: List[ConfigurationRun], slot: int,
+                        free_slots: List[int]):
+        '''
+        Submit the next round of the runs that need one in a single submission, finish the other ones. The slot is
+        freed if no run needs another round.
+        '''
+        active = []
+        for run in runs:
+            if not run.finished_with_error and \
+                    (run.in_warmup() or self._needs_measurement(run.config, run.iteration, run.measurement_rounds)):
+                active.append(run)
+            else:
+                self._finish_run(run)
+        if len(active) == 0:
+            free_slots.append(slot)
+            return
+
+        print()
+        # a CSV record per configuration: name, value, name, value, ... quoted, so the values can hold whitespaces
+        configurations_path = self._slot_path("/tmp/configurations.csv", slot)
+        with open(configurations_path, "w", newline="") as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+            for run in active:
+                if run.in_warmup():
+                    print(f"{run.warmup_iteration + 1}. warmup round of {run.log_arguments}")
+                else:
+                    print(f"{run.iteration + 1}. benchmark round of {run.log_arguments}")
+                java_arguments = self._batched_arguments(run)
+                writer.writerow([token for name, value in java_arguments.items() for token in (name, value)])
+        cli_arguments = self._launch_arguments(active[0].cli_arguments)[0]
+        cli_arguments[BenchmarkExecutor._configurations_file_param_name] = configurations_path
+        if self.metrics_csv_param_name is not None:
+            cli_arguments[self.metrics_csv_param_name] = active[0].cli_arguments[self.metrics_csv_param_name]
+        submissions[pool.submit(self._submit_application_to_cluster, cli_arguments, slot)] = active
+
+    def _collect_batch(self, runs: List[ConfigurationRun], csv_path: Optional[str]) -> Optional[str]:
+        '''
+        Split the metrics CSV of a batched submission between its runs, a run without rows finished with an error
+        '''
+        readers = dict()
+        if csv_path is not None:
+            readers = CsvReader.read_by_configuration(csv_path, keep_series=self._keep_series())
+        metric_name = None
+        for run in runs:
+            reader = readers.get(ToCsvConfigTransformer(self._batched_arguments(run)).transform())
+            if reader is None:
+                metric_name = self._collect_round(run, None) or metric_name
+            else:
+                metrics = self._summarize_metrics(reader)
+                metric_name = self._collect_round(run, csv_path, metrics) or metric_name
+        return metric_name
+
+    def _batched_arguments(self, run: ConfigurationRun) -> dict:
+        '''
+        Arguments of the configuration of run in the file of a batched submission: the application arguments
+        without the metrics CSV
+        '''
+        java_arguments = self._launch_arguments(run.cli_arguments)[1]
+        java_arguments.pop(self.metrics_csv_param_name, None)
+        return java_arguments
+
+    @staticmethod
+    def _launch_arguments(cli_arguments: dict):
+        '''
+        Split the arguments of a configuration into Spark launch arguments (named "--<spark-submit option>") and
+        application arguments
+        '''
+        spark_arguments, java_arguments = dict(), dict()
+        for name, value in cli_arguments.items():
+            if name.startswith("--"):
+                spark_arguments[name] = value
+            else:
+                java_arguments[name] = value
+        return spark_arguments, java_arguments
+
+    def _start_run(self, application_configuration, slot: int) -> ConfigurationRun:
+        # 1. Serialize the arguments received from the param sweeper
+        cli_arguments = ToCliConfigTransformer(application_configuration).transform()
+        log_arguments = ToCsvConfigTransformer(application_configuration).transform()
+        print()
+        print(f"Deploying spark application with parameters: {log_arguments}")
+
+        # Setup parameters
+        if self.metrics_csv_param_name is not None:
+            cli_arguments[self.metrics_csv_param_name] = self._slot_path(self.path_metrics_csv, slot)
+
+        # 2. Benchmark rounds: submit the application to the cluster, but save the results
+        measurement_rounds = self.sweeper.get_rounds(application_configuration,
+                                                     self.benchmark_config.measurement_rounds)
+        run = ConfigurationRun(config=application_configuration, slot=slot, cli_arguments=cli_arguments,
+                               log_arguments=log_arguments, warmup_rounds=0, measurement_rounds=measurement_rounds)
+        if self.result_cache is not None:
+            run.cache_key = self.result_cache.key(application_configuration)
+            self._serve_cached_rounds(run)
+
+        # 2. Warmup rounds: submit the application to the cluster, but discard the results
+        # (a configuration promoted by successive halving or served from the cache is not warmed up again, and no
+        # configuration is warmed up if the application has no warm-up effect across runs)
+        if self.sweeper.get_rounds_received(application_configuration) == 0 and self.cross_run_warmup is not False:
+            run.warmup_rounds = self.benchmark_config.warmup_rounds
+        return run
+
+    def _serve_cached_rounds(self, run: ConfigurationRun):
+        '''
+        Score the cached metrics of the rounds that the configuration did not receive yet, as long as it needs them
+        '''
+        metric_name, cached_metrics = self.result_cache.get(run.cache_key)
+        received = self.sweeper.get_rounds_received(run.config)
+        for metric in cached_metrics[received:]:
+            if not self._needs_measurement(run.config, run.iteration, run.measurement_rounds):
+                break
+            print(f"Saving cached metric ({metric}) to parametrization ({run.log_arguments}).")
+            self.sweeper.score(run.config, metric)
+            run.iteration += 1
+            run.metric_name = metric_name
+
+    def _schedule(self, pool: ThreadPoolExecutor, runs: dict, run: ConfigurationRun, free_slots: List[int]):
+        '''
+        Submit the next round of run to the pool, or finish run and free its slot if it needs no more rounds
+        '''
+        if not run.finished_with_error and \
+                (run.in_warmup() or self._needs_measurement(run.config, run.iteration, run.measurement_rounds)):
+            print()
+            if run.in_warmup():
+                print(f"{run.warmup_iteration + 1}. warmup round of {run.log_arguments}")
+            else:
+                print(f"{run.iteration + 1}. benchmark round of {run.log_arguments}")
+            runs[pool.submit(self._submit_application_to_cluster, run.cli_arguments, run.slot)] = run
+        else:
+            self._finish_run(run)
+            free_slots.append(run.slot)
+
+    def _collect_round(self, run: ConfigurationRun, csv_path: Optional[str], metrics: Optional[tuple] = None) \
+            -> Optional[str]:
+        '''
+        Record the metrics CSV of the last round of run, return the metric name of a benchmark round. metrics is the
+        metric name and the metric of the CSV if it was already read.
+        '''
+        if run.in_warmup():
+            run.warmup_iteration += 1
+            # keep the metrics of the warmup rounds until the cross-run warm-up effect is detected
+            if csv_path is not None and self.cross_run_warmup is None:
+                _, metric = metrics or self._read_metrics_csv(csv_path)
+                if metric is not None:
+                    run.warmup_statistics.add(metric)
+            return None
+
+        if csv_path is None:
+            run.finished_with_error = True
+            return None
+
+        # 3. Collect the CSVs from the cluster
+        # 4. Get metrics from the CSVs
+        metric_name, metric = metrics or self._read_metrics_csv(csv_path)
+
+        # 5. Save the metrics + the parametrization in the ParamSweeper
+        print(f"Saving metric ({metric}) to parametrization ({run.log_arguments}).")
+        self.sweeper.score(run.config, metric)
+        if run.cache_key is not None and metric is not None:
+            self.result_cache.append(run.cache_key, metric_name, metric)
+        run.iteration += 1
+        run.metric_name = metric_name
+        return metric_name
+
+    def _finish_run(self, run: ConfigurationRun):
+        if not run.finished_with_error:
+            if self.cross_run_warmup is None and run.warmup_statistics.count > 0:
+                self._detect_cross_run_warmup(run.config, run.warmup_statistics)
+            self.sweeper.done(run.config)
+            self._append_results(run)
+        else:
+            print(f"Parametrization ({run.log_arguments}) finished with error.")
+            self.sweeper.skipped(run.config)
+
+    def _append_results(self, run: ConfigurationRun):
+        '''
+        Append the metrics of a done configuration to the results files, so they survive a crash of the benchmark
+        '''
+        score = self.sweeper.get_scores(run.config)
+        if len(score) == 0:
+            return
+        self.csv_writer.append(run.config, score, run.metric_name, self.sweeper.is_pareto_optimal(run.config))
+        if self.columnar_writer is not None:
+            self.columnar_writer.append(run.config, score, run.metric_name)
+
+    def _record_submission(self, result: SubmissionResult) -> Optional[str]:
+        '''
+        Account for the exit code and the wall time of a submission, return its metrics CSV path
+        '''
+        self.submissions += 1
+        self.submission_time += result.wall_time
+        print(f"spark-submit exited with code {result.return_code} after {result.wall_time:.1f}s.")
+        return result.path_metrics_csv
+
+    def _export_results(self, metric_name: str):
+        print(f"{self.submissions} spark-submits, {timedelta(seconds=round(self.submission_time))} in total.")
+        self.sweeper.close()
         # Export benchmark results
         if self.sweeper.has_best():
             # 7. If ParamSweeper does not give next param, then:
@@ -179,8 +712,13 @@ class BenchmarkExecutor:
             # 7.3. get all parametrizations and all metrics that have been recorded so far
             best_config = self.sweeper.best
             best_score = self.sweeper.get_score(best_config)
-            print(f"Best score: {best_score}")
+            precision = self.sweeper.get_statistics(best_config).relative_half_width(self.confidence_level)
+            print(f"Best score ({self.aggregator.name}): {best_score} " +
+                  f"(confidence interval of the mean: {self._interval_str(precision)})")
             print(f"Best config: {best_config}")
+            pareto_front = self.sweeper.get_pareto_front()
+            if len(pareto_front) > 1:
+                print(f"Non-dominated configurations: {len(pareto_front)}")
             print()
 
             print(f"Configurations skipped due to an error:")
@@ -194,29 +732,146 @@ class BenchmarkExecutor:
 
             # 8. Export all results to a file (CSV?)
             # Analyze the .csv with R, or external analysis tool
-            all_scores_by_config = self.sweeper.get_all_scores_by_config()
-            output_path = self.benchmark_config.all_in_one_benchmark_results_csv_path
-            csv_writer = CsvWriter(output_path, all_scores_by_config, metric_name)
-            csv_writer.write()
-            print(f"All benchmark results are saved to {output_path}")
+            self.csv_writer.write(self.sweeper.iter_scores_by_config(), metric_name, pareto_front)
+            print(f"All benchmark results are saved to {self.all_in_one_csv_path}")
+            if self.columnar_writer is not None:
+                self.columnar_writer.write(self.sweeper.iter_scores_by_config(), metric_name)
+                print(f"All benchmark results are saved to {self.columnar_writer.results_path}")
         else:
+            self.csv_writer.close()
+            if self.columnar_writer is not None:
+                self.columnar_writer.close()
             print("No best configuration was found, check the logs.")
 
-    def _submit_application_to_cluster(self, cli_arguments: dict):
-        return self.spark_submit.submit_with_log(path_jar=self.spark_config.application_jar_path,
-                                                 classname=self.spark_config.application_classname,
-                                                 spark_args=BenchmarkExecutor._spark_args, java_args=cli_arguments,
-                                                 path_metrics_csv=cli_arguments[self.metrics_csv_param_name])
+    def _read_metrics_csv(self, csv_path: str):
+        '''
+        Return the metric name and the summarized metric of a metrics CSV, the summarized metric of its steady state if
+        the steady state detection is enabled
+        '''
+        print("Reading metrics from CSV.")
+        csv_reader = CsvReader(csv_path, keep_series=self._keep_series())
+        csv_reader.read()
+        return self._summarize_metrics(csv_reader)
+
+    def _keep_series(self) -> bool:
+        # the series of the iterations are only kept to detect the steady state or to compute another statistic
+        return self.detect_steady_state or not self.aggregator.is_mean()
+
+    def _summarize_metrics(self, csv_reader: CsvReader):
+        # the iterations before the steady state, detected with MSER truncation of the series, are not summarized
+        first_iteration = 0
+        series = csv_reader.get_series() if self.detect_steady_state else None
+        if series is not None:
+            first_iteration = series_steady_state_start(series)
+            print(f"Steady state reached after {first_iteration} of {len(series)} iterations.")
+        if len(csv_reader.get_metric_names()) > 1:
+            print(f"Only the first metric ({csv_reader.get_metric_name()}) of " +
+                  f"{csv_reader.get_metric_names()} is scored.")
+        return csv_reader.get_metric_name(), csv_reader.get_summarized_metric(first_iteration, self.aggregator)
+
+    def _detect_cross_run_warmup(self, config, warmup_statistics: ScoreStatistics):
+        '''
+        The warm-up effect of a configuration is the difference between the mean metric of its warmup rounds and of its
+        measurement rounds, relative to the latter. The effects of the measured configurations are pooled: the
+        application warms up across runs if their mean differs significantly from 0 in a component. It does not if,
+        after _MIN_WARMUP_EVIDENCE configurations, the confidence interval of their mean lies within
+        +-_WARMUP_TOLERANCE in every component. Otherwise, it is undecided and the configurations are still warmed up.
+        '''
+        statistics = self.sweeper.get_statistics(config)
+        if statistics.count == 0:
+            return
+        self.warmup_effects.add_components([0.0 if mean == 0 else (warmup_mean - mean) / abs(mean)
+                                            for warmup_mean, mean in zip(warmup_statistics.mean, statistics.mean)])
+        effects = self.warmup_effects
+        if effects.count < 2:
+            return
+        half_widths = effects.half_width(self.confidence_level)
+        if any(abs(mean) > half_width for mean, half_width in zip(effects.mean, half_widths)):
+            self.cross_run_warmup = True
+            print("The warmup rounds differ from the measurement rounds, the configurations are warmed up.")
+        elif effects.count >= BenchmarkExecutor._MIN_WARMUP_EVIDENCE and \
+                all(abs(mean) + half_width <= BenchmarkExecutor._WARMUP_TOLERANCE
+                    for mean, half_width in zip(effects.mean, half_widths)):
+            self.cross_run_warmup = False
+            print(f"No warm-up effect across runs was detected in {effects.count} configurations, the warmup " +
+                  "rounds are skipped from now on.")
+
+    def _needs_measurement(self, config, iteration: int, measurement_rounds: int) -> bool:
+        '''
+        The measurement rounds are always run. If a target precision is set and the strategy does not decide the rounds,
+        the configuration is measured again until the confidence interval of its mean metric is narrow enough or max
+        rounds is reached.
+        '''
+        if iteration < measurement_rounds:
+            return True
+        target_precision = self.benchmark_config.target_precision
+        if target_precision is None:
+            return False
+        # the rounds decided by the strategy (the rungs of halving, the steps of a race) are not extended
+        if self.sweeper.strategy_decides_rounds(config) or \
+                self.sweeper.get_rounds_received(config) >= self._max_measurement_rounds():
+            return False
+        precision = self.sweeper.get_statistics(config).relative_half_width(self.confidence_level)
+        print(f"Confidence interval: {self._interval_str(precision)}, target: {target_precision:.1%}")
+        return precision > target_precision
+
+    def _interval_str(self, precision: float) -> str:
+        '''
+        Relative half-width of a confidence interval, n/a below two rounds
+        '''
+        if not math.isfinite(precision):
+            return f"n/a at {self.confidence_level:.0%}"
+        return f"+-{precision:.1%} at {self.confidence_level:.0%}"
+
+    def _max_measurement_rounds(self) -> int:
+        '''
+        Maximal number of measurement rounds of a configuration measured until the target precision is reached
+        '''
+        return self.benchmark_config.max_measurement_rounds or \
+            BenchmarkExecutor._MAX_ROUNDS_FACTOR * max(self.benchmark_config.measurement_rounds, 1)
+
+    def _slot_path(self, path: str, slot: int) -> str:
+        '''
+        Path of a file written by the application of an execution slot, path itself if there is a single slot
+        '''
+        if self.concurrent_submissions == 1:
+            return path
+        base, extension = os.path.splitext(path)
+        return f"{base}_{slot}{extension}"
+
+    def _log_path(self, name: str, slot: int) -> str:
+        '''
+        Log file of the submissions of an execution slot, in the home directory
+        '''
+        return self._slot_path(os.path.join(os.path.expanduser("~"), name), slot)
+
+    def _submit_application_to_cluster(self, cli_arguments: dict, slot: int = 0) -> SubmissionResult:
+        spark_arguments, java_arguments = self._launch_arguments(cli_arguments)
+        return self.spark_submit.submit_with_result(path_jar=self.spark_config.application_jar_path,
+                                                    classname=self.spark_config.application_classname,
+                                                    spark_args={**BenchmarkExecutor._spark_args, **spark_arguments},
+                                                    java_args=java_arguments,
+                                                    path_metrics_csv=cli_arguments[self.metrics_csv_param_name],
+                                                    path_log=self._log_path("out.log", slot),
+                                                    path_err=self._log_path("out.err", slot))
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser()
     parser.add_argument("-p", "--parameters", help="Application parameters JSON path", required=True)
     parser.add_argument("-c", "--benchmarkConfig", help="Benchmark config JSON path", required=True)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report the configuration space size, the number of spark-submits and the estimated " +
+                             "wall time without deploying anything")
+    parser.add_argument("--seconds-per-submit", type=float, default=60.0,
+                        help="Estimated duration of one spark-submit in seconds, used by --dry-run")
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     arguments = parse_arguments()
     executor = BenchmarkExecutor(arguments)
-    executor.execute()
+    if arguments.dry_run:
+        executor.dry_run(arguments.seconds_per_submit)
+    else:
+        executor.execute()
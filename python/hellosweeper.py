@@ -1,14 +1,14 @@
 from benchmark.sweeper.sweep import Sweeper
 from benchmark.data.config import ApplicationParameter, ApplicationParameters, ApplicationParameterConstraint, \
     ParameterBinding
-from benchmark.data.metric import LongMetric
+from benchmark.data.metric import VectorMetric
 from random import randrange
 
 
 def bench(config):
     value = int(config['prime']) + int(config['odd']) + int(config['even']) + int(config['fibo']) + randrange(5)
     print("test of", config, ":", value)
-    return LongMetric(value)
+    return VectorMetric([value])
 
 
 test = 10
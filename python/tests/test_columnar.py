@@ -0,0 +1,53 @@
+from benchmark.application.columnar import ColumnarResultsWriter
+from benchmark.data.metric import Metric
+from execo_engine import HashableDict
+import os, sys
+import pytest
+
+
+METRIC_NAME = "[cpu(ms),memory(MB)]"
+PARAMETERS = ["-storageLevel", "-partition"]
+SCORES = [(HashableDict({"-storageLevel": "NONE", "-partition": "2"}),
+           [Metric.from_components([100.5, 10]), Metric.from_components([98, 11])]),
+          (HashableDict({"-storageLevel": "DISK_ONLY", "-partition": "4"}),
+           [Metric.from_components([120, 12])])]
+
+
+def test_missing_pyarrow(tmp_path, monkeypatch):
+    # an entry of None in sys.modules makes the import fail
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(Exception, match="Install pyarrow"):
+        ColumnarResultsWriter(str(tmp_path / "results.arrow"), PARAMETERS)
+
+
+def rows(table) -> list:
+    return sorted(tuple(row.values()) for row in table.to_pylist())
+
+
+@pytest.mark.parametrize("file_name", ["results.arrow", "results.parquet"])
+def test_round_trip(tmp_path, file_name):
+    pyarrow = pytest.importorskip("pyarrow")
+    path = str(tmp_path / file_name)
+    if file_name.endswith(".parquet"):
+        pytest.importorskip("pyarrow.parquet")
+
+    writer = ColumnarResultsWriter(path, PARAMETERS)
+    # the rounds of the done configurations are streamed, the first round of a configuration is appended once
+    writer.append(SCORES[0][0], SCORES[0][1][:1], METRIC_NAME)
+    writer.append(SCORES[0][0], SCORES[0][1], METRIC_NAME)
+    writer.append(SCORES[1][0], SCORES[1][1], METRIC_NAME)
+    with pyarrow.ipc.open_stream(path + ".partial") as stream:
+        partial = stream.read_all()
+    writer.write(SCORES, METRIC_NAME)
+    assert not os.path.exists(path + ".partial")
+
+    if file_name.endswith(".parquet"):
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(path)
+    else:
+        with pyarrow.ipc.open_file(path) as file:
+            table = file.read_all()
+    assert table.column_names == ["storageLevel", "partition", "round", "cpu(ms)", "memory(MB)"]
+    expected = [("DISK_ONLY", "4", 0, 120.0, 12.0), ("NONE", "2", 0, 100.5, 10.0), ("NONE", "2", 1, 98.0, 11.0)]
+    assert rows(table) == expected
+    assert rows(partial) == expected
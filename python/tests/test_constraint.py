@@ -0,0 +1,90 @@
+from benchmark.data.config import ApplicationParameterConstraint, ParameterBinding
+from benchmark.data.space import ConfigurationSpace
+from benchmark.data.utils import ConstraintUtil
+import numpy as np
+import pytest
+
+
+PARAMETERS = {"a": ["1", "2", "3"], "b": ["x", "y"], "c": ["p", "q", "r", "s"], "d": ["0", "1"]}
+
+CONSTRAINTS = [
+    # if a==1, then b=x and c in [p,q]
+    ApplicationParameterConstraint(source=ParameterBinding(name="a", value="1"),
+                                   targets=[ParameterBinding(name="b", value="x"),
+                                            ParameterBinding(name="c", value="p"),
+                                            ParameterBinding(name="c", value="q")]),
+    # if d==1, then c is not s
+    ApplicationParameterConstraint(source=ParameterBinding(name="d", value="1"),
+                                   targets=[ParameterBinding(name="c", value="s")], type="FORBIDDEN"),
+    # a value that is not in the space never triggers the constraint
+    ApplicationParameterConstraint(source=ParameterBinding(name="b", value="z"),
+                                   targets=[ParameterBinding(name="a", value="2")]),
+]
+
+
+def expected_valid(space: ConfigurationSpace, constraints):
+    merged_constraints = ConstraintUtil._merge_constraints(constraints)
+    return [index for index in range(len(space)) if ConstraintUtil._is_config_valid(space[index], merged_constraints)]
+
+
+@pytest.mark.parametrize("keys", [None, ["d", "c", "b", "a"], ["c", "a", "d", "b"]])
+def test_compiled_constraints_match_the_configurations(keys):
+    space = ConfigurationSpace(PARAMETERS, keys)
+    compiled = ConstraintUtil.compile(space, CONSTRAINTS)
+    expected = expected_valid(space, CONSTRAINTS)
+
+    assert list(compiled.mask(np.arange(len(space)))) == [index in expected for index in range(len(space))]
+    assert all(compiled.is_valid(index) == (index in expected) for index in range(len(space)))
+    assert compiled.count() == len(expected)
+    assert list(compiled.enumerate()) == expected
+    assert list(compiled.valid_indexes()) == expected
+    assert list(compiled.filter()) == expected
+    assert list(compiled.filter(range(0, len(space), 3))) == [index for index in expected if index % 3 == 0]
+
+
+def test_compiled_constraints_of_a_prefix():
+    space = ConfigurationSpace(PARAMETERS)
+    compiled = ConstraintUtil.compile(space, CONSTRAINTS)
+    for prefix in [{"a": "1"}, {"c": "s"}, {"a": "1", "d": "1"}, {"b": "z"}]:
+        expected = [index for index in expected_valid(space, CONSTRAINTS)
+                    if all(space[index].get(key) == value for key, value in prefix.items())]
+        assert compiled.count(prefix) == len(expected)
+        assert list(compiled.enumerate(prefix)) == expected
+
+
+def test_one_table_per_pair_of_constrained_parameters():
+    space = ConfigurationSpace(PARAMETERS)
+    # (a, b), (a, c) and (d, c); the constraint of b=z is dropped
+    assert len(ConstraintUtil.compile(space, CONSTRAINTS)) == 3
+    assert list(ConstraintUtil.filter_valid_configs(space, [])) == list(range(len(space)))
+
+
+def test_constraints_of_the_same_source_are_merged():
+    space = ConfigurationSpace(PARAMETERS)
+    constraints = [
+        # if a==2, then b=y and c in [p,q,r]
+        ApplicationParameterConstraint(source=ParameterBinding(name="a", value="2"),
+                                       targets=[ParameterBinding(name="b", value="y"),
+                                                ParameterBinding(name="c", value="p"),
+                                                ParameterBinding(name="c", value="q"),
+                                                ParameterBinding(name="c", value="r")]),
+        # if a==2, then c in [q,r,s] and d=1
+        ApplicationParameterConstraint(source=ParameterBinding(name="a", value="2"),
+                                       targets=[ParameterBinding(name="c", value="q"),
+                                                ParameterBinding(name="c", value="r"),
+                                                ParameterBinding(name="c", value="s"),
+                                                ParameterBinding(name="d", value="1")]),
+        # if d==0, then c is not p, and not q
+        ApplicationParameterConstraint(source=ParameterBinding(name="d", value="0"),
+                                       targets=[ParameterBinding(name="c", value="p")], type="FORBIDDEN"),
+        ApplicationParameterConstraint(source=ParameterBinding(name="d", value="0"),
+                                       targets=[ParameterBinding(name="c", value="q")], type="FORBIDDEN"),
+    ]
+    valid = [space[index] for index in ConstraintUtil.filter_valid_configs(space, constraints)]
+
+    assert [config for config in valid if config["a"] == "2"] == [
+        {"a": "2", "b": "y", "c": "q", "d": "1"}, {"a": "2", "b": "y", "c": "r", "d": "1"}]
+    assert all(config["c"] in ["r", "s"] for config in valid if config["d"] == "0")
+    assert [space.index_of(config) for config in ConstraintUtil.filter_valid_configs(list(space), constraints)] == \
+        [space.index_of(config) for config in valid]
+    assert len(valid) == ConstraintUtil.compile(space, constraints).count()
@@ -0,0 +1,75 @@
+from benchmark.application.csv_utils import CsvReader, CsvWriter
+from benchmark.data.metric import Metric
+from benchmark.data.statistics import Aggregator
+import csv
+import numpy as np
+import pytest
+
+
+ITERATIONS = 5000
+
+
+@pytest.fixture
+def metrics_csv(tmp_path):
+    '''
+    Metrics CSV of two configurations, with two metrics of 2 and 1 components for each iteration
+    '''
+    rng = np.random.default_rng(0)
+    series = {configuration: (rng.normal(100, 10, size=(ITERATIONS, 2)).round(3),
+                              rng.exponential(5, size=(ITERATIONS, 1)).round(3))
+              for configuration in ["partition=2", "partition=4"]}
+    path = tmp_path / "metrics.csv"
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+        writer.writerow(["configuration", "metric_name", "metric_value"])
+        for configuration, (times, gcs) in series.items():
+            for time, gc in zip(times, gcs):
+                writer.writerow([configuration, "[time(ms),memory(MB)]", f"[{time[0]},{time[1]}]"])
+                writer.writerow([configuration, "[gc(ms)]", f"[{gc[0]}]"])
+    return str(path), series
+
+
+def test_aggregates_and_series(metrics_csv):
+    path, series = metrics_csv
+    readers = CsvReader.read_by_configuration(path)
+    assert list(readers) == ["partition=2", "partition=4"]
+    for configuration, reader in readers.items():
+        times, gcs = series[configuration]
+        assert reader.get_metric_names() == ["[time(ms),memory(MB)]", "[gc(ms)]"]
+        assert reader.get_metric_name() == "[time(ms),memory(MB)]"
+        assert reader.get_number_of_iterations() == ITERATIONS
+        assert np.array_equal(reader.get_series(), times)
+        assert np.array_equal(reader.get_series("[gc(ms)]"), gcs)
+        assert reader.get_series("[cpu(ms)]") is None
+
+        metric = reader.get_summarized_metric()
+        assert metric.components() == pytest.approx(times.mean(axis=0).tolist())
+        assert metric.get("memory(MB)") == pytest.approx(times[:, 1].mean())
+        assert reader.get_summarized_metric(1000).components() == pytest.approx(times[1000:].mean(axis=0).tolist())
+        assert reader.get_summarized_metric(aggregator=Aggregator("median"), metric_name="[gc(ms)]").components() == \
+            pytest.approx(np.median(gcs, axis=0).tolist())
+
+
+def test_series_not_kept(metrics_csv):
+    path, series = metrics_csv
+    reader = CsvReader(path, keep_series=False)
+    reader.read()
+    times = np.concatenate([series["partition=2"][0], series["partition=4"][0]])
+    assert reader.get_number_of_iterations() == 2 * ITERATIONS
+    assert reader.get_summarized_metric().components() == pytest.approx(times.mean(axis=0).tolist())
+    with pytest.raises(Exception):
+        reader.get_series()
+
+
+def test_precision_of_a_single_round_is_empty(tmp_path):
+    path = str(tmp_path / "results.csv")
+    writer = CsvWriter(path)
+    writer.append({"partition": "2"}, [Metric.from_components([100, 5])], "[cpu(ms),memory(MB)]")
+    writer.append({"partition": "4"}, [Metric.from_components([100, 5]), Metric.from_components([110, 5])],
+                  "[cpu(ms),memory(MB)]")
+    writer.close()
+
+    with open(path) as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0]["precision"] == ""
+    assert float(rows[1]["precision"]) > 0
@@ -0,0 +1,45 @@
+from benchmark.data.space import ConfigurationSpace
+from benchmark.sweeper.index import ConfigurationIndex
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def space():
+    return ConfigurationSpace({"a": ["1", "2", "3"], "b": ["x", "y"], "c": ["p", "q", "r"]})
+
+
+@pytest.fixture
+def index(space):
+    # every other configuration, so the positions in the universe differ from the configuration indexes
+    return ConfigurationIndex(space, range(len(space) - 1, -1, -2))
+
+
+def test_universe(space, index):
+    assert len(index) == len(space) // 2
+    assert 1 in index and 0 not in index and 100 not in index
+    assert list(index.ids(index.full())) == list(range(1, len(space), 2))
+    assert list(index.ids(index.empty())) == []
+
+
+def test_matching(space, index):
+    for subdictionary in [{}, {"a": "2"}, {"b": "y", "c": "p"}, {"a": "3", "b": "x", "c": "r"}]:
+        expected = [config_id for config_id in range(1, len(space), 2)
+                    if all(space[config_id][key] == value for key, value in subdictionary.items())]
+        assert list(index.matching(subdictionary)) == expected
+    assert list(index.matching({"a": "4"})) == []
+
+
+def test_bitmaps(index):
+    bitmap = index.bitmap([3, 9])
+    assert list(index.ids(bitmap)) == [3, 9]
+    index.add(bitmap, 5)
+    index.discard(bitmap, 3)
+    assert list(index.ids(bitmap)) == [5, 9]
+    assert index.contains(bitmap, 5) and not index.contains(bitmap, 3) and not index.contains(bitmap, 4)
+    assert list(index.matching({"a": "2"}, bitmap)) == [9]
+    assert np.array_equal(index.bitmap([]), index.empty())
+    with pytest.raises(KeyError):
+        index.bitmap([4])
+    with pytest.raises(KeyError):
+        index.add(bitmap, 4)
@@ -0,0 +1,163 @@
+from benchmark.data.config import ApplicationParameter, ApplicationParameters
+from benchmark.data.metric import Metric
+from benchmark.sweeper.journal import SweeperJournal
+from benchmark.sweeper.sweep import Sweeper, SweeperStatePersistence
+from execo_engine import HashableDict
+import pytest
+
+
+PARAMETERS = ApplicationParameters(parameters=[ApplicationParameter("p", 1, ["a", "b", "c"]),
+                                               ApplicationParameter("q", 2, ["x", "y", "z"]),
+                                               ApplicationParameter("r", 3, ["0", "1"])], constraints=None)
+STRATEGIES = ["priority", "surrogate", "halving", "racing"]
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # the sweeper persists its state in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+class Crash(Exception):
+    pass
+
+
+def new_sweeper(strategy: str) -> Sweeper:
+    return Sweeper(PARAMETERS, 2, remove_workdir=True, seed=3, strategy=strategy, budget=8,
+                   strategy_options={"min_rounds": 2, "max_rounds": 4})
+
+
+def measure(sweeper: Sweeper, config) -> Metric:
+    # deterministic: the value only depends on the configuration and on the round
+    value = 100 * "abc".index(config["p"]) + 10 * "xyz".index(config["q"]) + int(config["r"])
+    return Metric.from_components([value + 0.1 * sweeper.get_rounds_received(config)])
+
+
+def sweep(sweeper: Sweeper, crash_after: int = None) -> int:
+    '''
+    Score the configurations handed out by the sweeper, the process "crashes" after crash_after metrics
+    '''
+    scored = 0
+    while sweeper.has_next():
+        config = sweeper.get_next()
+        if config is None:
+            break
+        for _ in range(sweeper.get_rounds(config, 2)):
+            if scored == crash_after:
+                raise Crash()
+            sweeper.score(config, measure(sweeper, config))
+            scored += 1
+        sweeper.done(config)
+    return scored
+
+
+def results(sweeper: Sweeper):
+    return {str(config): [str(metric) for metric in metrics] for config, metrics in sweeper.iter_scores_by_config()}
+
+
+def uninterrupted(strategy: str):
+    sweeper = new_sweeper(strategy)
+    sweep(sweeper)
+    return results(sweeper), dict(sweeper.best)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("crash_after", [1, 4, 7])
+def test_resume_after_a_crash_with_a_torn_journal_line(strategy, crash_after):
+    expected = uninterrupted(strategy)
+
+    with pytest.raises(Crash):
+        sweep(new_sweeper(strategy), crash_after)
+    # the last event was torn by the crash
+    with open(SweeperStatePersistence._JOURNAL_FILE, "a") as file:
+        file.write('{"event":"score","con')
+    assert len(SweeperStatePersistence.journal().read()) > 0
+
+    resumed = Sweeper(PARAMETERS, 2)
+    # the configurations of the crash are handed out again first, for their missing rounds only
+    sweep(resumed)
+    assert (results(resumed), dict(resumed.best)) == expected
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_snapshot_and_replay_of_the_journal_tail(strategy, monkeypatch):
+    expected = uninterrupted(strategy)
+    monkeypatch.setattr(Sweeper, "_SNAPSHOT_EVERY", 3)
+
+    with pytest.raises(Crash):
+        sweep(new_sweeper(strategy), 7)
+    events = SweeperStatePersistence.journal().read()
+    snapshot = SweeperStatePersistence.load_state()
+    # the journal only holds the events after the last snapshot
+    assert snapshot.journal_sequence >= 3
+    assert len(events) > 0 and events[0]["seq"] == snapshot.journal_sequence + 1
+
+    resumed = Sweeper(PARAMETERS, 2)
+    sweep(resumed)
+    assert (results(resumed), dict(resumed.best)) == expected
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_events_of_the_snapshot_are_not_replayed(strategy, monkeypatch):
+    expected = uninterrupted(strategy)
+    monkeypatch.setattr(Sweeper, "_SNAPSHOT_EVERY", 3)
+    # a crash between the snapshot and the truncation of the journal leaves the events of the snapshot in it
+    truncate = SweeperJournal.truncate
+    monkeypatch.setattr(SweeperJournal, "truncate", lambda journal: journal.sync())
+
+    with pytest.raises(Crash):
+        sweep(new_sweeper(strategy), 7)
+    monkeypatch.setattr(SweeperJournal, "truncate", truncate)
+    assert SweeperStatePersistence.journal().read()[0]["seq"] == 1
+
+    resumed = Sweeper(PARAMETERS, 2)
+    sweep(resumed)
+    assert (results(resumed), dict(resumed.best)) == expected
+
+
+def test_journal_read_stops_at_a_torn_line(tmp_path):
+    journal = SweeperJournal(tmp_path / "journal.jsonl")
+    for seq in range(1, 4):
+        journal.append({"event": "done", "config": seq, "seq": seq})
+    journal.close()
+    with open(tmp_path / "journal.jsonl", "a") as file:
+        file.write('{"event":"do')
+    assert [event["seq"] for event in journal.read()] == [1, 2, 3]
+    journal.truncate()
+    assert journal.read() == []
+
+
+# sweeper_state.json of a sweep interrupted before the configuration indexes: p has priority 1, q priority 2 and the
+# constraint p=c -> q=x, 2 of the 3 trainings of p are done
+JSON_STATE = '''{"lower": true, "train": 3, "remaining_train": 1, "scores": [[{"p": "c", "q": "x"}, {"p": "b", "q": "x"}],
+["[[120];[121]]", "[[110];[111]]"]], "parameters_dict": {"p": ["a", "b", "c"], "q": ["x", "y", "z"]},
+"remaining_configs": [{"p": "a", "q": "x"}, {"p": "a", "q": "y"}, {"p": "a", "q": "z"}, {"p": "b", "q": "y"},
+{"p": "b", "q": "z"}], "done_configs": [{"p": "c", "q": "x"}, {"p": "b", "q": "x"}], "skipped_configs": [],
+"parameters": ["p", "q"], "parameter_index": 1, "current_parameter_key": "p", "selected": {}}'''
+
+
+def test_resume_from_a_json_state():
+    SweeperStatePersistence.create_workdir()
+    with open(SweeperStatePersistence._STATE_FILE_STR, "w") as file:
+        file.write(JSON_STATE)
+    parameters = ApplicationParameters(parameters=[ApplicationParameter("p", 1, ["a", "b", "c"]),
+                                                   ApplicationParameter("q", 2, ["x", "y", "z"])], constraints=None)
+
+    sweeper = Sweeper(parameters, 3)
+    scores = dict(sweeper.iter_scores_by_config())
+    assert [str(metric) for metric in scores[HashableDict({"p": "b", "q": "x"})]] == ["[110]", "[111]"]
+
+    measured = []
+    while sweeper.has_next():
+        config = sweeper.get_next()
+        if config is None:
+            break
+        measured.append(dict(config))
+        value = {"a": 130, "b": 110, "c": 120}[config["p"]] + {"x": 5, "y": 0, "z": 9}[config["q"]]
+        sweeper.score(config, Metric.from_components([value]))
+        sweeper.done(config)
+    # the last training of p among the remaining configurations, then q for the best value of p
+    assert measured[0] in [{"p": "a", "q": "x"}, {"p": "a", "q": "y"}, {"p": "a", "q": "z"}, {"p": "b", "q": "y"},
+                           {"p": "b", "q": "z"}]
+    assert all(config["p"] == "b" for config in measured[1:])
+    assert dict(sweeper.best) == {"p": "b", "q": "y"}
@@ -0,0 +1,71 @@
+from benchmark.data.config import ApplicationParameter, ApplicationParameters
+from benchmark.data.metric import Metric
+from benchmark.sweeper.pareto import ParetoArchive, dominates
+from benchmark.sweeper.sweep import Sweeper
+from execo_engine import HashableDict
+import numpy as np
+import pytest
+
+
+def brute_force_front(points: dict):
+    return sorted(config_id for config_id, point in points.items()
+                  if not any(dominates(other, point) for other in points.values()))
+
+
+def test_dominates():
+    assert dominates((1, 2), (1, 3))
+    assert not dominates((1, 2), (1, 2))
+    assert not dominates((1, 3), (2, 2))
+
+
+@pytest.mark.parametrize("objectives", [2, 3])
+def test_front_matches_brute_force(objectives):
+    rng = np.random.default_rng(objectives)
+    archive = ParetoArchive()
+    points = dict()
+    for _ in range(300):
+        config_id = int(rng.integers(60))
+        # few distinct values, so there are ties
+        point = tuple(float(value) for value in rng.integers(10, size=objectives))
+        points[config_id] = point
+        archive.update(config_id, point)
+        assert sorted(archive.front()) == brute_force_front(points)
+
+    assert ParetoArchive.front_of(list(points), list(points.values())) == archive.front()
+    assert archive.front() == sorted(archive.front(), key=archive.point)
+    assert all((config_id in archive) == (config_id in archive.front()) for config_id in points)
+
+
+def test_worse_mean_uncovers_dominated_points():
+    archive = ParetoArchive()
+    archive.update(0, (1, 1))
+    archive.update(1, (2, 2))
+    archive.update(2, (3, 0))
+    assert archive.front() == [0, 2]
+    archive.update(0, (5, 5))
+    assert archive.front() == [1, 2]
+    assert len(archive) == 2
+
+
+def test_sort_best_first_is_a_total_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parameters = ApplicationParameters(parameters=[ApplicationParameter("p", 1, [str(value) for value in range(6)])],
+                                       constraints=None)
+    sweeper = Sweeper(parameters, 1, remove_workdir=True, objective="pareto")
+    # 0, 1 and 2 are not comparable with each other, but 3 is dominated by 1 only and 4 by 3 only: sorting with
+    # the partial comparison depends on the order of the configurations
+    points = [(1, 9), (5, 5), (9, 1), (6, 6), (7, 7), (5, 5)]
+    for value, point in enumerate(points):
+        sweeper.score(HashableDict({"p": str(value)}), Metric.from_components(list(point)))
+    state = sweeper._Sweeper__state
+    config_ids = [state.space.index_of({"p": str(value)}) for value in range(len(points))]
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        shuffled = [config_ids[position] for position in rng.permutation(len(config_ids))]
+        ranked = [points[config_id] for config_id in state.sort_best_first(shuffled)]
+        # the front first, the compromise (5, 5) ahead of the extremes (at the same distance of the ideal point), then
+        # the dominated configurations
+        assert ranked[:2] == [(5, 5), (5, 5)]
+        assert set(ranked[2:4]) == {(1, 9), (9, 1)}
+        assert ranked[4:] == [(6, 6), (7, 7)]
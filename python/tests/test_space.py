@@ -0,0 +1,58 @@
+from benchmark.data.config import ApplicationParameterConstraint, ParameterBinding
+from benchmark.data.space import ConfigurationSpace
+from benchmark.data.utils import ConstraintUtil
+import random
+import pytest
+
+
+@pytest.fixture
+def grid():
+    # 9 parameters of 10 values: 10^9 configurations, far too many to enumerate
+    return ConfigurationSpace({f"p{i}": [str(value) for value in range(10)] for i in range(9)})
+
+
+def test_random_access(grid):
+    assert len(grid) == 10 ** 9
+    config = grid[123456789]
+    assert [config[f"p{i}"] for i in range(9)] == list("123456789")
+    assert grid.index_of(config) == 123456789
+    assert grid[-1] == {f"p{i}": "9" for i in range(9)}
+    assert all(grid.index_of(grid[index]) == index for index in grid.sample(100, random.Random(0)))
+
+
+def test_restrict_a_9_parameter_grid(grid):
+    restricted = grid.restrict({"p0": "4", "p1": "2"})
+    assert isinstance(restricted, range)
+    assert len(restricted) == 10 ** 7
+    for position in [0, 1, 4567890, len(restricted) - 1]:
+        config = grid[restricted[position]]
+        assert config["p0"] == "4" and config["p1"] == "2"
+        assert restricted[position] == grid.index_of(config)
+    assert grid[restricted[0]] == {"p0": "4", "p1": "2", **{f"p{i}": "0" for i in range(2, 9)}}
+    assert grid[restricted[-1]] == {"p0": "4", "p1": "2", **{f"p{i}": "9" for i in range(2, 9)}}
+
+    assert grid.restrict({}) == range(len(grid))
+    assert len(grid.restrict({f"p{i}": "1" for i in range(9)})) == 1
+    assert len(grid.restrict({"p0": "10"})) == 0
+    with pytest.raises(ValueError):
+        grid.restrict({"p1": "2"})
+
+
+def test_valid_configurations_of_a_prefix(grid):
+    # if p2==0, then p3 in [1, 2]; if p8==9, then p4 is not 5
+    constraints = [
+        ApplicationParameterConstraint(source=ParameterBinding(name="p2", value="0"),
+                                       targets=[ParameterBinding(name="p3", value="1"),
+                                                ParameterBinding(name="p3", value="2")]),
+        ApplicationParameterConstraint(source=ParameterBinding(name="p8", value="9"),
+                                       targets=[ParameterBinding(name="p4", value="5")], type="FORBIDDEN"),
+    ]
+    prefix = {f"p{i}": "0" for i in range(5)}
+    restricted = grid.restrict(prefix)
+    merged_constraints = ConstraintUtil._merge_constraints(constraints)
+    expected = [index for index in restricted if ConstraintUtil._is_config_valid(grid[index], merged_constraints)]
+
+    assert list(ConstraintUtil.filter_valid_configs(grid, constraints, prefix)) == expected
+    # the p3 values of the prefix are forbidden by p2==0
+    assert list(ConstraintUtil.filter_valid_configs(grid, constraints, {**prefix, "p3": "0"})) == []
+    assert len(ConstraintUtil.filter_valid_configs(grid, constraints, {**prefix, "p2": "1"})) == 10 ** 4
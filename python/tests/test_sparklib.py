@@ -0,0 +1,190 @@
+import asyncio, getpass, os, stat, threading, time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+# enoslib reads the name of the user from the environment when it is imported
+os.environ.setdefault("USER", getpass.getuser())
+sparklib = pytest.importorskip("benchmark.deploy.sparklib")
+
+
+@pytest.fixture
+def logs(tmp_path):
+    directory = tmp_path / "run logs"
+    directory.mkdir()
+    return str(directory / "out 1.log"), str(directory / "err 1.log")
+
+
+def test_exit_code_timing_and_logs(logs):
+    path_log, path_err = logs
+    submission = sparklib.SparkSubmission(["sh", "-c", "echo to stdout; echo to stderr >&2; sleep 0.2; exit 3"],
+                                          "metrics.csv", path_log, path_err)
+    result = submission.wait()
+    assert result.return_code == 3
+    assert result.path_metrics_csv is None
+    assert not result.timed_out and not result.cancelled
+    assert 0.2 <= result.wall_time < 5
+    assert open(path_log).read() == "to stdout\n"
+    assert open(path_err).read() == "to stderr\n"
+
+    result = sparklib.SparkSubmission(["sh", "-c", "exit 0"], "metrics.csv", path_log, path_err).wait()
+    assert result.return_code == 0 and result.path_metrics_csv == "metrics.csv"
+
+
+def test_logs_are_streamed(logs):
+    path_log, path_err = logs
+    submission = sparklib.SparkSubmission(["sh", "-c", "echo started; sleep 5"], None, path_log, path_err)
+    try:
+        deadline = time.monotonic() + 5
+        while open(path_log).read() != "started\n" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # the output is in the log file while the process is running
+        assert open(path_log).read() == "started\n"
+        assert submission.poll() is None
+    finally:
+        submission.cancel()
+        submission.wait()
+
+
+def test_timeout_kills_the_process_group(tmp_path, logs):
+    path_log, path_err = logs
+    survivor = tmp_path / "survivor"
+    # the child of the shell is in its process group, it would write the file if it survived the timeout
+    submission = sparklib.SparkSubmission(["sh", "-c", f"(sleep 1; touch '{survivor}') & wait"], "metrics.csv",
+                                          path_log, path_err)
+    result = submission.wait(0.3)
+    assert result.timed_out and not result.cancelled
+    assert result.path_metrics_csv is None
+    assert result.return_code != 0
+    assert 0.3 <= result.wall_time < 5
+    time.sleep(1.5)
+    assert not survivor.exists()
+
+
+def test_cancel(logs):
+    path_log, path_err = logs
+    submission = sparklib.SparkSubmission(["sleep", "30"], "metrics.csv", path_log, path_err)
+    threading.Timer(0.2, submission.cancel).start()
+    result = submission.wait()
+    assert result.cancelled and not result.timed_out
+    assert result.path_metrics_csv is None
+    assert result.wall_time < 5
+
+
+def test_no_log_files():
+    result = sparklib.SparkSubmission(["sh", "-c", "echo discarded"], "metrics.csv", sparklib.SparkSubmit._NO_PATHLOG,
+                                      sparklib.SparkSubmit._NO_PATHERR).wait()
+    assert result.return_code == 0
+
+
+@pytest.fixture
+def spark_home(tmp_path):
+    '''
+    SPARK_HOME with a spark-submit that prints its arguments, one per line, and sleeps SLEEP seconds
+    '''
+    home = tmp_path / "spark home"
+    (home / "bin").mkdir(parents=True)
+    script = home / "bin" / "spark-submit"
+    script.write_text('#!/bin/sh\nfor arg in "$@"; do echo "$arg"; done\nsleep "${SLEEP:-0}"\n')
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(home)
+
+
+def test_local_spark_submit_argv(spark_home, logs):
+    path_log, path_err = logs
+    spark_submit = sparklib.LocalSparkSubmit(timeout=10)
+    spark_submit.set_spark_path(spark_home)
+    result = spark_submit.submit_with_result("my app.jar", "Main", spark_args={"executor-memory": "1g"},
+                                             java_args={"-filename": "a file.txt", "": "positional"},
+                                             path_metrics_csv="metrics.csv", path_log=path_log, path_err=path_err)
+    assert result.return_code == 0 and result.path_metrics_csv == "metrics.csv"
+    assert open(path_log).read().splitlines() == ["--master", "spark://localhost:7077", "--executor-memory", "1g",
+                                                  "--class", "Main", "my app.jar", "-filename", "a file.txt",
+                                                  "positional"]
+    assert spark_submit._submissions == set()
+
+
+def test_local_spark_submit_missing_spark_home(tmp_path, logs):
+    path_log, path_err = logs
+    spark_submit = sparklib.LocalSparkSubmit()
+    spark_submit.set_spark_path(str(tmp_path / "missing"))
+    assert spark_submit.submit_with_log("app.jar", "Main", path_metrics_csv="metrics.csv", path_log=path_log,
+                                        path_err=path_err) is None
+
+
+def test_async_submissions_do_not_hold_worker_threads(spark_home, tmp_path):
+    spark_submit = sparklib.LocalSparkSubmit(timeout=10)
+    spark_submit.set_spark_path(spark_home)
+
+    async def submit_all():
+        # the submissions would run one after the other if each one held a worker thread
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+        return await asyncio.gather(*(spark_submit.submit_with_result_async(
+            "app.jar", "Main", java_args={"-run": str(run)}, path_metrics_csv=f"metrics {run}.csv",
+            path_log=str(tmp_path / f"out {run}.log"), path_err=str(tmp_path / f"err {run}.log"))
+            for run in range(8)))
+
+    os.environ["SLEEP"] = "0.5"
+    try:
+        start = time.monotonic()
+        results = asyncio.run(submit_all())
+    finally:
+        del os.environ["SLEEP"]
+    # the 8 submissions of 0.5s ran concurrently
+    assert time.monotonic() - start < 2
+    assert [result.path_metrics_csv for result in results] == [f"metrics {run}.csv" for run in range(8)]
+    assert open(tmp_path / "out 3.log").read().splitlines()[-2:] == ["-run", "3"]
+    assert spark_submit._submissions == set()
+
+
+def test_async_exit_code_and_timeout(tmp_path, logs):
+    path_log, path_err = logs
+
+    async def run(argv, timeout=None):
+        submission = await sparklib.AsyncSparkSubmission.start(argv, "metrics.csv", path_log, path_err)
+        return await submission.wait(timeout)
+
+    result = asyncio.run(run(["sh", "-c", "echo out; echo err >&2; exit 3"]))
+    assert result.return_code == 3 and result.path_metrics_csv is None
+    assert open(path_log).read() == "out\n" and open(path_err).read() == "err\n"
+
+    survivor = tmp_path / "survivor"
+    result = asyncio.run(run(["sh", "-c", f"(sleep 1; touch '{survivor}') & wait"], 0.3))
+    assert result.timed_out and not result.cancelled and result.path_metrics_csv is None
+    assert 0.3 <= result.wall_time < 5
+    time.sleep(1.5)
+    assert not survivor.exists()
+
+
+def test_async_cancel(spark_home, logs):
+    path_log, path_err = logs
+    spark_submit = sparklib.LocalSparkSubmit()
+    spark_submit.set_spark_path(spark_home)
+
+    async def cancel_task():
+        task = asyncio.create_task(spark_submit.submit_with_result_async("app.jar", "Main", path_log=path_log,
+                                                                         path_err=path_err))
+        await asyncio.sleep(0.2)
+        submission = next(iter(spark_submit._submissions))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await submission._process.wait()
+
+    async def cancel_submissions():
+        task = asyncio.create_task(spark_submit.submit_with_result_async("app.jar", "Main", path_log=path_log,
+                                                                         path_err=path_err))
+        await asyncio.sleep(0.2)
+        # from another thread, like BenchmarkExecutor on an interruption
+        await asyncio.to_thread(spark_submit.cancel)
+        return await task
+
+    os.environ["SLEEP"] = "30"
+    try:
+        start = time.monotonic()
+        assert asyncio.run(cancel_task()) != 0
+        result = asyncio.run(cancel_submissions())
+    finally:
+        del os.environ["SLEEP"]
+    assert result.cancelled and result.path_metrics_csv is None
+    assert time.monotonic() - start < 5
+    assert spark_submit._submissions == set()
@@ -0,0 +1,70 @@
+from benchmark.data.metric import Metric
+from benchmark.data.statistics import Aggregator, ScoreStatistics, student_t_quantile
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("df, quantile", [(1, 12.7062), (2, 4.3027), (3, 3.1824), (5, 2.5706), (10, 2.2281),
+                                          (30, 2.0423), (1000, 1.9623)])
+def test_student_t_quantile(df, quantile):
+    # the Cornish-Fisher expansion is within 0.2% of the exact quantile from 3 degrees of freedom
+    assert student_t_quantile(0.975, df) == pytest.approx(quantile, rel=2e-3)
+    assert student_t_quantile(0.025, df) == pytest.approx(-quantile, rel=2e-3)
+
+
+def test_score_statistics_match_numpy():
+    values = np.random.default_rng(0).normal(100, 5, size=(20, 2))
+    statistics = ScoreStatistics.of([Metric.from_components(row) for row in values])
+
+    assert statistics.count == 20
+    assert statistics.get_mean().components() == pytest.approx(values.mean(axis=0).tolist())
+    assert statistics.variance() == pytest.approx(values.var(axis=0, ddof=1).tolist())
+    half_width = student_t_quantile(0.975, 19) * values.std(axis=0, ddof=1) / np.sqrt(20)
+    assert statistics.half_width(0.95) == pytest.approx(half_width.tolist())
+    assert statistics.relative_half_width(0.95) == pytest.approx(max(half_width / np.abs(values.mean(axis=0))))
+
+
+def test_score_statistics_of_a_single_metric():
+    statistics = ScoreStatistics.of([Metric.from_components([1.0, 2.0])])
+    assert statistics.get_mean().components() == [1.0, 2.0]
+    assert statistics.variance() == [0.0, 0.0]
+    assert statistics.half_width() == [np.inf, np.inf]
+    with pytest.raises(KeyError):
+        ScoreStatistics().get_mean()
+
+
+def test_score_statistics_from_aggregates():
+    statistics = ScoreStatistics.of([Metric.from_components([value]) for value in [3, 5, 10]])
+    copy = ScoreStatistics.from_aggregates(statistics.count, statistics.sum, statistics.mean, statistics.m2)
+    copy.add_components([6])
+    assert copy.get_mean().components() == pytest.approx([6.0])
+    assert copy.variance() == pytest.approx([np.var([3, 5, 10, 6], ddof=1)])
+
+
+@pytest.mark.parametrize("name, statistic", [
+    ("mean", lambda values: values.mean(axis=0)),
+    ("median", lambda values: np.median(values, axis=0)),
+    ("p90", lambda values: np.percentile(values, 90, axis=0)),
+    ("trimmed_mean", lambda values: np.sort(values, axis=0)[2:18].mean(axis=0)),
+])
+def test_aggregators(name, statistic):
+    values = np.random.default_rng(1).exponential(10, size=(20, 2))
+    assert Aggregator(name).aggregate(values) == pytest.approx(statistic(values))
+
+
+def test_aggregator_intervals():
+    values = np.random.default_rng(2).normal(50, 2, size=(30, 1))
+    for name in ["mean", "bootstrap", "median", "p90"]:
+        aggregator = Aggregator(name)
+        low, high = aggregator.interval(values)
+        assert low[0] <= aggregator.aggregate(values)[0] <= high[0]
+    # the bootstrap resamples are drawn from a fixed seed
+    assert Aggregator("median").interval(values) == Aggregator("median").interval(values)
+    low, high = Aggregator("mean").interval(values[:1])
+    assert low == high == values[0]
+
+
+@pytest.mark.parametrize("name", ["average", "p101", "p"])
+def test_unknown_aggregator(name):
+    with pytest.raises(Exception):
+        Aggregator(name)
@@ -0,0 +1,117 @@
+from benchmark.data.config import ApplicationParameter, ApplicationParameters
+from benchmark.data.metric import Metric
+from benchmark.sweeper.sweep import Sweeper
+from execo_engine import HashableDict
+import random
+import pytest
+
+
+# synthetic objective: p has a large effect, q a small one, (a, x) is the best configuration
+OBJECTIVE = {("a", "x"): 10, ("a", "y"): 11, ("b", "x"): 20, ("b", "y"): 21, ("c", "x"): 30, ("c", "y"): 31}
+BEST = {"p": "a", "q": "x"}
+
+PARAMETERS = ApplicationParameters(parameters=[ApplicationParameter("p", 1, ["a", "b", "c"]),
+                                               ApplicationParameter("q", 2, ["x", "y"])], constraints=None)
+OPTIONS = {"min_rounds": 2, "max_rounds": 4}
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # the sweeper persists its state in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def measure(config, rng: random.Random) -> Metric:
+    return Metric.from_components([OBJECTIVE[(config["p"], config["q"])] + rng.gauss(0, 0.1)])
+
+
+def sweep(sweeper: Sweeper, rng: random.Random, resume_after: int = None) -> Sweeper:
+    '''
+    Score the configurations handed out by the sweeper, and resume it from its journal after resume_after of them
+    '''
+    done = 0
+    while sweeper.has_next():
+        config = sweeper.get_next()
+        if config is None:
+            break
+        for _ in range(sweeper.get_rounds(config, 2)):
+            sweeper.score(config, measure(config, rng))
+        sweeper.done(config)
+        done += 1
+        if done == resume_after:
+            # the strategy and its progress are restored from the state
+            sweeper = Sweeper(PARAMETERS, 1)
+    return sweeper
+
+
+@pytest.mark.parametrize("strategy", ["halving", "hyperband", "racing"])
+@pytest.mark.parametrize("seed", range(5))
+def test_finds_the_best_configuration(strategy, seed):
+    sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=seed, strategy=strategy, budget=6,
+                      strategy_options=dict(OPTIONS))
+    sweeper = sweep(sweeper, random.Random(seed))
+    assert dict(sweeper.best) == BEST
+    assert sweeper.get_score(sweeper.best).components()[0] == pytest.approx(10, abs=0.5)
+
+
+def test_halving_promotes_the_best_configurations():
+    sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=0, strategy="halving", budget=6,
+                      strategy_options={"eta": 2, "min_rounds": 1, "max_rounds": 4})
+    sweeper = sweep(sweeper, random.Random(0))
+    rounds = {(config["p"], config["q"]): len(metrics) for config, metrics in sweeper.iter_scores_by_config()}
+    # 6 configurations with 1 round, the best 3 with 2 rounds, the best one with 4 rounds
+    assert rounds == {("a", "x"): 4, ("a", "y"): 2, ("b", "x"): 2, ("b", "y"): 1, ("c", "x"): 1, ("c", "y"): 1}
+
+
+def test_racing_keeps_the_leader_of_the_previous_race():
+    for seed in range(10):
+        sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=seed, strategy="racing",
+                          strategy_options=dict(OPTIONS))
+        sweeper = sweep(sweeper, random.Random(seed))
+        assert dict(sweeper.best) == BEST
+        # the configuration of p=a raced for p keeps racing for q, so at most 5 configurations are scored
+        assert len(sweeper.get_all_scores_by_config()) <= 5
+
+
+@pytest.mark.parametrize("strategy", ["halving", "hyperband", "racing"])
+@pytest.mark.parametrize("resume_after", [None, 2])
+def test_warm_started_configuration_competes(strategy, resume_after):
+    # a budget of one configuration: the imported best configuration is never drawn again
+    sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=1, strategy=strategy, budget=1,
+                      strategy_options=dict(OPTIONS))
+    imported = sweeper.warm_start({HashableDict(BEST): [Metric.from_components([10.0]),
+                                                        Metric.from_components([10.1])]})
+    assert imported == 1
+    sweeper = sweep(sweeper, random.Random(0), resume_after)
+    assert dict(sweeper.best) == BEST
+
+
+@pytest.mark.parametrize("strategy", ["priority", "surrogate", "halving", "hyperband", "racing"])
+def test_plan_bounds_the_sweep(strategy):
+    plan = Sweeper.plan(PARAMETERS, 2, 6, strategy, dict(OPTIONS))
+    sweeper = Sweeper(PARAMETERS, 2, remove_workdir=True, seed=0, strategy=strategy, budget=6,
+                      strategy_options=dict(OPTIONS))
+    rng = random.Random(0)
+    asked, rounds = 0, 0
+    while sweeper.has_next():
+        config = sweeper.get_next()
+        if config is None:
+            break
+        asked += 1
+        for _ in range(sweeper.get_rounds(config, 2)):
+            sweeper.score(config, measure(config, rng))
+            rounds += 1
+        sweeper.done(config)
+    scored = len(list(sweeper.iter_scores_by_config()))
+
+    assert scored <= plan.max_scored_configs
+    assert asked <= sum(step.configs for step in plan.schedule)
+    assert rounds <= sum(step.configs * (2 if step.rounds is None else step.rounds) for step in plan.schedule)
+
+
+def test_plan_of_halving():
+    plan = Sweeper.plan(PARAMETERS, 1, 6, "halving", {"eta": 2, "min_rounds": 1, "max_rounds": 4})
+    # 6 configurations with 1 round, the best 3 with 2 rounds, the best one with 4 rounds
+    assert [(step.configs, step.new_configs, step.rounds) for step in plan.schedule] == \
+        [(6, 6, 1), (3, 0, 1), (1, 0, 2)]
+    assert plan.max_scored_configs == 6
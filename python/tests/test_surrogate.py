@@ -0,0 +1,64 @@
+from benchmark.data.config import ApplicationParameter, ApplicationParameters
+from benchmark.data.metric import Metric
+from benchmark.sweeper.sweep import Sweeper
+import random
+import pytest
+
+
+# separable toy objective over 5^4 = 625 configurations, the minimum (1) is p0=0, p1=1, p2=2, p3=3
+PARAMETERS = ApplicationParameters(parameters=[ApplicationParameter(f"p{i}", i, ["0", "1", "2", "3", "4"])
+                                               for i in range(4)], constraints=None)
+BUDGET = 30
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # the sweeper persists its state in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def objective(config) -> float:
+    return sum((int(config[f"p{i}"]) - i) ** 2 for i in range(4)) + 1
+
+
+def measure(sweeper: Sweeper, config, rng: random.Random):
+    for _ in range(2):
+        sweeper.score(config, Metric.from_components([objective(config) + rng.gauss(0, 0.1)]))
+    sweeper.done(config)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_converges_on_a_toy_objective(seed):
+    rng = random.Random(seed)
+    sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=seed, strategy="surrogate", budget=BUDGET)
+    while sweeper.has_next():
+        config = sweeper.get_next()
+        if config is None:
+            break
+        measure(sweeper, config, rng)
+
+    assert len(sweeper.get_all_scores_by_config()) == BUDGET
+    # 9 of the 625 configurations score at most 2: random search finds one of them with 30 configurations in about
+    # a third of the sweeps
+    assert objective(sweeper.best) <= 2
+
+
+def test_budget_of_batches_and_resume():
+    rng = random.Random(0)
+    sweeper = Sweeper(PARAMETERS, 1, remove_workdir=True, seed=0, strategy="surrogate", budget=BUDGET)
+    handed_out = 0
+    while True:
+        batch = sweeper.get_next_batch(4)
+        if len(batch) == 0:
+            break
+        assert len(set(batch)) == len(batch)
+        handed_out += len(batch)
+        for config in batch:
+            measure(sweeper, config, rng)
+        if handed_out == 12:
+            # the strategy and its progress are restored from the state
+            sweeper = Sweeper(PARAMETERS, 1)
+
+    assert handed_out == BUDGET
+    assert len(sweeper.get_all_scores_by_config()) == BUDGET
+    assert not sweeper.has_next()